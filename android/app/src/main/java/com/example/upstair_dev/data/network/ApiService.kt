@@ -10,12 +10,19 @@ import retrofit2.http.GET
 import retrofit2.http.POST
 import retrofit2.http.Query
 
+const val PAGE_SIZE = 100
+const val NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
 interface ApiService {
     @POST("/login")
     fun login(@Body request: LoginRequest): Call<LoginResponse>
 
+    // 한 페이지씩 조회, 다음 페이지 커서는 응답 헤더 X-Next-Cursor (없으면 마지막 페이지)
     @GET("/documents")
-    fun getScholarships(): Call<List<ScholarshipResponse>>
+    fun getScholarships(
+        @Query("limit") limit: Int = PAGE_SIZE,
+        @Query("after") after: String? = null
+    ): Call<List<ScholarshipResponse>>
 
     @GET("/documents/filter")
     fun getFilteredScholarships(
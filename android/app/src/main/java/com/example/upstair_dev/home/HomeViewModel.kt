@@ -5,6 +5,7 @@ import androidx.compose.runtime.mutableStateOf
 import androidx.lifecycle.ViewModel
 import androidx.compose.runtime.State
 import com.example.upstair_dev.data.model.ScholarshipResponse
+import com.example.upstair_dev.data.network.NEXT_CURSOR_HEADER
 import com.example.upstair_dev.data.network.RetrofitClient
 import retrofit2.Call
 import retrofit2.Callback
@@ -28,53 +29,28 @@ class HomeViewModel : ViewModel() {
     private val _scholarships = mutableStateOf<List<Scholarship>>(emptyList())
     val scholarships: State<List<Scholarship>> = _scholarships
 
+    // 목록을 다른 조회(필터·질문)로 바꾸면 진행 중인 페이지 이어받기를 멈추기 위한 번호
+    private var listRequest = 0
+
     init {
         fetchScholarships()
     }
 
-    private fun fetchScholarships() {
-        RetrofitClient.apiService.getScholarships().enqueue(object : Callback<List<ScholarshipResponse>> {
+    // 첫 페이지를 받자마자 보여 주고, X-Next-Cursor 가 있으면 다음 페이지를 이어 붙인다
+    private fun fetchScholarships(after: String? = null, request: Int = ++listRequest) {
+        RetrofitClient.apiService.getScholarships(after = after).enqueue(object : Callback<List<ScholarshipResponse>> {
             override fun onResponse(
                 call: Call<List<ScholarshipResponse>>,
                 response: Response<List<ScholarshipResponse>>
             ) {
+                if (request != listRequest) return
                 if (response.isSuccessful) {
                     val body = response.body() ?: emptyList()
                     val now = LocalDate.now()
+                    val page = body.map { toScholarship(it, now) }
 
-                    _scholarships.value = body.map {
-                        val rawStart = it.start_date?.trim()
-                        val rawEnd = it.end_date?.trim()
-
-                        val startDate = try {
-                            if (!rawStart.isNullOrEmpty()) LocalDate.parse(rawStart) else LocalDate.MAX
-                        } catch (e: Exception) {
-                            Log.e("Scholarship", "Invalid start date: $rawStart")
-                            LocalDate.MAX
-                        }
-
-                        val endDate = try {
-                            if (!rawEnd.isNullOrEmpty()) LocalDate.parse(rawEnd) else LocalDate.MIN
-                        } catch (e: Exception) {
-                            Log.e("Scholarship", "Invalid end date: $rawEnd")
-                            LocalDate.MIN
-                        }
-
-                        val status = when {
-                            now.isBefore(startDate) -> "모집전"
-                            now.isAfter(endDate) -> "모집완료"
-                            else -> "모집중"
-                        }
-
-                        Log.d("ScholarshipDebug", "Title: ${it.title}, status: $status")
-
-                        Scholarship(
-                            name = it.title ?: "제목 없음",
-                            deadline = it.end_date ?: "미정",
-                            status = status,
-                            link = it.link ?: ""
-                        )
-                    }
+                    _scholarships.value = if (after == null) page else _scholarships.value + page
+                    response.headers()[NEXT_CURSOR_HEADER]?.let { fetchScholarships(it, request) }
                 }
             }
 
@@ -84,7 +60,42 @@ class HomeViewModel : ViewModel() {
         })
     }
 
+    private fun toScholarship(doc: ScholarshipResponse, now: LocalDate): Scholarship {
+        val rawStart = doc.start_date?.trim()
+        val rawEnd = doc.end_date?.trim()
+
+        val startDate = try {
+            if (!rawStart.isNullOrEmpty()) LocalDate.parse(rawStart) else LocalDate.MAX
+        } catch (e: Exception) {
+            Log.e("Scholarship", "Invalid start date: $rawStart")
+            LocalDate.MAX
+        }
+
+        val endDate = try {
+            if (!rawEnd.isNullOrEmpty()) LocalDate.parse(rawEnd) else LocalDate.MIN
+        } catch (e: Exception) {
+            Log.e("Scholarship", "Invalid end date: $rawEnd")
+            LocalDate.MIN
+        }
+
+        val status = when {
+            now.isBefore(startDate) -> "모집전"
+            now.isAfter(endDate) -> "모집완료"
+            else -> "모집중"
+        }
+
+        Log.d("ScholarshipDebug", "Title: ${doc.title}, status: $status")
+
+        return Scholarship(
+            name = doc.title ?: "제목 없음",
+            deadline = doc.end_date ?: "미정",
+            status = status,
+            link = doc.link ?: ""
+        )
+    }
+
     fun fetchFilteredScholarships(minGpa: Double, grade: Int, status: String) {
+        listRequest++
         RetrofitClient.apiService.getFilteredScholarships(minGpa, grade, status)
             .enqueue(object : Callback<List<FilteredScholarshipResponse>> {
                 override fun onResponse(
@@ -115,6 +126,7 @@ class HomeViewModel : ViewModel() {
     }
 
     fun fetchAskedScholarships(question: String) {
+        listRequest++
         val body = mapOf("question" to question)
 
         RetrofitClient.apiService.askDatabase(body)
@@ -0,0 +1,33 @@
+"""
+documents 데이터 정리 명령
+--------------------------------
+시작 시 마이그레이션(db.db.init_db)은 행을 지우지 않는다. 같은 링크·본문 문서가 중복 저장돼 있으면
+유니크 인덱스 생성을 보류하므로, 확인 후 아래 명령으로 명시적으로 정리한다.
+
+    cd server
+    python -m db.migrate dedupe            # 중복 행 수만 출력
+    python -m db.migrate dedupe --apply    # 가장 먼저 저장된 행만 남기고 삭제 + 유니크 인덱스 생성
+"""
+import argparse
+
+from db.db import dedupe_documents, duplicate_documents, engine, init_db
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="documents 데이터 정리")
+    sub = parser.add_subparsers(dest="command", required=True)
+    dedupe = sub.add_parser("dedupe", help="같은 content_hash 중복 행 정리")
+    dedupe.add_argument("--apply", action="store_true", help="실제로 삭제 (없으면 개수만 출력)")
+    args = parser.parse_args()
+
+    init_db()  # content_hash 열·값 준비
+    with engine.begin() as conn:
+        duplicates = duplicate_documents(conn)
+        if not args.apply:
+            print(f"중복 행 {duplicates}개 (삭제하려면 --apply)")
+            return
+        print(f"중복 행 {dedupe_documents(conn)}개 삭제")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,233 @@
-from fastapi import Query
-from typing import Optional, List
-
-@doc_router.get("/documents/filter")
-def filter_documents(
-    min_gpa: Optional[float] = Query(None),
-    grade: Optional[int] = Query(None),
-    status: Optional[str] = Query(None),  # "재학" 또는 "휴학"
-    db: Session = Depends(get_db)
-):
-    query = db.query(Document)
+"""
+문서 조회 쿼리 모음
+--------------------------------
+라우트(/documents/filter)와 LLM tool(utils.function_calling)이 같은 함수를 호출한다.
+세션은 호출한 쪽이 넘겨주므로 요청 하나에 DB 연결 하나만 쓴다.
+쿼리는 ``*_stmt`` 로 한 번만 정의하고 sync(Session) / async(AsyncSession) 실행 함수가 공유한다.
 
+자격 조회(eligible_documents)는 매번 테이블을 훑지 않고 ``open_documents`` 캐시
+(오늘 신청 기간인 행, gpa 내림차순·grade 오름차순)를 메모리에서 거른다.
+캐시는 documents 변경 커밋(db.db.on_documents_changed), 날짜 변경(자정), ``OPEN_DOCUMENTS_MAX_AGE`` 초
+경과(다른 워커 프로세스의 쓰기) 중 하나가 일어나면 다음 조회 때 다시 읽는다.
+
+목록(/documents, /documents/titles)은 ``document_page_stmt`` 로 필요한 열만, 커서 다음 limit 개씩 읽는다
+(offset 없이 정렬 키로 바로 이어 읽는 keyset 방식 – 몇 번째 페이지든 인덱스 범위 조회 한 번).
+"""
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import Select, and_, desc, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from db.db import Document, on_documents_changed
+
+OPEN_DOCUMENTS_MAX_AGE = float(os.getenv("OPEN_DOCUMENTS_MAX_AGE", "300"))
+
+
+def eligible_documents_stmt(
+    min_gpa: Optional[float] = None,
+    grade: Optional[int] = None,
+    status: Optional[str] = None,  # "재학" 또는 "휴학"
+    today: Optional[date] = None,
+) -> Select:
+    """조건에 맞고 현재 신청 기간인 공지의 (title, link)"""
+    today = today or date.today()
+    query = select(Document.title, Document.link)
+    conditions = []
+
+    # min_gpa와 grade 조건을 OR로 처리하고 null 값도 포함
     if min_gpa is not None:
-        query = query.filter(Document.gpa >= min_gpa)
+        # GPA가 null이거나 입력한 min_gpa 이상인 경우를 포함
+        conditions.append(or_(Document.gpa >= min_gpa, Document.gpa.is_(None)))
     if grade is not None:
-        query = query.filter(Document.grade == grade)
+        # grade가 null이거나 입력한 grade 이상인 경우를 포함
+        conditions.append(or_(Document.grade >= grade, Document.grade.is_(None)))
+    if conditions:
+        query = query.where(or_(*conditions))
+
+    # status 조건은 AND로 처리 (null 포함하지 않음)
     if status is not None:
-        query = query.filter(Document.status == status)
+        query = query.where(Document.status == status)
+
+    # 날짜 조건도 AND로 추가
+    query = query.where(Document.start_date <= today)
+    query = query.where(Document.end_date >= today)
+
+    # 정렬 조건 추가 (GPA 높은 순, 학년 낮은 순, 같으면 먼저 저장된 순)
+    return query.order_by(desc(Document.gpa), Document.grade, Document.id)
+
+
+def open_documents_stmt(today: Optional[date] = None) -> Select:
+    """오늘 신청 기간인 공지의 자격 열 (eligible_documents_stmt 와 같은 정렬, ix_documents_open_window 사용)"""
+    today = today or date.today()
+    return (
+        select(Document.title, Document.link, Document.gpa, Document.grade, Document.status)
+        .where(Document.start_date <= today, Document.end_date >= today)
+        .order_by(desc(Document.gpa), Document.grade, Document.id)
+    )
+
+
+class OpenSet:
+    """신청 기간인 행(open_documents_stmt 순서)의 열 배열 – 조건 필터는 numpy 마스크 한 번"""
+
+    def __init__(self, rows):
+        self.titles = [row.title for row in rows]
+        self.links = [row.link for row in rows]
+        self.gpa = np.array([np.nan if row.gpa is None else row.gpa for row in rows], dtype=np.float64)
+        self.grade = np.array([-1 if row.grade is None else row.grade for row in rows], dtype=np.int64)
+        self.status_codes = {value: code for code, value in enumerate({row.status for row in rows} - {None})}
+        self.status = np.array([self.status_codes.get(row.status, -1) for row in rows], dtype=np.int64)
+        self.title_ids = np.unique(np.array(self.titles, dtype=object), return_inverse=True)[1] if rows else np.zeros(0, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.titles)
+
+    def filter(
+        self,
+        min_gpa: Optional[float] = None,
+        grade: Optional[int] = None,
+        status: Optional[str] = None,  # "재학" 또는 "휴학"
+    ) -> List[Dict[str, str]]:
+        """eligible_documents_stmt 와 같은 조건 (gpa/grade 는 null 포함 OR, status 는 AND), 제목 기준 중복 제거"""
+        keep = np.ones(len(self), dtype=bool)
+        either = []
+        if min_gpa is not None:
+            either.append(np.isnan(self.gpa) | (self.gpa >= min_gpa))
+        if grade is not None:
+            either.append((self.grade < 0) | (self.grade >= grade))
+        if either:
+            keep &= np.logical_or.reduce(either)
+        if status is not None:
+            keep &= self.status == self.status_codes.get(status, -2)
+        rows = np.flatnonzero(keep)
+        first = np.unique(self.title_ids[rows], return_index=True)[1]  # 제목별 첫 행 (정렬 순서상 먼저)
+        return [{"notice_title": self.titles[i], "url": self.links[i]} for i in rows[np.sort(first)]]
+
+
+@dataclass
+class _Snapshot:
+    day: date
+    loaded_at: float
+    rows: OpenSet
+
+
+class OpenDocuments:
+    """현재 신청 기간인 공지 캐시 (프로세스 전역, 읽기는 락 없이 스냅샷 참조만)"""
+
+    def __init__(self, max_age: float = OPEN_DOCUMENTS_MAX_AGE):
+        self.max_age = max_age
+        self._snapshot: Optional[_Snapshot] = None
+        self._generation = 0  # invalidate 마다 증가 – 읽는 도중 바뀌었으면 그 결과는 저장하지 않음
+        self._lock = threading.Lock()
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._snapshot = None
+
+    def _fresh(self, today: date) -> Optional[OpenSet]:
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.day == today and time.monotonic() - snapshot.loaded_at < self.max_age:
+            return snapshot.rows
+        return None
+
+    def _store(self, rows: list, today: date, generation: int) -> OpenSet:
+        open_set = OpenSet(rows)
+        with self._lock:
+            if generation == self._generation:
+                self._snapshot = _Snapshot(today, time.monotonic(), open_set)
+        return open_set
+
+    def get(self, db: Session, today: date) -> OpenSet:
+        open_set = self._fresh(today)
+        if open_set is None:
+            generation = self._generation
+            open_set = self._store(db.execute(open_documents_stmt(today)).all(), today, generation)
+        return open_set
+
+    async def aget(self, db: AsyncSession, today: date) -> OpenSet:
+        open_set = self._fresh(today)
+        if open_set is None:
+            generation = self._generation
+            open_set = self._store((await db.execute(open_documents_stmt(today))).all(), today, generation)
+        return open_set
+
+
+open_documents = OpenDocuments()
+on_documents_changed(open_documents.invalidate)
+
+
+# ── 목록 페이지 (keyset) ──
+PAGE_SORTS = ("id", "end_date")  # id: 최근 저장 순, end_date: 마감 빠른 순(기간 없는 공지는 마지막)
+
+
+def page_cursor(row, sort: str) -> str:
+    """페이지 마지막 행의 정렬 키 → 다음 요청의 after 값"""
+    if sort == "end_date":
+        return f"{row.end_date.isoformat() if row.end_date else 'null'}_{row.id}"
+    return str(row.id)
+
+
+def _parse_cursor(after: str, sort: str):
+    """after 문자열 → 정렬 키 (형식이 틀리면 ValueError)"""
+    if sort == "end_date":
+        day, _, doc_id = after.rpartition("_")
+        return (None if day == "null" else date.fromisoformat(day)), int(doc_id)
+    return int(after)
+
+
+def document_page_stmt(columns, sort: str = "id", after: Optional[str] = None, limit: int = 100) -> Select:
+    """columns(본문 제외 목록 열, id·end_date 포함)의 한 페이지. after 는 이전 페이지의 page_cursor"""
+    query = select(*columns)
+    if sort == "end_date":
+        if after:
+            day, doc_id = _parse_cursor(after, sort)
+            if day is None:
+                query = query.where(Document.end_date.is_(None), Document.id > doc_id)
+            else:
+                query = query.where(or_(
+                    Document.end_date > day,
+                    and_(Document.end_date == day, Document.id > doc_id),
+                    Document.end_date.is_(None),
+                ))
+        query = query.order_by(Document.end_date.asc().nulls_last(), Document.id)
+    else:
+        if after:
+            query = query.where(Document.id < _parse_cursor(after, sort))
+        query = query.order_by(desc(Document.id))
+    return query.limit(limit)
+
+
+def _unique_titles(rows) -> List[Dict[str, str]]:
+    # 중복 제거를 위해 딕셔너리 사용
+    unique_docs = {}
+    for title, link in rows:
+        if title not in unique_docs:
+            unique_docs[title] = {
+                "notice_title": title,
+                "url": link
+            }
+    return list(unique_docs.values())
+
+
+def eligible_documents(db: Session, today: Optional[date] = None, **filters) -> List[Dict[str, str]]:
+    """조건에 맞고 현재 신청 기간인 공지 [{"notice_title", "url"}] (제목 기준 중복 제거)
+
+    오늘 기준이면 open_documents 캐시, 다른 날짜를 주면 DB 조회.
+    """
+    if today is not None and today != date.today():
+        return _unique_titles(db.execute(eligible_documents_stmt(today=today, **filters)))
+    return open_documents.get(db, date.today()).filter(**filters)
+
 
-    docs = query.all()
-    return [{"title": d.title, "link": d.link} for d in docs]
+async def aeligible_documents(db: AsyncSession, today: Optional[date] = None, **filters) -> List[Dict[str, str]]:
+    """eligible_documents 의 async 버전"""
+    if today is not None and today != date.today():
+        return _unique_titles(await db.execute(eligible_documents_stmt(today=today, **filters)))
+    return (await open_documents.aget(db, date.today())).filter(**filters)
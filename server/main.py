@@ -6,7 +6,7 @@ from routes.auth import login_router
 from routes.user import user_router
 from routes.docs import doc_router
 from routes.ask import ask_router
-from simple_fastapi_auth import scholarship_router
+from simple_fastapi_auth import scholarship_router, index_holder, ensure_cosine_index, backfill_condition_metadata
 from db.db import init_db
 
 app = FastAPI()
@@ -18,10 +18,14 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],          # GET, POST, PUT … 전부 허용. 필요하면 ["GET", "POST"] 식으로 제한
     allow_headers=["*"],          # 모든 헤더 허용
+    expose_headers=["X-Next-Cursor"],  # 목록 다음 페이지 커서 (routes.docs)
 )
 # --------------------------------------------------------------------
 
 init_db()  # 앱 시작 시 DB 테이블 생성
+index_holder.load()  # FAISS 인덱스를 미리 메모리에 올려 첫 질문부터 바로 검색
+ensure_cosine_index()  # 예전 L2 인덱스는 한 번만 코사인 인덱스로 변환
+backfill_condition_metadata()  # 조건 메타데이터가 없는 예전 청크가 남은 인덱스만 DB 조건으로 한 번 채움
 
 app.include_router(login_router)
 app.include_router(user_router)
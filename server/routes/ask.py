@@ -1,52 +1,218 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from db.db import SessionLocal, Document
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import Optional
-from datetime import date
-from utils.function_calling import  filter_documents_api, run_conversation, ask_llm
-from utils.chat import RAG_chat, make_vectorstore
-from langchain_community.vectorstores import FAISS
+from typing import AsyncIterator, Dict, List, Optional
+from utils.chat import astream_solar
 from dotenv import load_dotenv
-from openai import OpenAI
 import os
-from pathlib import Path
-from simple_fastapi_auth import UPSTAGE_API_KEY, UpstageEmbeddings
+from simple_fastapi_auth import index_holder
+from utils.query_router import QueryRoute, route_question
+from utils.answer_cache import AnswerCache
+from db.db import on_documents_changed
+import time
+from utils.vector_index import IndexSnapshot, asearch_many_diverse
+from utils.hybrid_search import ahybrid_search, keyword_search
+from utils.function_calling import afilter_documents_api, arun_conversation
+from db.db import AsyncSessionLocal
+from sqlalchemy.ext.asyncio import AsyncSession
+import asyncio
 import json
+import logging
 load_dotenv()
-api_key = os.getenv("UPSTAGE_API_KEY")
-client = OpenAI(api_key=api_key, base_url="https://api.upstage.ai/v1")
-VECTOR_DIR = Path("./faiss_index")
-embeddings = UpstageEmbeddings(
-    model="solar-embedding-1-large",
-    upstage_api_key=UPSTAGE_API_KEY,
-)
+logger = logging.getLogger("pnu_parser")
 ask_router = APIRouter()
 
-def get_db():
-    db = SessionLocal()
-    try:
+# 반복 질문 답변 캐시 – 인덱스 교체·documents 변경 시 무효화
+answer_cache = AnswerCache(
+    max_entries=int(os.getenv("ANSWER_CACHE_SIZE", "1000")),
+    ttl=float(os.getenv("ANSWER_CACHE_TTL", "600")),
+    threshold=float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.95")),
+)
+index_holder.add_listener(lambda version: answer_cache.invalidate(f"index {version}"))
+on_documents_changed(lambda: answer_cache.invalidate("documents"))
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 class AskRequest(BaseModel):
     question: str
 
-@ask_router.post("/ask/database")
-def ask(req: AskRequest, db: Session = Depends(get_db)):
-    response = run_conversation(req.question, top_k=3, db=db)
-    if not response:
-        vector_store = FAISS.load_local(str(VECTOR_DIR), embeddings, allow_dangerous_deserialization=True,)
-        responses = ask_llm(req.question, vectorstore=vector_store, top_k=10)
-        responses = [r.metadata for r in responses]
-
-        unique_titles = set()
-        response = []
-        for res in responses:
+# 결과는 공지 단위로 접어 서로 다른 공지 k 개 (utils.vector_index.search_diverse). 비우면 MMR 안 함
+GROUP_BY = "notice_title"
+ASK_MMR_LAMBDA = float(os.getenv("ASK_MMR_LAMBDA")) if os.getenv("ASK_MMR_LAMBDA") else None
+
+
+def hit_answers(hits) -> List[dict]:
+    return merge_answers([{"notice_title": doc.metadata.get("notice_title"), "url": doc.metadata.get("url")} for doc, _ in hits])
+
+
+async def vector_answer(question: str, snapshot: Optional[IndexSnapshot], top_k: int = 10, shortcut: bool = True) -> List[dict]:
+    """하이브리드(BM25 + 벡터) 검색으로 서로 다른 공지 top_k 개 (shortcut=False: keyword_search 는 이미 확인함)"""
+    if snapshot is None:
+        return []
+    hits = await ahybrid_search(
+        snapshot.store, snapshot.lexical, question, k=top_k, group_by=GROUP_BY, mmr_lambda=ASK_MMR_LAMBDA, shortcut=shortcut,
+    )
+    return hit_answers(hits)
+
+
+FILTERED_TOP_K = int(os.getenv("FILTERED_TOP_K", "20"))
+
+
+async def filtered_answer(question: str, filters: Dict[str, object], snapshot: Optional[IndexSnapshot]) -> List[dict]:
+    """조건(min_gpa/grade/status + 신청 기간)에 맞는 청크 안에서만 하이브리드 검색 (LLM·DB 호출 없음)
+
+    조건 열(filters.npz)이 없는 예전 인덱스면 빈 결과 → 호출 측이 DB 조회로 대체.
+    조건 열·저장소·BM25 는 같은 snapshot 에서 꺼내야 위치/id 가 맞는다.
+    """
+    if snapshot is None or snapshot.filters is None:
+        return []
+    selection = snapshot.filters.select(**filters)
+    hits = await ahybrid_search(
+        snapshot.store, snapshot.lexical, question, k=FILTERED_TOP_K, selection=selection, group_by=GROUP_BY, mmr_lambda=ASK_MMR_LAMBDA,
+    )
+    return hit_answers(hits)
+
+
+def merge_answers(*results: Optional[List[dict]]) -> List[dict]:
+    """앞선 결과 우선으로 공지 제목 기준 병합"""
+    unique_titles = set()
+    merged = []
+    for result in results:
+        for res in result or []:
             if res["notice_title"] not in unique_titles:
                 unique_titles.add(res["notice_title"])
-                response.append({"notice_title": res["notice_title"], "url": res["url"]})
-        return response
-    else:
-        return response
\ No newline at end of file
+                merged.append(res)
+    return merged
+
+
+async def answer_question(question: str, route: QueryRoute, db: AsyncSession, snapshot: Optional[IndexSnapshot]) -> List[dict]:
+    # async 경로: LLM/임베딩/DB 대기 중 스레드를 잡지 않음 (upstream 별 한도·타임아웃은 utils.upstream)
+    if route.mode == "vector":
+        return await vector_answer(question, snapshot, shortcut=False)  # ask() 가 BM25 단축 경로를 이미 시도함
+    if route.mode == "structured":
+        try:
+            response = await filtered_answer(question, route.filters, snapshot)
+        except Exception as e:
+            logger.warning(f"[ASK] 인덱스 조건 검색 실패 – DB 조회로 대체: {e!r}")
+            response = None
+        if response:
+            return response
+        try:
+            response = await afilter_documents_api(**route.filters, db=db)
+        except Exception as e:
+            logger.warning(f"[ASK] 조건 검색 실패 – 벡터 검색으로 대체: {e!r}")
+            response = None
+        return response or await vector_answer(question, snapshot)
+
+    # 조건 검색 의도가 불분명하면 tool-calling 과 벡터 검색을 동시에 실행
+    structured_response, vector_response = await asyncio.gather(
+        arun_conversation(question, db=db), vector_answer(question, snapshot), return_exceptions=True,
+    )
+    if isinstance(structured_response, BaseException):
+        logger.warning(f"[ASK] tool-calling 실패 – 벡터 결과만 반환: {structured_response!r}")
+        structured_response = None
+    if isinstance(vector_response, BaseException):
+        raise vector_response
+    return merge_answers(structured_response, vector_response)
+
+
+@ask_router.post("/ask/database")
+async def ask(req: AskRequest, db: AsyncSession = Depends(get_async_db)):
+    # LLM 없이 질문을 분류해 필요한 경로만 실행 (utils.query_router)
+    route = route_question(req.question)
+    scope = f"{route.mode}:{sorted(route.filters.items())}"  # 필터가 다르면 비슷한 질문이어도 재사용하지 않음
+
+    cached = answer_cache.get(req.question, scope)
+    if cached is not None:
+        return cached
+    vector = None
+    # 인덱스 재로드 확인(디스크·SQLite), BM25, 캐시 유사도 계산은 이벤트 루프 밖에서
+    snapshot = await asyncio.to_thread(index_holder.snapshot)  # 요청 안에서는 이 버전만 사용
+    vector_store = snapshot.store if snapshot is not None else None
+    if route.mode == "vector" and snapshot is not None:
+        # 키워드 질의를 BM25 만으로 답할 수 있으면 임베딩 호출 없이 반환
+        hits = await asyncio.to_thread(keyword_search, snapshot.store, snapshot.lexical, req.question, k=10, group_by=GROUP_BY)
+        if hits:
+            response = hit_answers(hits)
+            answer_cache.put(req.question, response, scope)
+            return response
+    if vector_store is not None and hasattr(vector_store.embedding_function, "aembed_query"):
+        # 벡터 검색도 이 임베딩을 쓰므로 (질의 LRU) 추가 API 호출 없음
+        vector = await vector_store.embedding_function.aembed_query(req.question)
+    cached = await asyncio.to_thread(answer_cache.get_similar, vector, scope)
+    if cached is not None:
+        return cached
+
+    start = time.perf_counter()
+    response = await answer_question(req.question, route, db, snapshot)
+    if response:
+        answer_cache.put(req.question, response, scope, vector, cost_ms=(time.perf_counter() - start) * 1000)
+    return response
+
+
+@ask_router.get("/ask/cache/stats")
+async def answer_cache_stats():
+    """답변 캐시 적중률·절약 시간 (threshold 튜닝용)"""
+    return answer_cache.stats()
+
+
+class BatchSearchRequest(BaseModel):
+    queries: List[str]
+    top_k: int = 5
+    score_threshold: Optional[float] = None  # 코사인 유사도 하한
+    mmr_lambda: Optional[float] = None       # 주면 MMR 로 공지 다양화 (1 이면 관련도만)
+
+
+@ask_router.post("/ask/search/batch")
+async def search_batch(req: BatchSearchRequest):
+    """여러 질의를 임베딩·검색 한 번씩으로 처리 (목록 화면용). 질의별 공지 목록을 같은 순서로 반환"""
+    vector_store = await asyncio.to_thread(index_holder.get)
+    if vector_store is None or not req.queries:
+        return [[] for _ in req.queries]
+    # 검색 단계에서 공지 단위로 접으므로 질의마다 서로 다른 공지 top_k 개 (모자랄 때만 재검색)
+    hits = await asearch_many_diverse(
+        vector_store, req.queries, k=req.top_k, group_by=GROUP_BY, mmr_lambda=req.mmr_lambda, score_threshold=req.score_threshold,
+    )
+    return [
+        [{"notice_title": doc.metadata.get("notice_title"), "url": doc.metadata.get("url"), "score": round(score, 4)} for doc, score in query_hits]
+        for query_hits in hits
+    ]
+
+
+class AskStreamRequest(BaseModel):
+    question: str
+    top_k: int = 5
+    messages: List[Dict[str, str]] = []  # 이전 대화 [{"role", "content"}]
+
+
+def sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def stream_answer(req: AskStreamRequest) -> AsyncIterator[str]:
+    """sources(검색 결과) → token(답변 조각) … → done 순서의 SSE 이벤트"""
+    snapshot = await asyncio.to_thread(index_holder.snapshot)
+    hits = await ahybrid_search(snapshot.store, snapshot.lexical, req.question, k=req.top_k) if snapshot is not None else []
+    sources = hit_answers(hits)
+    yield sse("sources", sources)  # 검색이 끝나자마자 첫 바이트 전송
+
+    try:
+        async for token in astream_solar(req.question, [doc.page_content for doc, _ in hits], req.messages):
+            yield sse("token", {"text": token})
+    except Exception as e:
+        logger.warning(f"[ASK] 답변 스트리밍 실패: {e!r}")
+        yield sse("error", {"message": "답변 생성에 실패했습니다."})
+        return
+    yield sse("done", {})
+
+
+@ask_router.post("/ask/stream")
+async def ask_stream(req: AskStreamRequest):
+    """검색된 공지를 먼저 보내고 solar-pro 답변을 토큰 단위로 스트리밍 (text/event-stream)"""
+    return StreamingResponse(
+        stream_answer(req),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},  # 프록시 버퍼링 방지
+    )
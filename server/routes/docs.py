@@ -4,11 +4,13 @@ from pydantic import BaseModel
 from typing import Optional
 from datetime import date
 from fastapi import HTTPException
-from db.db import SessionLocal, Document
-from sqlalchemy import or_, desc
+from db.db import SessionLocal, Document, document_hash
+from sqlalchemy.exc import IntegrityError
+from db.query import PAGE_SORTS, document_page_stmt, eligible_documents, page_cursor
 
-import json
-from fastapi import Query
+import os
+from typing import Literal
+from fastapi import Query, Response
 
 doc_router = APIRouter()
 
@@ -19,12 +21,39 @@ def get_db():
     finally:
         db.close()
 
-@doc_router.get("/documents")
-def get_all_documents(db: Session = Depends(get_db)):
-    docs = db.query(Document).all()
+# ───────── 목록 (keyset 페이지) ─────────
+# 한 번에 최대 PAGE_SIZE 행. 본문은 예전처럼 JSON 배열(앱의 List<ScholarshipResponse>), 다음 페이지 커서는 헤더로
+# (앱은 X-Next-Cursor 가 없을 때까지 after 로 이어서 요청).
+# 목록 열만 읽으므로 content 는 DB 에서 가져오지 않는다.
+PAGE_SIZE = int(os.getenv("DOCUMENTS_PAGE_SIZE", "100"))
+PAGE_SIZE_MAX = int(os.getenv("DOCUMENTS_PAGE_SIZE_MAX", "500"))
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
 
-    return [
-        {
+LIST_COLUMNS = (Document.id, Document.title, Document.link, Document.gpa, Document.start_date, Document.end_date, Document.status, Document.grade)
+
+
+def document_page(db: Session, response: Response, to_item, sort: str, after: Optional[str], limit: int) -> list:
+    """한 페이지 조회, 다음 페이지가 있으면 X-Next-Cursor 헤더를 단다"""
+    try:
+        rows = db.execute(document_page_stmt(LIST_COLUMNS, sort, after, limit + 1)).all()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if len(rows) > limit:
+        response.headers[NEXT_CURSOR_HEADER] = page_cursor(rows[limit - 1], sort)
+    return [to_item(row) for row in rows[:limit]]
+
+
+@doc_router.get("/documents")
+def get_all_documents(
+    response: Response,
+    limit: int = Query(PAGE_SIZE, ge=1, le=PAGE_SIZE_MAX),
+    after: Optional[str] = None,  # 이전 응답의 X-Next-Cursor
+    sort: Literal[PAGE_SORTS] = "id",
+    db: Session = Depends(get_db),
+):
+    return document_page(
+        db, response,
+        lambda doc: {
             "id": doc.id,
             "title": doc.title,
             "link": doc.link,
@@ -34,34 +63,31 @@ def get_all_documents(db: Session = Depends(get_db)):
             "end_date": doc.end_date,
             "status": doc.status,
             "grade": doc.grade,
-        }
-        for doc in docs
-    ]
+        },
+        sort, after, limit,
+    )
 
 @doc_router.get("/documents/titles")
-def get_document_titles(db: Session = Depends(get_db)):
-    docs = db.query(
-        Document.title,
-        Document.link,
-        Document.start_date,
-        Document.end_date,
-        Document.status,
-        Document.grade,
-        Document.gpa
-    ).all()
-    
-    return [
-        {
-            "title": title,
-            "link": link,
-            "start_date": start_date,
-            "end_date": end_date,
-            "status": status,
-            "grade": grade,
-            "gpa": gpa
-        }
-        for title, link, start_date, end_date, status, grade, gpa in docs
-    ]
+def get_document_titles(
+    response: Response,
+    limit: int = Query(PAGE_SIZE, ge=1, le=PAGE_SIZE_MAX),
+    after: Optional[str] = None,
+    sort: Literal[PAGE_SORTS] = "id",
+    db: Session = Depends(get_db),
+):
+    return document_page(
+        db, response,
+        lambda doc: {
+            "title": doc.title,
+            "link": doc.link,
+            "start_date": doc.start_date,
+            "end_date": doc.end_date,
+            "status": doc.status,
+            "grade": doc.grade,
+            "gpa": doc.gpa
+        },
+        sort, after, limit,
+    )
 
 
 class DocumentCreate(BaseModel):
@@ -87,7 +113,11 @@ def create_document(doc: DocumentCreate, db: Session = Depends(get_db)):
         grade=doc.grade,
     )
     db.add(new_doc)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Document already exists")
     db.refresh(new_doc)
     return {"success": True, "document_id": new_doc.id}
 
@@ -169,6 +199,8 @@ def create_sample_documents(db: Session = Depends(get_db)):
 
     created_docs = []
     for doc in sample_docs:
+        if db.query(Document.id).filter(Document.content_hash == document_hash(doc["link"], doc["content"])).first():
+            continue  # 이미 넣은 샘플
         new_doc = Document(
             title=doc["title"],
             link=doc["link"],
@@ -196,39 +228,4 @@ def filter_documents(
     status: Optional[str] = None,  # "재학" 또는 "휴학"
     db: Session = Depends(get_db)
 ):
-    query = db.query(Document)
-    conditions = []
-
-    # min_gpa와 grade 조건을 OR로 처리하고 null 값도 포함
-    if min_gpa is not None:
-        # GPA가 null이거나 입력한 min_gpa 이상인 경우를 포함
-        conditions.append(or_(Document.gpa >= min_gpa, Document.gpa.is_(None)))
-    if grade is not None:
-        # grade가 null이거나 입력한 grade 이상인 경우를 포함
-        conditions.append(or_(Document.grade >= grade, Document.grade.is_(None)))
-    if conditions:
-        query = query.filter(or_(*conditions))
-
-    # status 조건은 AND로 처리 (null 포함하지 않음)
-    if status is not None:
-        query = query.filter(Document.status == status)
-    
-    # 날짜 조건도 AND로 추가
-    query = query.filter(Document.start_date <= date.today())
-    query = query.filter(Document.end_date >= date.today())
-
-    # 정렬 조건 추가 (GPA 높은 순, 학년 낮은 순)
-    query = query.order_by(desc(Document.gpa), Document.grade)
-
-    docs = query.all()
-    # 중복 제거를 위해 딕셔너리 사용
-    unique_docs = {}
-    for d in docs:
-        if d.title not in unique_docs:
-            unique_docs[d.title] = {
-                "notice_title": d.title,
-                "url": d.link
-            }
-    
-    # 딕셔너리의 값들만 리스트로 변환
-    return list(unique_docs.values())
+    return eligible_documents(db, min_gpa=min_gpa, grade=grade, status=status)
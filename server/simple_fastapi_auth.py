@@ -16,27 +16,39 @@ import json
 import logging
 import mimetypes
 import os
-from dataclasses import dataclass
+import sys
+import threading
+from dataclasses import dataclass, field
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, List, Optional
 from urllib.parse import urljoin
 
-from db.db import SessionLocal, Document  # DB 세션 및 모델
+from db.db import SessionLocal, Document, document_hash  # DB 세션 및 모델
+from sqlalchemy.exc import IntegrityError
+from utils.jobs import CrawlJob, JobManager
+from utils.frontier import CrawlFrontier, article_id
+from utils.http_cache import ValidatorStore, request_key
+from utils.parse_cache import ParseCache
+from utils.pipeline import HostRateLimiter, StagedPipeline
+from utils.condition_extract import EXTRACT_BATCH_SIZE, ConditionBatcher, extract_conditions_batch, rule_only
+from utils.ann import AnnConfig
+from utils.doc_text import chunk_document, derive_content
+from utils.embeddings import get_embeddings
+from utils.chunk_filters import CONDITION_KEYS, condition_metadata
+from utils.vector_index import IndexHolder, add_chunks, chunk_id, compact, delete_by_urls, delete_stale, is_cosine, iter_docs, update_metadata
 
 
 # ───────── 외부 라이브러리 ─────────
 import requests
 from bs4 import BeautifulSoup
 from dotenv import load_dotenv
-from fastapi import FastAPI, HTTPException, BackgroundTasks
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_upstage import UpstageEmbeddings
+from fastapi import FastAPI, HTTPException
+from pydantic import BaseModel
 from langchain_community.vectorstores import FAISS
 from requests.adapters import HTTPAdapter
 from requests.exceptions import HTTPError, ReadTimeout
 from urllib3.util import Retry
-from openai import OpenAI
 
 # ───────── 환경설정 ─────────
 load_dotenv()
@@ -61,8 +73,26 @@ LIST_URL = f"{BASE_URL}/bbs/cse/2605/artclList.do"
 SUPPORTED_EXTENSIONS = (".pdf", ".hwp", ".hwpx", ".docx", ".ppt", ".pptx")
 KEYWORD = "장학"
 CATEGORY_SEQ = "4229"
-MAX_PAGES = 1
+# frontier(마지막으로 처리한 글)에서 멈추므로 페이지 한도를 늘려도 평소 새로고침은 느려지지 않음
+MAX_PAGES = int(os.getenv("CRAWL_MAX_PAGES", "5"))
 MAX_NOTICES = 8  # 처리할 공지 개수 확대
+BACKFILL_CHUNK_PAGES = int(os.getenv("CRAWL_BACKFILL_CHUNK_PAGES", "3"))  # backfill 체크포인트 간격
+
+# ───────── 파이프라인 설정 ─────────
+# 단계별 동시 워커 수 (persist 는 DB 쓰기·ID 발급을 직렬화하기 위해 1 권장)
+STAGE_WORKERS = {
+    "detail": int(os.getenv("CRAWL_DETAIL_WORKERS", "4")),
+    "download": int(os.getenv("CRAWL_DOWNLOAD_WORKERS", "4")),
+    "parse": int(os.getenv("CRAWL_PARSE_WORKERS", "4")),
+    # extract 워커는 대부분 배치가 찰 때까지 대기하므로 배치 크기만큼 둠 (utils.condition_extract)
+    "extract": int(os.getenv("CRAWL_EXTRACT_WORKERS", str(EXTRACT_BATCH_SIZE))),
+    "persist": 1,
+}
+# 호스트당 초당 최대 요청 수 (0 이면 제한 없음)
+HOST_RATE_LIMIT = float(os.getenv("CRAWL_HOST_RATE", "5"))
+HOST_RATE_OVERRIDES = {
+    "api.upstage.ai": float(os.getenv("UPSTAGE_HOST_RATE", "2")),
+}
 
 # ───────── 장학금 룰 (예시) ─────────
 SCHOLARSHIP_RULES = {
@@ -79,18 +109,17 @@ class AttachmentDoc:
     content_html: str
     content_text: str
     matched_rules: List[str]
+    segments: List[list] = field(default_factory=list)  # 요소별 [시작, 끝, 페이지, id] (utils.doc_text)
+    conditions: Optional[Dict[str, Optional[str]]] = None  # 추출 조건 (청크 메타데이터로 복사)
 
-parsed_notices: Dict[int, Dict] = {}
-next_notice_id: int = 1
-next_attach_id: int = 1
+# 수집 상태(공지/첨부 ID, 결과)는 모듈 전역이 아니라 각 CrawlJob 이 소유한다.
 
 # ───────── Embedding & FAISS ─────────
-embeddings = UpstageEmbeddings(
-    model="solar-embedding-1-large",
-    upstage_api_key=UPSTAGE_API_KEY,
-)
-vector_store: FAISS | None = None
+embeddings = get_embeddings("solar-embedding-1-large")  # 공용 서비스 (utils.embeddings 캐시)
 VECTOR_DIR = Path("./faiss_index")
+# 검색은 index_holder.get() (시작 시 한 번 로드, 새 버전 게시 시 원자적 교체)
+index_holder = IndexHolder(VECTOR_DIR, embeddings, ann=AnnConfig.from_env())
+index_lock = threading.Lock()  # 인덱스 쓰기(추가/삭제/compaction) 직렬화
 
 # ───────── 해시 저장소 ─────────
 HASH_FILE = Path("known_hashes.json")
@@ -99,13 +128,36 @@ if HASH_FILE.exists():
 else:
     known_hashes: set[str] = set()
 
+hash_lock = threading.Lock()  # known_hashes 는 파이프라인 워커들이 함께 접근
+
 def save_known_hashes():
-    HASH_FILE.write_text(json.dumps(list(known_hashes), ensure_ascii=False, indent=2))
+    with hash_lock:
+        data = json.dumps(list(known_hashes), ensure_ascii=False, indent=2)
+    HASH_FILE.write_text(data)
+
+# ───────── Document-Parse 캐시 ─────────
+# sha256 → Document-Parse JSON + full_html/full_text/segments + 추출 조건.
+# 크래시·DB/인덱스 초기화 후에도 API 재호출 없이 재구성할 수 있다.
+PARSE_CACHE_DIR = Path(os.getenv("PARSE_CACHE_DIR", "./parse_cache"))
+PARSE_CACHE_MAX_MB = int(os.getenv("PARSE_CACHE_MAX_MB", "512"))
+parse_cache = ParseCache(PARSE_CACHE_DIR, max_bytes=PARSE_CACHE_MAX_MB * 1024 * 1024)
+
+# ───────── 조건부 요청 validator ─────────
+# URL 별 ETag / Last-Modified / Content-Length, 첨부 sha256, 목록 행 시그니처 저장
+VALIDATOR_FILE = Path(os.getenv("HTTP_VALIDATOR_FILE", "http_validators.json"))
+validators = ValidatorStore(VALIDATOR_FILE)
+
+# ───────── 크롤 frontier ─────────
+# 키워드/카테고리별 마지막 처리 글 id + backfill 체크포인트
+FRONTIER_FILE = Path(os.getenv("CRAWL_FRONTIER_FILE", "crawl_frontier.json"))
+frontier = CrawlFrontier(FRONTIER_FILE)
 
 # ───────── Session & Retry ─────────
 retry_policy = Retry(total=2, backoff_factor=1.5, allowed_methods={"POST"}, status_forcelist=[502, 503, 504])
 session = requests.Session()
-session.mount("https://", HTTPAdapter(max_retries=retry_policy))
+session.mount("https://", HTTPAdapter(max_retries=retry_policy, pool_maxsize=max(10, sum(STAGE_WORKERS.values()))))
+rate_limiter = HostRateLimiter(HOST_RATE_LIMIT, HOST_RATE_OVERRIDES)
+embeddings.before_request = lambda: rate_limiter.wait("https://api.upstage.ai/v1/embeddings")  # Upstage 한도 공유
 
 # ───────── 유틸 ─────────
 
@@ -127,9 +179,11 @@ def call_upstage(file_name: str, file_bytes: bytes) -> dict:
     api_url = "https://api.upstage.ai/v1/document-digitization"
     headers = {"Authorization": f"Bearer {UPSTAGE_API_KEY}"}
     files = {"document": (file_name, file_bytes, guess_mime(file_name))}
-    data = {"model": "document-parse"}
+    # 요소별 text/markdown 도 받아 HTML 재파싱 없이 본문 생성 (utils.doc_text)
+    data = {"model": "document-parse", "output_formats": "['html', 'text', 'markdown']"}
 
     try:
+        rate_limiter.wait(api_url)
         resp = session.post(api_url, headers=headers, files=files, data=data, timeout=(10, 180))
         resp.raise_for_status()
         return resp.json()
@@ -152,279 +206,684 @@ def match_rules(text: str) -> List[str]:
 
 # ───────── 크롤러 ─────────
 
-def crawl_and_parse(keyword: str = KEYWORD, max_pages: int = MAX_PAGES, max_notices: int = MAX_NOTICES) -> None:
-    """장학 카테고리 + 제목 검색 크롤러"""
-    global next_notice_id, next_attach_id
+@dataclass
+class AttachmentTask:
+    """파이프라인 단계 사이를 흘러가는 첨부파일 작업 단위"""
+    notice_id: int
+    notice_title: str
+    detail_url: str
+    file_name: str
+    file_url: str
+    file_bytes: bytes = b""
+    f_hash: str = ""
+    full_html: str = ""
+    full_text: str = ""
+    segments: List[list] = field(default_factory=list)
+    conditions: Optional[Dict[str, Optional[str]]] = None
+
+
+def fetch(method: str, url: str, **kwargs) -> requests.Response:
+    """호스트별 rate limit 을 지키며 요청"""
+    rate_limiter.wait(url)
+    resp = session.request(method, url, **kwargs)
+    resp.raise_for_status()
+    return resp
+
+
+def conditional_fetch(method: str, url: str, key: Optional[str] = None, **kwargs) -> Optional[requests.Response]:
+    """key 의 validator 로 조건부 요청. 변경이 없으면(304 / 동일 validator) 본문을 받지 않고 None 반환"""
+    if key is None:
+        return fetch(method, url, **kwargs)
+    headers = {**kwargs.pop("headers", {}), **validators.conditional_headers(key)}
+    resp = fetch(method, url, headers=headers, stream=True, **kwargs)
+    if validators.is_unchanged(key, resp):
+        resp.close()
+        return None
+    return resp
+
+
+def row_signature(title: str, href: str, row) -> str:
+    """목록 행 시그니처 (조회수처럼 자주 바뀌는 칸은 제외: 제목·링크·작성일·첨부 여부)"""
+    parts = [title, href]
+    if row is not None:
+        date_cell = row.select_one("td._artclTdRdate")
+        parts.append(date_cell.get_text(strip=True) if date_cell else "")
+        parts.append(str(len(row.select("td._artclTdAtchFile img, td._artclTdAtchFile a"))))
+    return sha256_bytes("\x1f".join(parts).encode("utf-8"))
+
+
+def cached_content(entry: Dict) -> tuple[str, str, List[list]]:
+    """파싱 캐시 항목의 (full_html, full_text, segments)
+
+    segments 가 없는 예전 항목(HTML 에서 뽑은 텍스트)은 저장된 Document-Parse 결과로 다시 만든다.
+    """
+    if "segments" in entry and entry.get("full_text"):
+        return entry["full_html"], entry["full_text"], entry["segments"]
+    return derive_content(entry.get("result") or {})
+
+
+def persist_document(task: AttachmentTask) -> None:
+    """DB에 문서 저장 (조건 값이 잘못된 경우 조건 없이 저장)"""
+    cond = task.conditions or {}
+    db = SessionLocal()
+    try:
+        new_doc = Document(
+            title=task.notice_title,
+            link=task.detail_url,
+            content=task.full_text,
+            gpa=float(cond["gpa"]) if cond.get("gpa") else None,
+            start_date=datetime.strptime(cond["start_date"], "%Y-%m-%d") if cond.get("start_date") else None,
+            end_date=datetime.strptime(cond["end_date"], "%Y-%m-%d") if cond.get("end_date") else None,
+            status=cond.get("status") or None,
+            grade=int(cond["grade"]) if cond.get("grade") else None,
+        )
+        db.add(new_doc)
+        db.commit()
+        logger.info(f"✅ DB 저장 완료: {task.notice_title}")
+    except IntegrityError:
+        db.rollback()
+        logger.info(f"⏭️ 이미 저장된 문서: {task.notice_title}")  # 같은 링크·본문 (content_hash 유니크)
+    except Exception:
+        try:
+            db.rollback()
+            db.add(Document(title=task.notice_title, link=task.detail_url, content=task.full_text))
+            db.commit()
+            logger.info(f"✅ DB 저장 완료: {task.notice_title}")
+        except Exception as e:
+            logger.error(f"❌ DB 저장 실패: {e}")
+    finally:
+        db.close()
+
+
+def record_attachment(job: CrawlJob, task: AttachmentTask, save_db: bool = True) -> None:
+    """첨부파일 결과를 job 에 추가하고 DB 저장 후 해시 기록 (호출은 직렬화되어야 함)"""
+    matched = match_rules(task.full_text)
+    if matched:
+        logger.info(f"🔔 알림 매칭: {matched} – {task.file_name}")
+    else:
+        logger.info(f"⚪ 조건 미일치: {task.file_name}")
+
+    job.notices[task.notice_id]["attachments"].append(
+        AttachmentDoc(id=job.next_attach_id, file_name=task.file_name, content_html=task.full_html, content_text=task.full_text, matched_rules=matched, segments=task.segments, conditions=task.conditions)
+    )
+    if save_db:
+        persist_document(task)
+    job.next_attach_id += 1
+    with hash_lock:
+        known_hashes.add(task.f_hash)
+
+
+def update_frontier(keyword: str, notice_articles: Dict[int, tuple[int, str]], failed_notices: set[int], contiguous: bool) -> None:
+    """frontier 를 실패 없이 처리된 가장 최신 글까지 전진
+
+    contiguous: 이번 실행이 이전 frontier(또는 목록 끝)까지 빈틈없이 읽었는지 여부.
+    중간에 max_notices/max_pages 로 끊겼다면 건너뛴 글이 생기므로 전진하지 않는다.
+    (frontier 가 없던 첫 실행은 그대로 기준점으로 삼고, 더 과거 글은 backfill 이 담당)
+    실패한 글이 있으면 그보다 오래된 글까지만 전진해 다음 실행에서 다시 시도한다.
+    """
+    if not notice_articles:
+        return
+    if not contiguous:
+        logger.info("[FRONTIER] 처리 한도로 중단 – frontier 유지")
+        return
+    failed_ids = [aid for nid, (aid, _) in notice_articles.items() if nid in failed_notices]
+    ok = [(aid, url) for nid, (aid, url) in notice_articles.items() if nid not in failed_notices]
+    if failed_ids:
+        ok = [(aid, url) for aid, url in ok if aid < min(failed_ids)]
+    if ok:
+        aid, url = max(ok)
+        frontier.advance(keyword, CATEGORY_SEQ, aid, url)
+        frontier.save()
+        logger.info(f"[FRONTIER] {keyword}: {aid}")
+
+
+def crawl_and_parse(
+    keyword: str = KEYWORD,
+    max_pages: int = MAX_PAGES,
+    max_notices: int = MAX_NOTICES,
+    job: Optional[CrawlJob] = None,
+    start_page: int = 1,
+    use_frontier: bool = True,
+) -> CrawlJob:
+    """장학 카테고리 + 제목 검색 크롤러
+
+    목록 → 상세 → 다운로드 → 파싱 → 조건 추출 → 저장 단계를 ``StagedPipeline`` 으로 겹쳐 실행한다.
+    단계별 동시 실행 수는 ``STAGE_WORKERS``, 호스트별 요청 속도는 ``HOST_RATE_LIMIT`` 로 조절한다.
+    수집 결과와 ID 카운터는 ``job`` 이 소유하며, 없으면 새로 만들어 반환한다.
+
+    use_frontier 이면 목록을 최신순으로 읽다가 이미 처리한 글(frontier 이하 id)을 만나면 멈춘다.
+    backfill 은 use_frontier=False, start_page 로 과거 페이지를 나눠 읽는다.
+    """
+    if job is None:
+        job = CrawlJob(keyword=keyword)
+    parsed_notices = job.notices
+    last_seen = frontier.last_seen(keyword, CATEGORY_SEQ) if use_frontier else 0
+    reached_frontier = False
+    notice_articles: Dict[int, tuple[int, str]] = {}  # notice_id → (글 id, url)
 
     headers = {"User-Agent": "Mozilla/5.0"}
-    logger.info("[START] 크롤링 시작")
-
-    page = 1
-    while page <= max_pages and len(parsed_notices) < max_notices:
-        payload = {"srchColumn": "sj", "srchWrd": keyword, "bbsClSeq": CATEGORY_SEQ, "page": str(page), "isViewMine": "false"}
-        resp = session.post(LIST_URL, headers=headers, data=payload, timeout=15)
-        resp.raise_for_status()
-        soup = BeautifulSoup(resp.text, "html.parser")
-
-        articles = soup.select("td._artclTdTitle a.artclLinkView")
-        if not articles:
-            break
-        logger.info(f"[INFO] page {page} - 글 {len(articles)}개")
-
-        for a in articles:
-            if len(parsed_notices) >= max_notices:
-                break
-
-            row = a.find_parent("tr")
-            if row and any(cls.startswith("headline") for cls in (row.get("class") or [])):
-                logger.info(f"[SKIP] 고정공지: {a.get_text(strip=True)}")
-                continue
-
-            notice_title = a.get_text(strip=True)
-            detail_url = urljoin(BASE_URL, a["href"])
-            logger.info(f"[INFO] 처리 중(공지): {notice_title}")
-
-            notice_id = next_notice_id
-            parsed_notices[notice_id] = {"title": notice_title, "url": detail_url, "attachments": []}
-
-            next_notice_id += 1
-
-            try:
-                detail_resp = session.get(detail_url, headers=headers, timeout=15)
-                detail_resp.raise_for_status()
-                detail_soup = BeautifulSoup(detail_resp.text, "html.parser")
-            except Exception as e:
-                logger.error(f"[ERROR] 상세 페이지 오류: {e}")
+    inflight_hashes: set[str] = set()  # 이번 실행에서 처리 중인 해시 (동일 파일 동시 처리 방지)
+    # 공지 처리 결과: 실패 없이 끝난 공지만 validator 에 "done" 으로 기록해 다음 실행에서 건너뜀
+    state_lock = threading.Lock()
+    failed_notices: set[int] = set()
+    finished_details: Dict[int, Dict] = {}
+    page_notices: Dict[str, List[int]] = {}
+    condition_batcher = ConditionBatcher()  # extract 워커들의 요청을 모아 한 번에 추출
+
+    def release_hash(task: AttachmentTask) -> None:
+        with hash_lock:
+            inflight_hashes.discard(task.f_hash)
+
+    def fail(task: AttachmentTask) -> None:
+        release_hash(task)
+        with state_lock:
+            failed_notices.add(task.notice_id)
+
+    # ── 저장 (단일 워커: DB 쓰기·ID 발급·해시 기록 직렬화) ──
+    def persist_stage(task: AttachmentTask) -> None:
+        try:
+            record_attachment(job, task)
+        except Exception:
+            fail(task)
+            raise
+        finally:
+            release_hash(task)
+
+    # ── 조건 추출 ──
+    def extract_stage(task: AttachmentTask) -> None:
+        try:
+            task.conditions = condition_batcher.extract(task.full_text, task.notice_title)
+        except Exception as e:
+            logger.error(f"❌ 조건 추출 실패: {task.file_name} – {e}")
+        if task.conditions is None:
+            fail(task)
+            return
+        parse_cache.update(task.f_hash, conditions=task.conditions)
+        pipeline.submit("persist", persist_stage, task)
+
+    # ── Upstage 변환 ──
+    def parse_stage(task: AttachmentTask) -> None:
+        logger.info(f"📤 Upstage 요청 시작 ▶ {task.file_name}")
+        try:
+            result_json = call_upstage(task.file_name, task.file_bytes)
+        except (ReadTimeout, HTTPError):  # call_upstage 에서 로깅
+            fail(task)
+            return
+        except Exception as e:
+            logger.error(f"[ERROR] Upstage 요청 실패: {task.file_name} – {e}")
+            fail(task)
+            return
+        task.file_bytes = b""  # 메모리 해제
+
+        task.full_html, task.full_text, task.segments = derive_content(result_json)
+        parse_cache.put(task.f_hash, {
+            "file_name": task.file_name,
+            "notice_title": task.notice_title,
+            "url": task.detail_url,
+            "result": result_json,
+            "full_html": task.full_html,
+            "full_text": task.full_text,
+            "segments": task.segments,
+            "conditions": None,
+        })
+        job.bump("attachments_parsed")
+        pipeline.submit("extract", extract_stage, task)
+
+    # ── 첨부 다운로드 + SHA-256 중복 검사 ──
+    def download_stage(task: AttachmentTask) -> None:
+        # 이미 처리한 파일(sha256 기록 있음)만 조건부 요청 – 304 면 본문 다운로드 생략
+        prev_hash = validators.get(task.file_url).get("sha256")
+        with hash_lock:
+            use_validators = prev_hash in known_hashes
+        try:
+            file_resp = conditional_fetch("GET", task.file_url, key=task.file_url if use_validators else None, headers=headers, timeout=30)
+        except Exception as e:
+            logger.error(f"[ERROR] 파일 다운로드 실패: {task.file_name} – {e}")
+            with state_lock:
+                failed_notices.add(task.notice_id)
+            return
+        if file_resp is None:
+            logger.info(f"[SKIP] 변경 없는 첨부(304): {task.file_name}")
+            return
+
+        task.file_bytes = file_resp.content
+        task.f_hash = sha256_bytes(task.file_bytes)
+        validators.record(task.file_url, file_resp, sha256=task.f_hash)
+        job.bump("attachments_downloaded")
+        with hash_lock:
+            if task.f_hash in known_hashes or task.f_hash in inflight_hashes:
+                logger.info(f"[SKIP] 중복 파일: {task.file_name}")
+                return
+            inflight_hashes.add(task.f_hash)
+
+        # 이전에 파싱해 둔 결과가 있으면 Upstage 호출 없이 재사용
+        cached = parse_cache.get(task.f_hash)
+        if cached:
+            logger.info(f"[CACHE] 파싱 결과 재사용: {task.file_name}")
+            task.file_bytes = b""
+            task.full_html, task.full_text, task.segments = cached_content(cached)
+            task.conditions = cached.get("conditions")
+            job.bump("attachments_parsed")
+            if task.conditions:
+                pipeline.submit("persist", persist_stage, task)
+            else:
+                pipeline.submit("extract", extract_stage, task)
+            return
+        pipeline.submit("parse", parse_stage, task)
+
+    # ── 상세 페이지 ──
+    def detail_stage(notice_id: int, notice_title: str, detail_url: str, signature: str) -> None:
+        done_before = validators.get(detail_url).get("done", False)
+        try:
+            detail_resp = conditional_fetch("GET", detail_url, key=detail_url if done_before else None, headers=headers, timeout=15)
+        except Exception as e:
+            logger.error(f"[ERROR] 상세 페이지 오류: {e}")
+            with state_lock:
+                failed_notices.add(notice_id)
+            return
+        with state_lock:
+            finished_details[notice_id] = {"url": detail_url, "row": signature, "resp": detail_resp}
+        if detail_resp is None:
+            logger.info(f"[SKIP] 변경 없는 공지(304): {notice_title}")
+            return
+        detail_soup = BeautifulSoup(detail_resp.text, "html.parser")
+
+        attachments = detail_soup.select('dl.artclForm dd.artclInsert li a[href*="/download.do"]')
+        if not attachments:
+            logger.info("[SKIP] 첨부 없음")
+            return
+
+        for file_link in attachments:
+            file_name = file_link.get_text(strip=True)
+            if not file_name.lower().endswith(SUPPORTED_EXTENSIONS):
+                logger.warning(f"[SKIP] 미지원 포맷: {file_name}")
                 continue
+            task = AttachmentTask(
+                notice_id=notice_id,
+                notice_title=notice_title,
+                detail_url=detail_url,
+                file_name=file_name,
+                file_url=urljoin(detail_url, file_link["href"]),
+            )
+            pipeline.submit("download", download_stage, task)
 
-            attachments = detail_soup.select('dl.artclForm dd.artclInsert li a[href*="/download.do"]')
-            if not attachments:
-                logger.info("[SKIP] 첨부 없음")
+    logger.info("[START] 크롤링 시작")
+    job.stage = "crawl"
+    with StagedPipeline(STAGE_WORKERS) as pipeline:
+        # ── 목록 페이지 (메인 스레드에서 순회하며 상세 단계로 넘김) ──
+        page = start_page
+        while page < start_page + max_pages and len(parsed_notices) < max_notices and not reached_frontier:
+            payload = {"srchColumn": "sj", "srchWrd": keyword, "bbsClSeq": CATEGORY_SEQ, "page": str(page), "isViewMine": "false"}
+            list_key = request_key(LIST_URL, payload)
+            # 이전 실행에서 페이지의 모든 공지를 끝까지 처리했을 때만 조건부 요청
+            complete = validators.get(list_key).get("complete", False)
+            resp = conditional_fetch("POST", LIST_URL, key=list_key if complete else None, headers=headers, data=payload, timeout=15)
+            if resp is None:
+                logger.info(f"[SKIP] page {page} 변경 없음(304)")
+                if use_frontier:
+                    break  # 최신 페이지가 그대로면 새 글 없음
+                job.bump("pages")
+                page += 1
                 continue
+            validators.record(list_key, resp)
+            page_notices[list_key] = []
+            soup = BeautifulSoup(resp.text, "html.parser")
 
-            for file_link in attachments:
-                file_name = file_link.get_text(strip=True)
-                if not file_name.lower().endswith(SUPPORTED_EXTENSIONS):
-                    logger.warning(f"[SKIP] 미지원 포맷: {file_name}")
-                    continue
+            articles = soup.select("td._artclTdTitle a.artclLinkView")
+            if not articles:
+                reached_frontier = True  # 목록 끝
+                break
+            logger.info(f"[INFO] page {page} - 글 {len(articles)}개")
+            job.bump("pages")
 
-                file_url = urljoin(detail_url, file_link["href"])
-                try:
-                    file_resp = session.get(file_url, headers=headers, timeout=30)
-                    file_resp.raise_for_status()
-                except Exception as e:
-                    logger.error(f"[ERROR] 파일 다운로드 실패: {file_name} – {e}")
-                    continue
+            for a in articles:
+                if len(parsed_notices) >= max_notices:
+                    break
 
-                f_hash = sha256_bytes(file_resp.content)
-                if f_hash in known_hashes:
-                    logger.info(f"[SKIP] 중복 파일: {file_name}")
+                row = a.find_parent("tr")
+                if row and any(cls.startswith("headline") for cls in (row.get("class") or [])):
+                    logger.info(f"[SKIP] 고정공지: {a.get_text(strip=True)}")
                     continue
 
-                # ── Upstage 변환 요청 ──
-                logger.info(f"📤 Upstage 요청 시작 ▶ {file_name}")
-                try:
-                    result_json = call_upstage(file_name, file_resp.content)
-                except (ReadTimeout, HTTPError):
+                notice_title = a.get_text(strip=True)
+                detail_url = urljoin(BASE_URL, a["href"])
+                aid = article_id(a["href"])
+                if last_seen and aid is not None and aid <= last_seen:
+                    logger.info(f"[STOP] frontier 도달: {notice_title} (id {aid} ≤ {last_seen})")
+                    reached_frontier = True
+                    break
+                signature = row_signature(notice_title, a["href"], row)
+                prev = validators.get(detail_url)
+                if prev.get("done") and prev.get("row") == signature:
+                    logger.info(f"[SKIP] 변경 없는 공지: {notice_title}")
                     continue
-
-                html_segments = [elem["content"]["html"] for elem in result_json.get("elements", []) if "content" in elem and "html" in elem["content"]]
-                full_html = "\n".join(html_segments) or "<p>(빈 문서)</p>"
-
-                text_segments = [BeautifulSoup(h, "html.parser").get_text(" ", strip=True) for h in html_segments]
-                full_text = "\n".join(filter(None, text_segments)) or "(빈 문서)"
-
-                # 파일에서 장학금 조건 추출
-                client = OpenAI(
-                    api_key=UPSTAGE_API_KEY,
-                    base_url="https://api.upstage.ai/v1"
-                )
-                prompt = f"""Extract scholarship conditions from the following text:
-                {full_text}
-                Return the conditions in csv format including min_gpa,start_date,end_date,grade,status.
-                min_gpa is a float number between 0 and 4.5 inclusive.
-                min_gpa is the minimum GPA required for the scholarship.
-                start_date and end_date are date strings in YYYY-MM-DD format.
-                start_date is the start date of application period of the scholarship.
-                end_date is the end date of application period of the scholarship.
-                grade is an integer between 1 and 4.
-                grade is the attending year of the student.
-                status is a string that can be 재학 or 휴학.
-                if min_gpa is not found, return an empty string.
-                if start date is not found, return an empty string.
-                if end date is not found, return an empty string.
-                if grade is not found, return an empty string.
-                if status is not found, return an empty string.
-                the following is an example of the response:
-                min_gpa: 2.5, start_date: 2024-03-01, end_date: 2024-08-31, grade: 1, status: 재학
-                Do not include any other text in the response.
-                """
-                response = client.chat.completions.create(
-                    model="solar-pro2-preview",
-                    messages=[{"role": "user", "content": prompt}]
-                )
-                conditions = response.choices[0].message.content
-     
-                if conditions:
-                    try:
-                        import re
-
-                        pattern_gpa = r"min_gpa:\s*([\d.]+)"
-                        match = re.search(pattern_gpa, conditions)
-
-                        try:
-                            gpa = match.group(1)
-                        except:
-                            gpa = None
-
-                        pattern_start_date = r"start_date:\s*([\d-]+)"
-                        match = re.search(pattern_start_date, conditions)
-
-                        try:
-                            start_date = match.group(1)
-                        except:
-                            start_date = None
-
-                        pattern_end_date = r"end_date:\s*([\d-]+)"
-                        match = re.search(pattern_end_date, conditions)
-
-                        try:
-                            end_date = match.group(1)
-                        except:
-                            end_date = None
-
-                        pattern_grade = r"grade:\s*(\d+)"
-                        match = re.search(pattern_grade, conditions)
-
-                        try:
-                            grade = match.group(1)
-                        except:
-                            grade = None
-
-                        pattern_status = r"status:\s*(\S+)"
-                        match = re.search(pattern_status, conditions)
-
-                        try:
-                            status = match.group(1)
-                        except:
-                            status = None
-
-                        
-                    except Exception as e:
-                        logger.error(f"❌ 조건 파싱 실패: {e}")
-                        continue
-
-                matched = match_rules(full_text)
-                if matched:
-                    logger.info(f"🔔 알림 매칭: {matched} – {file_name}")
-                else:
-                    logger.info(f"⚪ 조건 미일치: {file_name}")
-
-                parsed_notices[notice_id]["attachments"].append(
-                    AttachmentDoc(id=next_attach_id, file_name=file_name, content_html=full_html, content_text=full_text, matched_rules=matched)
-                )
-                # DB에 문서 저장
-                try:
-                    db = SessionLocal()
-                    new_doc = Document(
-                        title=notice_title,
-                        link=detail_url,
-                        content=full_text,
-                        gpa=float(gpa) if gpa else None,
-                        start_date=datetime.strptime(start_date, "%Y-%m-%d") if start_date else None,
-                        end_date=datetime.strptime(end_date, "%Y-%m-%d") if end_date else None,
-                        status=status if status else None,
-                        grade=int(grade) if grade else None,
-                    )
-                    db.add(new_doc)
-                    db.commit()
-                    logger.info(f"✅ DB 저장 완료: {notice_title}")
-                except Exception as e:
-                    try:
-                        db.rollback()
-                        db = SessionLocal()
-                        new_doc = Document(
-                            title=notice_title,
-                            link=detail_url,
-                            content=full_text,
-                            gpa=None,
-                            start_date=None,
-                            end_date=None,
-                            status=None,
-                            grade=None,
-                        )
-                        db.add(new_doc)
-                        db.commit()
-                        logger.info(f"✅ DB 저장 완료: {notice_title}")
-                    except Exception as e:
-                        logger.error(f"❌ DB 저장 실패: {e}")
-                finally:
-                    db.close()
-                next_attach_id += 1
-                known_hashes.add(f_hash)
-        page += 1
-
+                logger.info(f"[INFO] 처리 중(공지): {notice_title}")
+
+                notice_id = job.next_notice_id
+                parsed_notices[notice_id] = {"title": notice_title, "url": detail_url, "attachments": []}
+                job.next_notice_id += 1
+                job.bump("notices")
+                page_notices[list_key].append(notice_id)
+                if aid is not None:
+                    notice_articles[notice_id] = (aid, detail_url)
+
+                pipeline.submit("detail", detail_stage, notice_id, notice_title, detail_url, signature)
+            page += 1
+
+    # ── 실패 없이 끝난 공지/페이지만 validator 에 완료로 기록 ──
+    for notice_id, meta in finished_details.items():
+        if notice_id not in failed_notices:
+            validators.record(meta["url"], meta["resp"], row=meta["row"], done=True)
+    for list_key, notice_ids in page_notices.items():
+        complete = all(nid in finished_details and nid not in failed_notices for nid in notice_ids)
+        validators.record(list_key, complete=complete)
+    validators.save()
+    if use_frontier:
+        update_frontier(keyword, notice_articles, failed_notices, reached_frontier or not last_seen)
     save_known_hashes()
+    return job
 
 # ───────── FAISS 인덱싱 ─────────
 
-def build_faiss_index() -> None:
-    """새 문서만 인덱스에 추가하거나, 인덱스가 없으면 새로 생성"""
-    global vector_store
+def build_faiss_index(job: CrawlJob, rebuild: bool = False) -> None:
+    """job 이 수집한 문서 중 인덱스에 없는 청크만 임베딩해 추가 (인덱스가 없거나 rebuild 면 새로 생성)
 
+    같은 첨부(url, 파일명)의 이전 버전 청크는 삭제해 갱신된 공지가 중복으로 남지 않게 한다.
+    """
+    parsed_notices = job.notices
     if not parsed_notices:
         logger.warning("빌드할 문서가 없습니다.")
         return
 
-    splitter = RecursiveCharacterTextSplitter(chunk_size=1024, chunk_overlap=256)
-
     # 1️⃣ 새로 수집된 모든 텍스트 청크 수집
     new_texts: List[str] = []
     new_metas: List[dict] = []
 
     for notice in parsed_notices.values():
         for attach in notice["attachments"]:
-            for chunk in splitter.split_text(attach.content_html):
+            # 태그 없는 본문을 나누고 오프셋·페이지·요소 범위·추출 조건을 메타데이터에 기록
+            conditions = condition_metadata(attach.conditions)
+            for chunk, span in chunk_document(attach.content_text, attach.segments):
                 new_texts.append(chunk)
                 new_metas.append({
                     "notice_title": notice["title"],
                     "attachment_id": attach.id,
                     "file_name": attach.file_name,
-                    "url": notice.get("url"), 
-                })  
+                    "url": notice.get("url"),
+                    **span,
+                    **conditions,
+                })
 
     if not new_texts:
         logger.info("[FAISS] 추가할 청크 없음 – 저장 스킵")
         return
 
-    # 2️⃣ 기존 인덱스 로드 or 새 인덱스 생성
-    if VECTOR_DIR.exists():
-        logger.info("[FAISS] 기존 인덱스 로드")
-        vector_store = FAISS.load_local(str(VECTOR_DIR), embeddings, allow_dangerous_deserialization=True,)
-        vector_store.add_texts(new_texts, metadatas=new_metas)
-    else:
-        logger.info("[FAISS] 새 인덱스 생성")
-        vector_store = FAISS.from_texts(texts=new_texts, embedding=embeddings, metadatas=new_metas)
+    with index_lock:
+        # 2️⃣ 기존 인덱스 로드 (없거나 rebuild 면 새로 생성)
+        store = None if rebuild else index_holder.load_for_write()
+        logger.info("[FAISS] 기존 인덱스 로드" if store is not None else "[FAISS] 새 인덱스 생성")
+        if store is not None and not is_cosine(store):
+            store = compact(store)  # 예전 L2 인덱스 → 코사인
+
+        # 3️⃣ 새 청크만 임베딩·추가 후 같은 첨부의 이전 버전 청크 삭제
+        store, embedded = add_chunks(store, new_texts, new_metas, embeddings)
+        keep_ids = {chunk_id(m["url"], t) for t, m in zip(new_texts, new_metas)}
+        removed = delete_stale(store, {(m["url"], m["file_name"]) for m in new_metas}, keep_ids)
+        updated = update_metadata(store, new_texts, new_metas)  # 조건만 바뀐 기존 청크
+        if not embedded and not removed and not updated and not rebuild and store.index.ntotal:
+            logger.info("[FAISS] 변경 없음 – 저장 스킵")
+            return
+
+        # 4️⃣ 새 버전으로 저장 후 검색용 인덱스 교체
+        index_holder.publish(store)
+    job.bump("chunks_embedded", embedded)
+    logger.info(f"[✅ FAISS] 청크 {embedded}개 임베딩, {removed}개 삭제, 메타데이터 {updated}개 갱신 – 총 {store.index.ntotal}개")
+
+
+def remove_notices_from_index(urls: set[str]) -> int:
+    """삭제된 공지의 벡터 제거 후 저장"""
+    with index_lock:
+        store = index_holder.load_for_write()
+        if store is None:
+            return 0
+        removed = delete_by_urls(store, urls)
+        if removed:
+            index_holder.publish(store)
+    logger.info(f"[FAISS] 공지 {len(urls)}개의 청크 {removed}개 삭제")
+    return removed
+
+
+def compact_faiss_index() -> Dict[str, int]:
+    """중복 벡터를 합친 인덱스로 교체 (재임베딩 없음)"""
+    with index_lock:
+        store = index_holder.load_for_write()
+        if store is None:
+            return {"before": 0, "after": 0}
+        before = store.index.ntotal
+        store = compact(store)
+        index_holder.publish(store)
+    return {"before": before, "after": store.index.ntotal}
+
+
+def ensure_cosine_index() -> None:
+    """예전 L2 인덱스면 코사인(정규화 내적) 인덱스로 변환해 게시 (저장된 벡터 사용, 재임베딩 없음)"""
+    store = index_holder.get()
+    if store is None or is_cosine(store):
+        return
+    logger.info("[FAISS] L2 인덱스 → 코사인 인덱스 변환")
+    compact_faiss_index()
+
+
+def _db_conditions(doc: Document) -> Dict[str, Optional[str]]:
+    return {
+        "gpa": str(doc.gpa) if doc.gpa is not None else None,
+        "grade": str(doc.grade) if doc.grade is not None else None,
+        "status": doc.status,
+        "start_date": doc.start_date.isoformat() if doc.start_date else None,
+        "end_date": doc.end_date.isoformat() if doc.end_date else None,
+    }
+
+
+def backfill_condition_metadata() -> int:
+    """조건 메타데이터가 없는 예전 청크에 DB 문서의 조건을 채워 게시 (재임베딩 없음)
+
+    같은 링크의 문서가 여럿이면(첨부별 행) 청크 본문을 포함하는 행, 없으면 첫 행을 쓴다.
+    게시 때 모든 청크에 조건 키가 있었다고 기록된 버전(filters.npz 의 complete)이면 청크를 읽지 않고 바로 끝낸다.
+    """
+    snapshot = index_holder.snapshot()
+    if snapshot is None or (snapshot.filters is not None and snapshot.filters.complete):
+        return 0
+    with index_lock:
+        store = index_holder.load_for_write()
+        if store is None:
+            return 0
+        missing = [doc for _, _, doc in iter_docs(store) if any(key not in doc.metadata for key in CONDITION_KEYS)]
+        if not missing:
+            return 0
+        db = SessionLocal()
+        try:
+            rows: Dict[str, List[Document]] = {}
+            for row in db.query(Document).filter(Document.link.in_({doc.metadata.get("url") for doc in missing})):
+                rows.setdefault(row.link, []).append(row)
+        finally:
+            db.close()
+        for doc in missing:
+            candidates = rows.get(doc.metadata.get("url")) or []
+            row = next((r for r in candidates if r.content and doc.page_content in r.content), candidates[0] if candidates else None)
+            doc.metadata = {**doc.metadata, **condition_metadata(_db_conditions(row) if row is not None else None)}
+        index_holder.publish(store)
+    logger.info(f"[FAISS] 청크 {len(missing)}개에 조건 메타데이터 추가")
+    return len(missing)
+
+# ───────── 캐시 재구성 ─────────
+
+def document_exists(task: AttachmentTask) -> bool:
+    db = SessionLocal()
+    try:
+        return db.query(Document.id).filter(Document.content_hash == document_hash(task.detail_url, task.full_text)).first() is not None
+    finally:
+        db.close()
+
+
+def rebuild_from_cache(job: CrawlJob, extract: bool = False) -> CrawlJob:
+    """Document-Parse 캐시만으로 DB 문서와 job 상태를 재구성 (네트워크 호출 없음)
+
+    DB에 이미 같은 링크·본문의 문서가 있으면 DB 저장만 건너뛰고 인덱싱 대상에는 포함한다.
+    조건이 캐시에 없는 항목은 규칙 추출(rule_only)로 채우고, extract 면 남은 항목을 solar-pro 로 일괄 추출한다.
+    그래도 조건이 없는 항목은 크롤링 경로처럼 저장하지 않는다 (해시도 기록하지 않아 다음 크롤링에서 다시 시도).
+    """
+    job.stage = "replay"
+    notice_ids: Dict[str, int] = {}
+    tasks: List[AttachmentTask] = []
+    for entry in parse_cache.iter_entries():
+        url = entry.get("url") or ""
+        if url not in notice_ids:
+            notice_ids[url] = job.next_notice_id
+            job.notices[job.next_notice_id] = {"title": entry.get("notice_title", ""), "url": url, "attachments": []}
+            job.next_notice_id += 1
+            job.bump("notices")
+
+        task = AttachmentTask(
+            notice_id=notice_ids[url],
+            notice_title=entry.get("notice_title", ""),
+            detail_url=url,
+            file_name=entry.get("file_name", ""),
+            file_url="",
+            f_hash=entry["sha256"],
+            conditions=entry.get("conditions"),
+        )
+        task.full_html, task.full_text, task.segments = cached_content(entry)
+        job.bump("attachments_parsed")
+        tasks.append(task)
+
+    # 조건이 없는 항목: 규칙 추출 → (extract 면) 남은 항목만 배치 추출
+    for task in tasks:
+        if task.conditions is None:
+            task.conditions = rule_only(task.full_text, task.notice_title)
+            if task.conditions is not None:
+                parse_cache.update(task.f_hash, conditions=task.conditions)
+    missing = [task for task in tasks if task.conditions is None]
+    if missing and extract:
+        try:
+            extracted = extract_conditions_batch([task.full_text for task in missing], [task.notice_title for task in missing])
+        except Exception as e:
+            logger.error(f"❌ 조건 추출 실패: {e}")
+            extracted = [None] * len(missing)
+        for task, conditions in zip(missing, extracted):
+            task.conditions = conditions
+            if conditions is not None:
+                parse_cache.update(task.f_hash, conditions=conditions)
+
+    skipped = 0
+    for task in tasks:
+        if task.conditions is None:
+            skipped += 1
+            continue
+        record_attachment(job, task, save_db=not document_exists(task))
+    save_known_hashes()
+    logger.info(f"[CACHE] 재구성 완료: 공지 {len(job.notices)}개" + (f", 조건 없는 첨부 {skipped}개 보류" if skipped else ""))
+    return job
+
+# ───────── Backfill ─────────
+
+def run_backfill(job: CrawlJob, chunk_pages: int = BACKFILL_CHUNK_PAGES) -> None:
+    """frontier 를 무시하고 전체 과거 목록을 chunk_pages 단위로 수집·인덱싱
+
+    청크마다 다음 페이지를 체크포인트로 저장하므로 중단돼도 이어서 진행한다.
+    (최신순 목록이라 도중에 새 글이 올라오면 글이 뒤 페이지로 밀려 중복될 뿐 누락되지 않음)
+    """
+    checkpoint = frontier.backfill_checkpoint(job.keyword, CATEGORY_SEQ)
+    page = 1 if checkpoint.get("done") else checkpoint.get("next_page", 1)
+    while True:
+        logger.info(f"[BACKFILL] {job.keyword}: page {page}~{page + chunk_pages - 1}")
+        pages_before = job.progress["pages"]
+        job.notices.clear()
+        crawl_and_parse(job.keyword, max_pages=chunk_pages, max_notices=sys.maxsize, job=job, start_page=page, use_frontier=False)
+        job.stage = "index"
+        build_faiss_index(job)
+
+        finished = job.progress["pages"] - pages_before < chunk_pages
+        page += chunk_pages
+        frontier.set_backfill_checkpoint(job.keyword, CATEGORY_SEQ, next_page=1 if finished else page, done=finished)
+        frontier.save()
+        if finished:
+            logger.info(f"[BACKFILL] 완료: {job.keyword}")
+            return
+
+# ───────── 작업 큐 ─────────
+
+REBUILD_MODES = ("rebuild", "rebuild-extract")  # rebuild-extract: 조건 없는 캐시 항목을 LLM 으로 추출
+
+
+def run_crawl_job(job: CrawlJob) -> None:
+    """작업 큐 워커에서 실행: 크롤링(또는 캐시 재구성) 후 인덱싱"""
+    if job.mode in REBUILD_MODES:
+        rebuild_from_cache(job, extract=job.mode == "rebuild-extract")
+        job.stage = "index"
+        build_faiss_index(job, rebuild=True)
+        return
+    if job.mode == "backfill":
+        run_backfill(job)
+        return
+    crawl_and_parse(job.keyword, job=job)
+    job.stage = "index"
+    build_faiss_index(job)
+
 
-    # 3️⃣ 저장
-    vector_store.save_local(str(VECTOR_DIR))
-    logger.info(f"[✅ FAISS] {len(new_texts)}개 청크 저장 완료")
+job_manager = JobManager(run_crawl_job)
 
 # ───────── API ───────── ─────────
 
-@scholarship_router.post("/notices/refresh")
-def refresh_notices(background_tasks: BackgroundTasks, keyword: str = KEYWORD):
-    parsed_notices.clear()
-    global next_notice_id, next_attach_id
-    next_notice_id = 1
-    next_attach_id = 1
-    try:
-        crawl_and_parse(keyword)
-        # 인덱싱은 백그라운드 태스크로 실행해 응답 속도 향상
-        background_tasks.add_task(build_faiss_index)
-        return {"status": "success", "notices": len(parsed_notices)}
-    except Exception as e:
-        raise HTTPException(500, str(e))
+@scholarship_router.post("/notices/refresh", status_code=202)
+def refresh_notices(keyword: str = KEYWORD):
+    """크롤링 작업을 큐에 넣고 바로 job id 반환 (같은 키워드 작업이 진행 중이면 합침)"""
+    job, created = job_manager.enqueue(keyword)
+    return {"status": job.status, "job_id": job.id, "coalesced": not created}
+
+
+@scholarship_router.post("/notices/backfill", status_code=202)
+def backfill_notices(keyword: str = KEYWORD):
+    """전체 과거 목록 수집 작업 등록 (체크포인트에서 이어서 진행)"""
+    job, created = job_manager.enqueue(keyword, mode="backfill")
+    return {"status": job.status, "job_id": job.id, "coalesced": not created}
+
+
+@scholarship_router.post("/notices/rebuild-from-cache", status_code=202)
+def rebuild_notices_from_cache(extract: bool = False):
+    """Document-Parse 캐시로 DB·FAISS 인덱스를 재구성하는 작업 등록 (extract 면 조건 없는 항목을 LLM 으로 추출)"""
+    job, created = job_manager.enqueue("", mode="rebuild-extract" if extract else "rebuild")
+    return {"status": job.status, "job_id": job.id, "coalesced": not created}
+
+
+class RemoveNoticesRequest(BaseModel):
+    urls: List[str]
+
+
+@scholarship_router.post("/notices/index/remove")
+def remove_notices(req: RemoveNoticesRequest):
+    """삭제된 공지의 벡터를 인덱스에서 제거"""
+    return {"removed": remove_notices_from_index(set(req.urls))}
+
+
+@scholarship_router.post("/notices/index/compact")
+def compact_index():
+    """중복 벡터 정리 (이전 버전 인덱스의 청크 id 마이그레이션 포함)"""
+    return compact_faiss_index()
+
+
+@scholarship_router.get("/notices/jobs/{job_id}")
+def get_refresh_job(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(404, "Job not found")
+    return job.to_dict()
 
 # ───────── (옵션) 서버 기동 시 자동 수집 ─────────
 # crawl_and_parse()
+
+if __name__ == "__main__":
+    # python simple_fastapi_auth.py rebuild-from-cache [--extract]
+    if sys.argv[1:2] == ["rebuild-from-cache"] and set(sys.argv[2:]) <= {"--extract"}:
+        run_crawl_job(CrawlJob(keyword="", mode="rebuild-extract" if "--extract" in sys.argv[2:] else "rebuild"))
+    else:
+        print("usage: python simple_fastapi_auth.py rebuild-from-cache [--extract]")
@@ -0,0 +1,29 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+from langchain_core.embeddings import Embeddings
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+class FakeEmbeddings(Embeddings):
+    """본문 해시로 고정된 난수 벡터 (원격 호출 없음)"""
+
+    dim = 16
+
+    def _vector(self, text: str):
+        seed = int.from_bytes(text.encode("utf-8")[:8].ljust(8, b"\0"), "little") ^ len(text)
+        return np.random.default_rng(seed).standard_normal(self.dim).tolist()
+
+    def embed_documents(self, texts):
+        return [self._vector(t) for t in texts]
+
+    def embed_query(self, text):
+        return self._vector(text)
+
+
+@pytest.fixture
+def fake_embeddings():
+    return FakeEmbeddings()
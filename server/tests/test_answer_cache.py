@@ -0,0 +1,67 @@
+from datetime import date, timedelta
+
+import utils.answer_cache as answer_cache
+from utils.answer_cache import AnswerCache, normalize_question
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_normalize_question():
+    assert normalize_question("국가근로장학금  마감일?") == "국가근로장학금 마감일"
+    assert normalize_question("ＧＰＡ 3.5 이상!") == "gpa 3.5 이상"
+
+
+def test_exact_and_similar_hits_respect_scope():
+    cache = AnswerCache(threshold=0.9)
+    cache.put("국가근로 마감일?", ["a"], "vector", vector=[1.0, 0.0])
+    assert cache.get("국가근로  마감일", "vector") == ["a"]
+    assert cache.get("국가근로 마감일", "structured") is None
+    assert cache.get_similar([0.99, 0.05], "vector") == ["a"]
+    assert cache.get_similar([0.99, 0.05], "structured") is None
+    assert cache.get_similar([0.0, 1.0], "vector") is None
+    stats = cache.stats()
+    assert (stats["exact_hits"], stats["semantic_hits"], stats["misses"]) == (1, 1, 2)
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(answer_cache.time, "monotonic", clock)
+    cache = AnswerCache(ttl=60)
+    cache.put("질문", "답", vector=[1.0])
+    clock.now += 59
+    assert cache.get("질문") == "답"
+    clock.now += 2
+    assert cache.get_similar([1.0]) is None
+    assert cache.get("질문") is None
+
+
+def test_entries_expire_when_the_day_changes(monkeypatch):
+    cache = AnswerCache()
+    cache.put("질문", "답")
+
+    class Tomorrow(date):
+        @classmethod
+        def today(cls):
+            return date.today() + timedelta(days=1)
+
+    monkeypatch.setattr(answer_cache, "date", Tomorrow)
+    assert cache.get("질문") is None
+
+
+def test_invalidate_and_lru_eviction():
+    cache = AnswerCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # a 가 최근 사용
+    cache.put("c", 3)
+    assert cache.get("b") is None and cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+    cache.invalidate("test")
+    assert cache.get("a") is None and cache.stats()["entries"] == 0
@@ -0,0 +1,76 @@
+from datetime import date
+from itertools import product
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from db.db import Base, Document
+from db.query import eligible_documents_stmt
+from utils.chunk_filters import ChunkFilters, condition_metadata
+from utils.vector_index import add_chunks
+
+TODAY = date(2025, 6, 15)
+WINDOWS = {
+    "open": (date(2025, 6, 1), date(2025, 6, 30)),
+    "today": (TODAY, TODAY),
+    "closed": (date(2025, 5, 1), date(2025, 5, 31)),
+    "future": (date(2025, 7, 1), date(2025, 7, 31)),
+    "no end": (date(2025, 6, 1), None),
+}
+ROWS = list(product((None, 3.0, 3.8), (None, 1, 3), (None, "재학", "휴학"), WINDOWS))
+
+
+@pytest.fixture
+def sources(fake_embeddings):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    texts, metas = [], []
+    with Session(engine) as db:
+        for i, (gpa, grade, status, window) in enumerate(ROWS):
+            start, end = WINDOWS[window]
+            db.add(Document(title=f"공지 {i}", link=f"u{i}", content="c", gpa=gpa, grade=grade, status=status, start_date=start, end_date=end))
+            texts.append(f"공지 {i} 본문")
+            metas.append({"url": f"u{i}", **condition_metadata({
+                "gpa": gpa, "grade": grade, "status": status,
+                "start_date": start and start.isoformat(), "end_date": end and end.isoformat(),
+            })})
+        db.commit()
+    store, _ = add_chunks(None, texts, metas, fake_embeddings)
+    return engine, store, ChunkFilters.build(store)
+
+
+@pytest.mark.parametrize("conditions", [
+    {},
+    {"min_gpa": 3.5},
+    {"grade": 2},
+    {"min_gpa": 3.5, "grade": 2},
+    {"status": "재학"},
+    {"min_gpa": 3.0, "grade": 3, "status": "휴학"},
+])
+def test_mask_matches_sql(sources, conditions):
+    engine, store, filters = sources
+    with Session(engine) as db:
+        expected = {link for _, link in db.execute(eligible_documents_stmt(today=TODAY, **conditions))}
+    selection = filters.select(today=TODAY, **conditions)
+    got = {store.docstore.search(doc_id).metadata["url"] for doc_id in selection.ids}
+    assert expected and got == expected
+
+
+def test_round_trip(sources, tmp_path):
+    _, _, filters = sources
+    filters.save(tmp_path)
+    loaded = ChunkFilters.load(tmp_path)
+    assert (loaded.mask(min_gpa=3.5, today=TODAY) == filters.mask(min_gpa=3.5, today=TODAY)).all()
+
+
+def test_complete_flag_marks_chunks_without_conditions(tmp_path, fake_embeddings):
+    store, _ = add_chunks(None, ["새 청크", "예전 청크"], [{"url": "u0", **condition_metadata({})}, {"url": "u1"}], fake_embeddings)
+    filters = ChunkFilters.build(store)
+    assert not filters.complete
+    filters.save(tmp_path)
+    assert not ChunkFilters.load(tmp_path).complete
+
+    store, _ = add_chunks(None, ["새 청크"], [{"url": "u0", **condition_metadata({})}], fake_embeddings)
+    ChunkFilters.build(store).save(tmp_path)
+    assert ChunkFilters.load(tmp_path).complete
@@ -0,0 +1,20 @@
+import utils.condition_extract as condition_extract
+from utils.condition_extract import ConditionBatcher, extract_conditions_batch
+
+
+def test_batcher_runs_rules_once_per_attachment(monkeypatch):
+    calls, requested = [], []
+    rule_conditions = condition_extract.rule_conditions
+    monkeypatch.setattr(condition_extract, "rule_conditions", lambda text, title="": calls.append(text) or rule_conditions(text, title))
+
+    def request(spans, needed, batch):
+        requested.extend(needed[i] for i in batch)
+        return {i: {"id": i} for i in batch}
+
+    monkeypatch.setattr(condition_extract, "_request", request)
+
+    text = "신청 자격: GPA 3.5 이상, 6/23까지 신청"  # 느슨한 날짜 → 기간은 LLM 에
+    result = ConditionBatcher(extract_conditions_batch, max_items=1).extract(text, "장학생 모집")
+    assert result["gpa"] == "3.5"  # 규칙으로 확정한 값
+    assert requested and "min_gpa" not in requested[0]  # 나머지 필드만 LLM 에 물음
+    assert calls == [text]
@@ -0,0 +1,54 @@
+from datetime import date
+
+import pytest
+
+from utils.condition_extract import rule_only
+from utils.condition_rules import RULE_MIN_CONFIDENCE, confident_fields, rule_conditions
+
+TODAY = date(2025, 5, 1)
+
+
+def _values(text, title=""):
+    return confident_fields(rule_conditions(text, title, today=TODAY))
+
+
+def test_title_deadline():
+    fields = _values("", "[장학] 2025.2학기 국가근로장학금 1차 신청 안내(~6.23. 18시)")
+    assert fields["end_date"] == date(2025, 6, 23)
+    assert "start_date" not in fields  # 시작일은 LLM 에 맡김
+
+
+def test_full_range_with_weekday_and_time():
+    fields = _values("학생 신청기간 2025. 5. 23.(금) 09:00 ~ 2025. 6. 23.(월) 18:00까지")
+    assert fields["start_date"] == date(2025, 5, 23)
+    assert fields["end_date"] == date(2025, 6, 23)
+
+
+def test_gpa_threshold():
+    fields = _values("직전학기 GPA 3.5 이상인 재학생")
+    assert fields["min_gpa"] == 3.5
+    assert fields["status"] == "재학"
+
+
+def test_no_dates_is_confident_none():
+    fields = _values("성적 무관, 학년 제한 없음")
+    assert fields["start_date"] is None and fields["end_date"] is None
+
+
+@pytest.mark.parametrize("text", [
+    "신청기간: 6/1 ~ 6/23",
+    "신청기간 06.01 ~ 06.23",
+    "접수 기간 6. 1 ~ 6. 23",
+    "마감: 6/23(월) 18:00",
+])
+def test_unparsed_dates_go_to_llm(text):
+    guesses = rule_conditions(text, today=TODAY)
+    assert guesses["start_date"].confidence < RULE_MIN_CONFIDENCE
+    assert guesses["end_date"].confidence < RULE_MIN_CONFIDENCE
+    assert rule_only(text) is None  # 다섯 필드가 확정되지 않으므로 LLM 호출 대상
+
+
+def test_unparsed_deadline_lowers_confident_range():
+    text = "신청기간 2025. 5. 23.(금) ~ 2025. 6. 23.(월)\n서류 제출 마감: 6/30"
+    guesses = rule_conditions(text, today=TODAY)
+    assert guesses["end_date"].confidence < RULE_MIN_CONFIDENCE
@@ -0,0 +1,52 @@
+from sqlalchemy import create_engine, inspect, text
+
+from db.db import UNIQUE_HASH_INDEX, _migrate_documents, dedupe_documents, document_hash
+
+OLD_SCHEMA = (
+    "CREATE TABLE documents (id INTEGER PRIMARY KEY, title VARCHAR NOT NULL, link VARCHAR, content VARCHAR, "
+    "gpa FLOAT, start_date DATE, end_date DATE, status VARCHAR, grade INTEGER)"
+)
+
+
+def _engine(rows):
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.execute(text(OLD_SCHEMA))
+        conn.execute(text("INSERT INTO documents (id, title, link, content) VALUES (:id, :title, :link, :content)"), rows)
+    return engine
+
+
+def _state(engine):
+    with engine.connect() as conn:
+        ids = [row.id for row in conn.execute(text("SELECT id FROM documents ORDER BY id"))]
+        indexes = {index["name"] for index in inspect(conn).get_indexes("documents")}
+    return ids, indexes
+
+
+def test_startup_migration_never_deletes(caplog):
+    engine = _engine([
+        {"id": 1, "title": "a", "link": "l", "content": "c"},
+        {"id": 2, "title": "a", "link": "l", "content": "c"},
+        {"id": 3, "title": "a", "link": "l", "content": "d"},
+    ])
+    for _ in range(2):  # 여러 번 실행해도 같은 결과
+        with engine.begin() as conn:
+            _migrate_documents(conn)
+    ids, indexes = _state(engine)
+    assert ids == [1, 2, 3]
+    assert UNIQUE_HASH_INDEX not in indexes and "ix_documents_open_window" in indexes
+    assert "중복" in caplog.text
+
+    with engine.begin() as conn:
+        assert dedupe_documents(conn) == 1
+    ids, indexes = _state(engine)
+    assert ids == [1, 3] and UNIQUE_HASH_INDEX in indexes
+
+
+def test_clean_table_gets_unique_index():
+    engine = _engine([{"id": 1, "title": "a", "link": "l", "content": "c"}])
+    with engine.begin() as conn:
+        _migrate_documents(conn)
+        stored = conn.execute(text("SELECT content_hash FROM documents")).scalar()
+    assert stored == document_hash("l", "c")
+    assert UNIQUE_HASH_INDEX in _state(engine)[1]
@@ -0,0 +1,82 @@
+from datetime import date
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from db.db import Base, Document
+from routes.docs import NEXT_CURSOR_HEADER, PAGE_SIZE, doc_router, get_db
+
+END_DATES = [date(2025, 7, 1), None, date(2025, 6, 30), date(2025, 7, 1), None, date(2025, 6, 1), date(2025, 6, 30)]
+
+
+@pytest.fixture
+def client():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        db.add_all(Document(id=i, title=f"공지 {i}", link=f"l{i}", content="c", end_date=end)
+                   for i, end in enumerate(END_DATES, start=1))
+        db.commit()
+
+    def override():
+        with Session() as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(doc_router)
+    app.dependency_overrides[get_db] = override
+    client = TestClient(app)
+    client.session_factory = Session
+    return client
+
+
+def _walk(client, path, sort, limit):
+    seen, after = [], None
+    while True:
+        params = {"sort": sort, "limit": limit}
+        if after:
+            params["after"] = after
+        res = client.get(path, params=params)
+        assert res.status_code == 200
+        seen.extend(res.json())
+        after = res.headers.get(NEXT_CURSOR_HEADER)
+        if after is None:
+            return seen
+
+
+def test_default_page_size(client):
+    with client.session_factory() as db:
+        db.add_all(Document(title=f"추가 {i}", link=f"x{i}", content="c") for i in range(PAGE_SIZE))
+        db.commit()
+    res = client.get("/documents")
+    assert len(res.json()) == PAGE_SIZE
+    after = res.headers[NEXT_CURSOR_HEADER]
+    rest = client.get("/documents", params={"after": after}).json()
+    assert [doc["id"] for doc in rest] == list(range(len(END_DATES), 0, -1))
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 7])
+def test_id_cursor_round_trip(client, limit):
+    assert [doc["id"] for doc in _walk(client, "/documents", "id", limit)] == [7, 6, 5, 4, 3, 2, 1]
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 7])
+def test_end_date_cursor_round_trip(client, limit):
+    docs = _walk(client, "/documents", "end_date", limit)
+    # 마감일 오름차순, 같은 날은 id 순, 마감일 없는 공지는 맨 뒤
+    assert [doc["id"] for doc in docs] == [6, 3, 7, 1, 4, 2, 5]
+    assert [doc["id"] for doc in docs] == [doc["id"] for doc in client.get("/documents", params={"sort": "end_date"}).json()]
+
+
+def test_titles_cursor_round_trip(client):
+    titles = [doc["title"] for doc in _walk(client, "/documents/titles", "end_date", 2)]
+    assert titles == [f"공지 {i}" for i in (6, 3, 7, 1, 4, 2, 5)]
+
+
+def test_invalid_cursor(client):
+    assert client.get("/documents", params={"sort": "end_date", "after": "oops"}).status_code == 400
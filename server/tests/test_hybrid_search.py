@@ -0,0 +1,78 @@
+import asyncio
+
+from langchain_core.documents import Document
+
+import utils.hybrid_search as hybrid
+
+from utils.hybrid_search import hybrid_search, keyword_search, rrf_fuse
+from utils.lexical_index import LexicalIndex, tokenize
+from utils.vector_index import add_chunks
+
+TEXTS = ["푸른등대 기부장학금 신청 안내", "국가근로 장학생 2학기 모집", "지역인재 장학금 선발 공고", "푸른등대 장학생 면접 일정"]
+
+
+def _store(embeddings):
+    metas = [{"url": f"u{i}", "notice_title": f"공지 {i // 2}"} for i in range(len(TEXTS))]
+    store, _ = add_chunks(None, TEXTS, metas, embeddings)
+    lexical = LexicalIndex()
+    lexical.sync(store)
+    return store, lexical
+
+
+def _doc(text, title):
+    return Document(page_content=text, metadata={"url": text, "notice_title": title})
+
+
+def test_tokenize_korean_bigrams():
+    assert tokenize("푸른등대 GPA 3.5") == ["푸른", "른등", "등대", "gpa", "3.5"]
+
+
+def test_bm25_ranks_exact_term_and_respects_allowed(tmp_path):
+    lexical = LexicalIndex()
+    lexical.add(["a", "b", "c"], TEXTS[:3])
+    hits, coverage = lexical.search("국가근로", k=3)
+    assert hits[0][0] == "b" and coverage == 1.0
+    assert lexical.search("국가근로", k=3, allowed={"a", "c"})[0] == []
+
+    lexical.remove(["a"])
+    lexical.save(tmp_path)
+    loaded = LexicalIndex.load(tmp_path)
+    assert loaded.ids == ["b", "c"]
+    assert [doc_id for doc_id, _ in loaded.search("장학", k=3, allowed={"c"})[0]] == ["c"]
+
+
+def test_rrf_prefers_chunks_in_both_rankings():
+    a, b, c = _doc("a", "x"), _doc("b", "y"), _doc("c", "z")
+    fused = rrf_fuse([(a, 0.9), (b, 0.8)], [(b, 5.0), (c, 4.0)], k=3)
+    assert [doc.page_content for doc, _ in fused] == ["b", "a", "c"]
+
+
+def test_rrf_group_by_keeps_first_ranking_representative():
+    first, second = _doc("a1", "x"), _doc("a2", "x")
+    fused = rrf_fuse([(first, 0.9)], [(second, 3.0), (_doc("b", "y"), 2.0)], k=2, group_by="notice_title")
+    assert fused[0][0] is first
+    assert [doc.metadata["notice_title"] for doc, _ in fused] == ["x", "y"]
+
+
+def test_keyword_query_skips_vectors(fake_embeddings):
+    store, lexical = _store(fake_embeddings)
+    hits = keyword_search(store, lexical, "국가근로", k=2)
+    assert hits and hits[0][0].page_content == TEXTS[1]
+    assert keyword_search(store, lexical, "국가근로 장학금은 언제 신청하나요?", k=2) is None
+
+
+def test_hybrid_returns_distinct_groups(fake_embeddings):
+    store, lexical = _store(fake_embeddings)
+    hits = hybrid_search(store, lexical, "장학생 모집은 어떻게 하나요", k=2, group_by="notice_title")
+    assert sorted(doc.metadata["notice_title"] for doc, _ in hits) == ["공지 0", "공지 1"]
+
+
+def test_shortcut_flag_skips_keyword_search(fake_embeddings, monkeypatch):
+    store, lexical = _store(fake_embeddings)
+    calls = []
+    keyword = hybrid.keyword_search
+    monkeypatch.setattr(hybrid, "keyword_search", lambda *args: calls.append(args[2]) or keyword(*args))
+    hits = asyncio.run(hybrid.ahybrid_search(store, lexical, "국가근로", k=2, shortcut=False))
+    assert calls == [] and len(hits) == 2  # RRF 결과 (BM25 단독 결과가 아님)
+    assert asyncio.run(hybrid.ahybrid_search(store, lexical, "국가근로", k=2))[0][0].page_content == TEXTS[1]
+    assert calls == ["국가근로"]
@@ -0,0 +1,31 @@
+from utils.vector_index import IndexHolder, add_chunks
+
+
+def _publish(holder, embeddings, texts):
+    store = holder.load_for_write()
+    metas = [{"url": f"u{i}", "notice_title": t, "file_name": "f", "gpa": 3.0} for i, t in enumerate(texts)]
+    store, _ = add_chunks(store, texts, metas, embeddings)
+    holder.publish(store)
+
+
+def test_snapshot_is_one_version(tmp_path, fake_embeddings):
+    holder = IndexHolder(tmp_path, fake_embeddings)
+    _publish(holder, fake_embeddings, ["국가근로 장학금", "푸른등대 기부장학금"])
+    first = holder.snapshot()
+    _publish(holder, fake_embeddings, ["국가근로 장학금", "푸른등대 기부장학금", "지역인재 장학금"])
+    second = holder.snapshot()
+
+    # 예전 snapshot 은 게시 후에도 자기 버전의 세 자료를 그대로 가진다
+    assert first.version != second.version
+    assert first.store.index.ntotal == len(first.filters) == len(first.lexical) == 2
+    assert second.store.index.ntotal == len(second.filters) == len(second.lexical) == 3
+    assert holder.get() is second.store
+
+
+def test_snapshot_reloads_published_version(tmp_path, fake_embeddings):
+    writer = IndexHolder(tmp_path, fake_embeddings)
+    _publish(writer, fake_embeddings, ["국가근로 장학금"])
+    reader = IndexHolder(tmp_path, fake_embeddings, check_interval=0)
+    snapshot = reader.snapshot()
+    assert snapshot.version == writer.current_version()
+    assert snapshot.filters is not None and snapshot.lexical is not None
@@ -0,0 +1,28 @@
+from utils.jobs import JobManager
+
+
+def _fill(job):
+    job.notices[1] = {"title": "공지", "url": "u", "attachments": ["본문" * 1000]}
+    job.bump("notices")
+
+
+def _fail(job):
+    _fill(job)
+    raise RuntimeError("boom")
+
+
+def test_finished_jobs_keep_only_progress():
+    manager = JobManager(_fill)
+    job, created = manager.enqueue("장학")
+    manager._queue.join()
+    assert created and job.status == "success"
+    assert job.notices == {}
+    assert job.to_dict()["progress"]["notices"] == 1
+
+
+def test_failed_jobs_release_notices():
+    manager = JobManager(_fail)
+    job, _ = manager.enqueue("장학")
+    manager._queue.join()
+    assert job.status == "failed" and job.error == "boom"
+    assert job.notices == {}
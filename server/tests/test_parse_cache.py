@@ -0,0 +1,40 @@
+import os
+
+from utils.parse_cache import ParseCache
+
+SHAS = {name: name * 64 for name in "abc"}
+
+
+def _entry_size(cache, name):
+    return cache.path(SHAS[name]).stat().st_size
+
+
+def test_put_get_update(tmp_path):
+    cache = ParseCache(tmp_path)
+    cache.put(SHAS["a"], {"full_text": "본문"})
+    cache.update(SHAS["a"], conditions={"gpa": "3.5"})
+    entry = cache.get(SHAS["a"])
+    assert entry["full_text"] == "본문" and entry["conditions"] == {"gpa": "3.5"} and entry["sha256"] == SHAS["a"]
+    assert SHAS["a"] in cache and SHAS["b"] not in cache
+    assert ParseCache(tmp_path)._size == _entry_size(cache, "a")
+
+
+def test_corrupt_entry_is_ignored(tmp_path):
+    cache = ParseCache(tmp_path)
+    cache.put(SHAS["a"], {"full_text": "본문"})
+    cache.path(SHAS["a"]).write_text("{", encoding="utf-8")
+    assert cache.get(SHAS["a"]) is None
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = ParseCache(tmp_path, max_bytes=0)
+    for name in "abc":
+        cache.put(SHAS[name], {"full_text": name * 100})
+    for name, mtime in zip("abc", (100, 300, 200)):
+        os.utime(cache.path(SHAS[name]), (mtime, mtime))
+    cache.get(SHAS["a"])  # 조회하면 가장 최근 사용으로
+
+    cache.max_bytes = _entry_size(cache, "a") + _entry_size(cache, "b")
+    cache.evict()
+    assert [name for name in "abc" if SHAS[name] in cache] == ["a", "b"]
+    assert cache._size <= cache.max_bytes
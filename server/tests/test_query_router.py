@@ -0,0 +1,49 @@
+import pytest
+
+from utils.query_router import extract_gpa, extract_grade, extract_status, route_question
+
+
+@pytest.mark.parametrize("question, gpa", [
+    ("학점 3.5인데 받을 수 있는 장학금", 3.5),
+    ("GPA는 3.8 입니다", 3.8),
+    ("평점 4.0 이상 장학금", 4.0),
+    ("3.7/4.5 인데 신청 가능한가요", 3.7),
+    ("3.2점이면 되나요", 3.2),
+    ("2024년 장학금", None),
+    ("국가근로 2학기", None),
+    ("학점 4학점 이상 이수", None),
+    ("1학기 성적 2등급", None),
+])
+def test_extract_gpa(question, gpa):
+    assert extract_gpa(question) == gpa
+
+
+@pytest.mark.parametrize("question, grade", [
+    ("3학년 장학금", 3),
+    ("이 학년 대상", 2),
+    ("신입생 장학금", 1),
+    ("2학기 장학금", None),
+    ("휴학생이 학년 상관없이 받을 수 있는 장학금", None),
+    ("친구와 같이 학년 대표로 신청", None),
+])
+def test_extract_grade(question, grade):
+    assert extract_grade(question) == grade
+
+
+def test_extract_status():
+    assert extract_status("휴학생도 받을 수 있나요") == "휴학"
+    assert extract_status("재학생 장학금") == "재학"
+    assert extract_status("장학금 목록") is None
+
+
+@pytest.mark.parametrize("question, mode, filters", [
+    ("학점 3.5 재학 2학년 장학금", "structured", {"min_gpa": 3.5, "grade": 2, "status": "재학"}),
+    ("제가 받을 수 있는 장학금 있나요", "both", {}),
+    ("휴학생이 학년 상관없이 받을 수 있는 장학금", "structured", {"status": "휴학"}),
+    ("학점 4학점 이상 이수하면 받을 수 있나요", "both", {}),
+    ("지원 자격이 어떻게 되나요", "both", {}),
+    ("푸른등대 장학금 면접 일정", "vector", {}),
+])
+def test_route_question(question, mode, filters):
+    route = route_question(question)
+    assert (route.mode, route.filters) == (mode, filters)
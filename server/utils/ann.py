@@ -0,0 +1,139 @@
+"""
+근사 최근접 이웃(ANN) 인덱스 설정
+--------------------------------
+4096 차원 flat 인덱스는 질의당 O(N·4096) 이라 공지가 쌓일수록 느려진다.
+``FAISS_INDEX_TYPE`` 로 검색용 인덱스 종류를 고른다.
+
+    flat   – 정확 검색 (기본값)
+    ivfpq  – IVF + Product Quantization, 기존 벡터로 학습 / 검색 폭은 FAISS_NPROBE
+             (FAISS_REFINE=k 이면 후보 k·K 개를 원본 벡터로 다시 채점해 PQ 오차 보정)
+    hnsw   – 그래프 기반, 학습 불필요 / 검색 폭은 FAISS_EF_SEARCH
+
+flat 인덱스가 원본이다(삭제·벡터 재사용이 가능). ANN 인덱스는 게시할 때 flat 의 벡터로
+같은 순서(위치 = id)로 만들어 버전 디렉터리에 ``index.ann`` 으로 함께 저장하고, 검색용 로드 때 바꿔 끼운다.
+설정별 recall/지연시간 비교는 ``python -m utils.ann_bench`` 참고.
+"""
+import logging
+import math
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+import faiss
+import numpy as np
+
+logger = logging.getLogger("pnu_parser")
+
+INDEX_TYPES = ("flat", "ivfpq", "hnsw")
+ANN_FILE = "index.ann"
+# IVF 역리스트는 MMAP_IFC 로 열 수 없어 일반 mmap 만 사용
+ANN_MMAP_FLAGS = faiss.IO_FLAG_READ_ONLY | faiss.IO_FLAG_MMAP
+
+
+@dataclass
+class AnnConfig:
+    kind: str = "flat"
+    nlist: int = 0            # IVF 셀 수 (0 이면 벡터 수로 자동 결정)
+    pq_m: int = 64            # PQ 서브벡터 수 (차원의 약수여야 함)
+    pq_bits: int = 8
+    hnsw_m: int = 32
+    ef_construction: int = 80
+    nprobe: int = 16          # IVF 검색 시 살펴볼 셀 수
+    refine: int = 0           # ivfpq 재채점 배수 (0 이면 사용 안 함)
+    ef_search: int = 64       # HNSW 검색 후보 수
+
+    @classmethod
+    def from_env(cls) -> "AnnConfig":
+        kind = os.getenv("FAISS_INDEX_TYPE", "flat").lower()
+        if kind not in INDEX_TYPES:
+            raise ValueError(f"FAISS_INDEX_TYPE 은 {INDEX_TYPES} 중 하나여야 합니다: {kind}")
+        return cls(
+            kind=kind,
+            nlist=int(os.getenv("FAISS_NLIST", "0")),
+            pq_m=int(os.getenv("FAISS_PQ_M", "64")),
+            pq_bits=int(os.getenv("FAISS_PQ_BITS", "8")),
+            hnsw_m=int(os.getenv("FAISS_HNSW_M", "32")),
+            ef_construction=int(os.getenv("FAISS_EF_CONSTRUCTION", "80")),
+            nprobe=int(os.getenv("FAISS_NPROBE", "16")),
+            refine=int(os.getenv("FAISS_REFINE", "0")),
+            ef_search=int(os.getenv("FAISS_EF_SEARCH", "64")),
+        )
+
+
+def auto_nlist(n: int) -> int:
+    """셀당 학습 벡터가 최소 39개는 되도록 ~4·sqrt(N) 로 결정"""
+    return max(1, min(int(4 * math.sqrt(n)), n // 39))
+
+
+def make_faiss_index(dim: int, cfg: Optional[AnnConfig] = None, metric: int = faiss.METRIC_L2) -> faiss.Index:
+    """빈 인덱스 생성 (학습이 필요한 ivfpq 는 벡터가 없으므로 flat 으로 대체)"""
+    cfg = cfg or AnnConfig()
+    if cfg.kind == "hnsw":
+        index = faiss.IndexHNSWFlat(dim, cfg.hnsw_m, metric)
+        index.hnsw.efConstruction = cfg.ef_construction
+        index.hnsw.efSearch = cfg.ef_search
+        return index
+    if cfg.kind == "ivfpq":
+        logger.warning("[ANN] ivfpq 는 학습 벡터가 필요해 빈 인덱스는 flat 으로 생성합니다.")
+    return faiss.IndexFlatIP(dim) if metric == faiss.METRIC_INNER_PRODUCT else faiss.IndexFlatL2(dim)
+
+
+def build_ann_index(vectors: np.ndarray, cfg: AnnConfig, metric: int = faiss.METRIC_L2) -> Optional[faiss.Index]:
+    """vectors 로 학습·추가한 ANN 인덱스 (flat 이거나 학습 데이터가 부족하면 None)"""
+    n, dim = vectors.shape
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    if cfg.kind == "hnsw":
+        index = make_faiss_index(dim, cfg, metric)
+        index.add(vectors)
+        return index
+    if cfg.kind == "ivfpq":
+        nlist = cfg.nlist or auto_nlist(n)
+        if dim % cfg.pq_m or n < 39 * max(nlist, 2 ** cfg.pq_bits):
+            logger.warning(f"[ANN] ivfpq 학습 불가 (N={n}, dim={dim}, pq_m={cfg.pq_m}) – flat 유지")
+            return None
+        quantizer = faiss.IndexFlatIP(dim) if metric == faiss.METRIC_INNER_PRODUCT else faiss.IndexFlatL2(dim)
+        index = faiss.IndexIVFPQ(quantizer, dim, nlist, cfg.pq_m, cfg.pq_bits, metric)
+        if cfg.refine:
+            index = faiss.IndexRefineFlat(index)
+        index.train(vectors)
+        index.add(vectors)
+        faiss.extract_index_ivf(index).make_direct_map()  # 위치로 벡터 복원 (조건 필터 정확 채점, MMR)
+        apply_search_params(index, cfg)
+        return index
+    return None
+
+
+def apply_search_params(index: faiss.Index, cfg: AnnConfig) -> None:
+    """검색 폭(nprobe / efSearch / 재채점 배수) 적용"""
+    if isinstance(index, faiss.IndexRefine):
+        index.k_factor = max(1, cfg.refine)
+        index = faiss.downcast_index(index.base_index)
+    if isinstance(index, faiss.IndexIVF):
+        index.nprobe = cfg.nprobe
+    elif isinstance(index, faiss.IndexHNSW):
+        index.hnsw.efSearch = cfg.ef_search
+
+
+def selector_params(index: faiss.Index, sel: faiss.IDSelector) -> faiss.SearchParameters:
+    """id selector 를 건 검색 파라미터 (인덱스 종류별 nprobe / efSearch / 재채점 배수 유지)"""
+    if isinstance(index, faiss.IndexRefine):
+        params = faiss.IndexRefineSearchParameters()
+        params.k_factor = index.k_factor
+        params.base_index_params = selector_params(faiss.downcast_index(index.base_index), sel)
+    elif isinstance(index, faiss.IndexIVF):
+        params = faiss.SearchParametersIVF()
+        params.nprobe = index.nprobe
+    elif isinstance(index, faiss.IndexHNSW):
+        params = faiss.SearchParametersHNSW()
+        params.efSearch = index.hnsw.efSearch
+    else:
+        params = faiss.SearchParameters()
+    params.sel = sel
+    return params
+
+
+def flat_vectors(index: faiss.Index) -> np.ndarray:
+    """flat 인덱스의 전체 벡터 (위치 순서)"""
+    if index.ntotal == 0:
+        return np.zeros((0, index.d), dtype=np.float32)
+    return index.reconstruct_n(0, index.ntotal)
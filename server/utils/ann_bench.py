@@ -0,0 +1,95 @@
+"""
+ANN 인덱스 오프라인 벤치마크
+--------------------------------
+합성 벡터(가우시안 군집)로 flat 대비 recall@k 와 질의 1건당 p50/p99 지연시간을 측정한다.
+기본은 운영 인덱스(utils.vector_index.new_store)와 같은 코사인 – L2 정규화 벡터 + 내적 인덱스.
+
+    cd server
+    python -m utils.ann_bench                       # 기본: N=20000, dim=4096, metric=ip
+    python -m utils.ann_bench --n 50000 --dim 1024 --k 10 --metric l2
+"""
+import argparse
+import time
+from typing import List, Tuple
+
+import faiss
+import numpy as np
+
+from utils.ann import AnnConfig, apply_search_params, auto_nlist, build_ann_index, make_faiss_index
+
+
+def synthetic_vectors(n: int, dim: int, n_clusters: int = 64, seed: int = 0) -> np.ndarray:
+    """실제 임베딩처럼 군집을 이루는 벡터 생성"""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(n_clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, n_clusters, size=n)
+    return centers[labels] + 0.35 * rng.normal(size=(n, dim)).astype(np.float32)
+
+
+def timed_search(index: faiss.Index, queries: np.ndarray, k: int) -> Tuple[np.ndarray, List[float]]:
+    """질의를 한 건씩 검색해 결과와 지연시간(ms) 목록 반환"""
+    ids = np.empty((len(queries), k), dtype=np.int64)
+    latencies = []
+    for i, q in enumerate(queries):
+        start = time.perf_counter()
+        _, ids[i] = index.search(q[None, :], k)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return ids, latencies
+
+
+def recall_at_k(found: np.ndarray, truth: np.ndarray) -> float:
+    k = truth.shape[1]
+    return float(np.mean([len(set(f) & set(t)) / k for f, t in zip(found, truth)]))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="flat / ivfpq / hnsw recall·지연시간 비교")
+    parser.add_argument("--n", type=int, default=20000, help="인덱스 벡터 수")
+    parser.add_argument("--dim", type=int, default=4096, help="벡터 차원 (solar-embedding-1-large = 4096)")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--metric", choices=("ip", "l2"), default="ip", help="ip: 정규화 벡터 내적(운영과 같은 코사인)")
+    parser.add_argument("--pq-m", type=int, default=64)
+    args = parser.parse_args()
+
+    metric = faiss.METRIC_INNER_PRODUCT if args.metric == "ip" else faiss.METRIC_L2
+    data = synthetic_vectors(args.n + args.queries, args.dim)
+    if metric == faiss.METRIC_INNER_PRODUCT:
+        faiss.normalize_L2(data)
+    base, queries = data[:args.n], data[args.n:]
+
+    flat = make_faiss_index(args.dim, metric=metric)
+    flat.add(base)
+    truth, flat_lat = timed_search(flat, queries, args.k)
+
+    rows = [("flat", "-", 1.0, flat_lat, 0.0)]
+    candidates = [AnnConfig(kind="hnsw", ef_search=ef) for ef in (16, 32, 64, 128, 256)]
+    candidates += [AnnConfig(kind="ivfpq", pq_m=args.pq_m, nprobe=p) for p in (1, 4, 16, 64)]
+    candidates += [AnnConfig(kind="ivfpq", pq_m=args.pq_m, nprobe=p, refine=4) for p in (4, 16, 64)]
+
+    built = {}
+    for cfg in candidates:
+        key = (cfg.kind, cfg.pq_m, bool(cfg.refine))
+        if key not in built:
+            start = time.perf_counter()
+            built[key] = (build_ann_index(base, cfg, metric), time.perf_counter() - start)
+        index, build_s = built[key]
+        if index is None:
+            continue
+        apply_search_params(index, cfg)
+        if cfg.kind == "hnsw":
+            param = f"efSearch={cfg.ef_search}"
+        else:
+            param = f"nprobe={cfg.nprobe}/{auto_nlist(args.n)}" + (f" refine×{cfg.refine}" if cfg.refine else "")
+        found, lat = timed_search(index, queries, args.k)
+        rows.append((cfg.kind, param, recall_at_k(found, truth), lat, build_s))
+
+    print(f"N={args.n} dim={args.dim} queries={args.queries} k={args.k} metric={args.metric}")
+    print(f"{'index':<7} {'param':<26} {'recall@k':>9} {'p50 ms':>8} {'p99 ms':>8} {'build s':>8}")
+    for kind, param, recall, lat, build_s in rows:
+        p50, p99 = np.percentile(lat, [50, 99])
+        print(f"{kind:<7} {param:<26} {recall:>9.3f} {p50:>8.3f} {p99:>8.3f} {build_s:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
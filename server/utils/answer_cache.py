@@ -0,0 +1,130 @@
+"""
+질문 답변 캐시
+--------------------------------
+같은 질문("국가근로장학금 마감일?")이 반복되므로 /ask/database 앞에서 답을 재사용한다.
+
+1. 정규화한 질문 문자열이 같으면 바로 반환 (임베딩 호출 없음)
+2. 아니면 질문 임베딩과 저장된 질문들의 코사인 유사도가 ``threshold`` 이상인 항목 반환
+
+항목은 scope(라우터가 뽑은 필터 등)가 같을 때만 재사용한다. "학점 3.5" 와 "학점 3.9" 는 임베딩이
+비슷해도 결과가 다르기 때문이다. TTL·최대 개수(LRU) 로 비우고, 인덱스 게시·documents 변경 시,
+그리고 날짜가 바뀌면(신청 기간 조건) 전부 무효화한다.
+"""
+import logging
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger("pnu_parser")
+
+_PUNCT_RE = re.compile(r"[^\w\s.]")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize_question(question: str) -> str:
+    """NFKC + 소문자 + 문장부호 제거 + 공백 정리 ("국가근로장학금  마감일?" → "국가근로장학금 마감일")"""
+    text = unicodedata.normalize("NFKC", question).lower()
+    text = _PUNCT_RE.sub(" ", text)
+    return _SPACE_RE.sub(" ", text).strip(" .")
+
+
+@dataclass
+class _Entry:
+    answer: Any
+    scope: str
+    vector: Optional[np.ndarray]
+    created: float
+    day: date
+    cost_ms: float  # 원래 답을 만드는 데 걸린 시간 (적중 시 절약분)
+
+
+class AnswerCache:
+    def __init__(self, max_entries: int = 1000, ttl: float = 600.0, threshold: float = 0.95):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.threshold = threshold
+        self._entries: "OrderedDict[Tuple[str, str], _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            "lookups": 0, "exact_hits": 0, "semantic_hits": 0, "misses": 0,
+            "saved_ms": 0.0, "evictions": 0, "invalidations": 0,
+        }
+
+    def _alive(self, entry: _Entry, now: float) -> bool:
+        return now - entry.created <= self.ttl and entry.day == date.today()
+
+    def _hit(self, key: Tuple[str, str], entry: _Entry, kind: str) -> Any:
+        self._entries.move_to_end(key)
+        self._stats[kind] += 1
+        self._stats["saved_ms"] += entry.cost_ms
+        return entry.answer
+
+    def get(self, question: str, scope: str = "") -> Optional[Any]:
+        """정규화 문자열 일치 조회 (없으면 None, 통계상 아직 miss 로 세지 않음)"""
+        key = (scope, normalize_question(question))
+        with self._lock:
+            self._stats["lookups"] += 1
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if not self._alive(entry, time.monotonic()):
+                del self._entries[key]
+                return None
+            return self._hit(key, entry, "exact_hits")
+
+    def get_similar(self, vector, scope: str = "") -> Optional[Any]:
+        """같은 scope 의 항목 중 코사인 유사도가 threshold 이상인 가장 가까운 답 (vector 가 None 이면 miss)"""
+        if vector is None:
+            with self._lock:
+                self._stats["misses"] += 1
+            return None
+        query = np.asarray(vector, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1.0)
+        now = time.monotonic()
+        with self._lock:
+            keys, vectors = [], []
+            for key, entry in self._entries.items():
+                if entry.scope == scope and entry.vector is not None and self._alive(entry, now):
+                    keys.append(key)
+                    vectors.append(entry.vector)
+            if vectors:
+                scores = np.stack(vectors) @ query
+                best = int(scores.argmax())
+                if scores[best] >= self.threshold:
+                    return self._hit(keys[best], self._entries[keys[best]], "semantic_hits")
+            self._stats["misses"] += 1
+            return None
+
+    def put(self, question: str, answer: Any, scope: str = "", vector=None, cost_ms: float = 0.0) -> None:
+        if vector is not None:
+            vector = np.asarray(vector, dtype=np.float32)
+            vector = vector / (np.linalg.norm(vector) or 1.0)
+        key = (scope, normalize_question(question))
+        with self._lock:
+            self._entries[key] = _Entry(answer, scope, vector, time.monotonic(), date.today(), cost_ms)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def invalidate(self, reason: str = "") -> None:
+        with self._lock:
+            dropped = len(self._entries)
+            self._entries.clear()
+            self._stats["invalidations"] += 1
+        logger.info(f"[ANSWER CACHE] 무효화 ({reason}) – {dropped}개 삭제")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats, entries=len(self._entries), threshold=self.threshold, ttl=self.ttl)
+        hits = stats["exact_hits"] + stats["semantic_hits"]
+        stats["hit_rate"] = round(hits / (hits + stats["misses"]), 4) if hits + stats["misses"] else 0.0
+        stats["saved_ms"] = round(stats["saved_ms"], 1)
+        return stats
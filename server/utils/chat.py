@@ -1,12 +1,15 @@
 from langchain_community.vectorstores import FAISS
-from langchain_community.vectorstores.utils import DistanceStrategy
-from langchain_upstage import UpstageEmbeddings
-import faiss
-from langchain_community.docstore.in_memory import InMemoryDocstore
-from typing import List, Dict, Any, Optional
+from typing import AsyncIterator, List, Dict, Optional
+from utils.ann import AnnConfig
+from utils.prompt_budget import PROMPT_MAX_TOKENS, count_tokens, fit_chunks, fit_history, truncate_tokens
+from utils.embeddings import get_embeddings
+from utils.vector_index import new_store
+from utils.hybrid_search import hybrid_search
+from utils.lexical_index import LexicalIndex
 
 
-from openai import OpenAI # openai==1.52.2
+from openai import AsyncOpenAI, OpenAI # openai==1.52.2
+from utils.upstream import limit_for, upstream
 from dotenv import load_dotenv
 import os
 load_dotenv()
@@ -15,25 +18,34 @@ client = OpenAI(
     api_key=os.getenv("UPSTAGE_API_KEY"),
     base_url="https://api.upstage.ai/v1"
 )
+# async 라우트용 – 응답 대기 중 스레드를 잡지 않음 (동시 요청 수는 utils.upstream 으로 제한)
+async_client = AsyncOpenAI(
+    api_key=os.getenv("UPSTAGE_API_KEY"),
+    base_url="https://api.upstage.ai/v1",
+    timeout=limit_for("upstage_chat").timeout,
+)
 dim_size = 4096
 
-def make_prompt(question: str, search_result: List[str], messages: List[Dict[str, str]]) -> str:
+def make_prompt(question: str, search_result: List[str], messages: List[Dict[str, str]], max_tokens: int = PROMPT_MAX_TOKENS) -> str:
+    """검색 결과·대화 기록을 토큰 예산(max_tokens) 안으로 줄여 프롬프트 조립 (utils.prompt_budget)"""
     prompt = f"""
     You are a helpful assistant that can answer questions and help with tasks.
     You are given a question, a search result, and a conversation history.
     Use the search result to answer the question.
     answer concisely and in Korean.
     Question:
-    {question}"""
-    if search_result:
-        for i, result in enumerate(search_result):
-            prompt += f"""
+    {truncate_tokens(question, max_tokens // 10)}"""
+    budget = max(0, max_tokens - count_tokens(prompt))
+    history = fit_history(messages, budget // 5)  # 대화 기록은 남은 예산의 1/5 까지
+    chunks = fit_chunks(question, [getattr(r, "page_content", r) for r in search_result or []], budget - count_tokens(history))
+    for i, result in enumerate(chunks):
+        prompt += f"""
             Search result {i+1}:
             {result}"""
-    if messages:
+    if history:
         prompt += f"""
         Conversation history:
-        {messages}
+        {history}
         answer in Korean."""
     return prompt
 
@@ -52,8 +64,30 @@ def chat_with_solar(question: str, search_result: List[str], messages: List[Dict
         messages=[{"role": "user", "content": prompt}]
     )
     return response
+
+async def achat_with_solar(question: str, search_result: List[str], messages: List[Dict[str, str]]):
+    """chat_with_solar 의 async 버전"""
+    prompt = make_prompt(question, search_result, messages)
+    async with upstream("upstage_chat"):
+        return await async_client.chat.completions.create(
+            model="solar-pro",
+            messages=[{"role": "user", "content": prompt}]
+        )
+
+async def astream_solar(question: str, search_result: List[str], messages: List[Dict[str, str]]) -> AsyncIterator[str]:
+    """답변을 토큰(delta) 단위로 흘려보내는 스트리밍 버전"""
+    prompt = make_prompt(question, search_result, messages)
+    async with upstream("upstage_chat"):
+        stream = await async_client.chat.completions.create(
+            model="solar-pro",
+            messages=[{"role": "user", "content": prompt}],
+            stream=True,
+        )
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
  
-def RAG_chat(question: str, vectorstore: FAISS, top_k: int = 3, messages: Optional[List[Dict[str, str]]] = [], use_history: bool = False) -> str:
+def RAG_chat(question: str, vectorstore: FAISS, top_k: int = 3, messages: Optional[List[Dict[str, str]]] = [], use_history: bool = False, lexical: Optional[LexicalIndex] = None) -> str:
     """
     args:
         question: 질문(str)
@@ -61,10 +95,14 @@ def RAG_chat(question: str, vectorstore: FAISS, top_k: int = 3, messages: Option
         top_k: 검색 결과 개수(int)
         messages: 대화 기록(list)
         use_history: 대화 기록 사용 여부(bool)
+        lexical: BM25 인덱스 – 있으면 벡터 결과와 RRF 로 합침 (utils.hybrid_search)
     returns: 
         response: 응답(str)
     """
-    search_result = vectorstore.similarity_search(question, k=top_k)
+    if lexical is not None:
+        search_result = [doc for doc, _ in hybrid_search(vectorstore, lexical, question, k=top_k)]
+    else:
+        search_result = vectorstore.similarity_search(question, k=top_k)
     #response = chat_with_solar(question, search_result, messages)
     # if use_history:
     #     if messages:
@@ -101,16 +139,11 @@ def make_vectorstore(texts: Optional[List[str]] = None, metadatas: Optional[List
             {"source": "9"},
             {"source": "10"},
         ]
-    query_embeddings = UpstageEmbeddings(model="solar-embedding-1-large-query")
-    passage_embeddings = UpstageEmbeddings(model="solar-embedding-1-large-passage")
-    vectorstore = FAISS(
-        embedding_function=query_embeddings,
-        index=faiss.IndexFlatL2(dim_size),
-        docstore=InMemoryDocstore(),
-        index_to_docstore_id={},
-        distance_strategy=DistanceStrategy.COSINE
-    )
-    vectorstore.add_texts(texts, embedding=passage_embeddings, metadatas=metadatas)
+    # 공용 임베딩 서비스: 문서는 -passage, 질의는 -query 모델로 임베딩하고 캐시
+    embeddings = get_embeddings("solar-embedding-1-large")
+    # 코사인: 정규화 벡터 + 내적 인덱스
+    vectorstore = new_store(embeddings, dim_size, AnnConfig.from_env())
+    vectorstore.add_texts(texts, metadatas=metadatas)
     return vectorstore
 
 if __name__ == "__main__":
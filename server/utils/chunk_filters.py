@@ -0,0 +1,145 @@
+"""
+청크 조건 메타데이터 + 인덱스 안에서의 사전 필터
+--------------------------------
+청크 메타데이터에 첨부에서 추출한 ``gpa``, ``grade``, ``status``, ``start_date``, ``end_date`` 를 넣고,
+게시할 때 faiss 위치 순서의 numpy 열(``filters.npz``)로 만들어 버전 디렉터리에 함께 저장한다.
+
+``ChunkFilters.select(min_gpa=..., grade=..., status=...)`` 는 조건에 맞는 위치(``Selection``)를 돌려주고,
+검색은 그 후보 안에서만 점수를 매긴다 (utils.vector_index.search_vectors / utils.hybrid_search).
+조건식은 DB 조회(db.query.eligible_documents_stmt)와 같다 – 두 경로의 결과가 어긋나지 않도록.
+"""
+import logging
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+import numpy as np
+
+logger = logging.getLogger("pnu_parser")
+
+FILTERS_FILE = "filters.npz"
+CONDITION_KEYS = ("gpa", "grade", "status", "start_date", "end_date")
+STATUS_CODES = {"재학": 1, "휴학": 2}
+
+
+def condition_metadata(conditions: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """추출 조건({"gpa": "3.0", ...} 문자열) → 청크 메타데이터 값 (잘못된 값은 None)"""
+    conditions = conditions or {}
+
+    def parse(key, convert):
+        try:
+            return convert(conditions[key]) if conditions.get(key) not in (None, "") else None
+        except (TypeError, ValueError):
+            return None
+
+    return {
+        "gpa": parse("gpa", float),
+        "grade": parse("grade", int),
+        "status": conditions.get("status") if conditions.get("status") in STATUS_CODES else None,
+        "start_date": parse("start_date", lambda v: date.fromisoformat(str(v)[:10]).isoformat()),
+        "end_date": parse("end_date", lambda v: date.fromisoformat(str(v)[:10]).isoformat()),
+    }
+
+
+def _ordinal(value: Optional[str]) -> int:
+    try:
+        return date.fromisoformat(value).toordinal() if value else 0
+    except ValueError:
+        return 0
+
+
+@dataclass
+class Selection:
+    """조건에 맞는 청크: faiss 위치(정렬됨)와 docstore id"""
+    positions: np.ndarray
+    ids: Set[str]
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+
+class ChunkFilters:
+    """faiss 위치별 조건 열 (없는 값: gpa NaN, 나머지 0)"""
+
+    def __init__(
+        self, ids: List[str], gpa: np.ndarray, grade: np.ndarray, status: np.ndarray, start: np.ndarray, end: np.ndarray,
+        complete: bool = True,
+    ):
+        self.ids = ids
+        self.gpa, self.grade, self.status = gpa, grade, status
+        self.start, self.end = start, end
+        self.complete = complete  # 모든 청크 메타데이터에 조건 키가 있었는지 (예전 청크 backfill 판단용)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def build(cls, store) -> "ChunkFilters":
+        n = store.index.ntotal
+        ids = [""] * n
+        gpa = np.full(n, np.nan, dtype=np.float32)
+        grade = np.zeros(n, dtype=np.int8)
+        status = np.zeros(n, dtype=np.int8)
+        start = np.zeros(n, dtype=np.int32)
+        end = np.zeros(n, dtype=np.int32)
+        complete = True
+        for pos, doc_id in store.index_to_docstore_id.items():
+            doc = store.docstore.search(doc_id)
+            if isinstance(doc, str) or pos >= n:
+                continue
+            meta = doc.metadata
+            complete = complete and all(key in meta for key in CONDITION_KEYS)
+            ids[pos] = doc_id
+            if meta.get("gpa") is not None:
+                gpa[pos] = meta["gpa"]
+            grade[pos] = meta.get("grade") or 0
+            status[pos] = STATUS_CODES.get(meta.get("status"), 0)
+            start[pos] = _ordinal(meta.get("start_date"))
+            end[pos] = _ordinal(meta.get("end_date"))
+        return cls(ids, gpa, grade, status, start, end, complete)
+
+    def save(self, path: Path) -> None:
+        with open(Path(path) / FILTERS_FILE, "wb") as f:
+            np.savez(
+                f, ids=np.array(self.ids, dtype=str), gpa=self.gpa, grade=self.grade, status=self.status, start=self.start, end=self.end,
+                complete=np.array(self.complete),
+            )
+
+    @classmethod
+    def load(cls, path: Path) -> Optional["ChunkFilters"]:
+        """path 에 filters.npz 가 없으면 None"""
+        file = Path(path) / FILTERS_FILE
+        if not file.exists():
+            return None
+        with np.load(file) as data:
+            complete = bool(data["complete"]) if "complete" in data.files else False  # 표시가 없던 파일은 한 번 다시 확인
+            return cls(data["ids"].tolist(), data["gpa"], data["grade"], data["status"], data["start"], data["end"], complete)
+
+    def mask(
+        self,
+        min_gpa: Optional[float] = None,
+        grade: Optional[int] = None,
+        status: Optional[str] = None,  # "재학" 또는 "휴학"
+        today: Optional[date] = None,
+    ) -> np.ndarray:
+        """eligible_documents_stmt 와 같은 조건의 bool 배열
+
+        gpa/grade 는 (값 이상 또는 없음) 을 OR 로, status 와 신청 기간(start ≤ 오늘 ≤ end)은 AND 로.
+        """
+        today_ord = (today or date.today()).toordinal()
+        keep = (self.start > 0) & (self.start <= today_ord) & (self.end > 0) & (self.end >= today_ord)
+        either = []
+        if min_gpa is not None:
+            either.append(np.isnan(self.gpa) | (self.gpa >= min_gpa))
+        if grade is not None:
+            either.append((self.grade == 0) | (self.grade >= grade))
+        if either:
+            keep &= np.logical_or.reduce(either)
+        if status is not None:
+            keep &= self.status == STATUS_CODES.get(status, -1)
+        return keep
+
+    def select(self, **conditions) -> Selection:
+        positions = np.flatnonzero(self.mask(**conditions))
+        return Selection(positions, {self.ids[p] for p in positions})
@@ -0,0 +1,347 @@
+"""
+장학금 조건 일괄 추출 (solar-pro, JSON schema 출력)
+--------------------------------
+첨부마다 클라이언트를 새로 만들고 "csv 비슷한" 답을 정규식으로 긁던 방식 대신
+
+* 여러 첨부를 토큰 예산(``EXTRACT_BATCH_TOKENS``) 안에서 한 요청으로 묶고
+* ``response_format`` 에 strict JSON schema 를 지정해 항목별 ``id`` 와 함께 받은 뒤
+* pydantic(``ScholarshipConditions``) 으로 검증한다.
+
+요청 전에 utils.condition_rules 의 규칙 추출로 신뢰도 높은 필드를 먼저 확정한다.
+다섯 필드가 모두 확정되면 LLM 을 부르지 않고, 아니면 남은 필드만 요청해 규칙 값과 합친다.
+
+응답에서 빠졌거나 검증에 실패한 항목만 다시 요청한다(``EXTRACT_MAX_RETRIES``).
+재시도 후에도 검증에 실패한 항목은 유효한 필드만 남기고 버린 필드를 경고 로그로 남긴다.
+응답 자체를 받지 못한 항목은 None (호출한 쪽이 실패로 기록해 다음 실행에서 재시도).
+
+크롤러의 extract 단계는 첨부 하나씩 들어오므로 ``ConditionBatcher`` 가 워커들의 요청을
+``EXTRACT_BATCH_WAIT`` 초 동안 모아 한 번에 보낸다.
+"""
+import json
+import logging
+import os
+import re
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Callable, Dict, List, Literal, Optional, Sequence
+
+import httpx
+from dotenv import load_dotenv
+from openai import OpenAI
+from pydantic import BaseModel, ConfigDict, Field, ValidationError, field_validator, model_validator
+
+from utils.condition_rules import confident_fields, rule_conditions
+from utils.prompt_budget import EXTRACT_MAX_TOKENS, count_tokens, select_spans
+
+load_dotenv()
+logger = logging.getLogger("pnu_parser")
+
+EXTRACT_MODEL = os.getenv("EXTRACT_MODEL", "solar-pro2-preview")
+EXTRACT_BATCH_SIZE = int(os.getenv("EXTRACT_BATCH_SIZE", "8"))          # 요청 하나에 담을 첨부 수
+EXTRACT_BATCH_TOKENS = int(os.getenv("EXTRACT_BATCH_TOKENS", "8000"))   # 요청 하나의 본문 토큰 합
+EXTRACT_BATCH_WAIT = float(os.getenv("EXTRACT_BATCH_WAIT", "0.5"))      # 배치를 모으는 최대 대기(초)
+EXTRACT_MAX_RETRIES = int(os.getenv("EXTRACT_MAX_RETRIES", "2"))        # 실패 항목 재요청 횟수
+
+# 조건 추출 프롬프트에는 첨부 전문 대신 조건 관련 문장만 (EXTRACT_MAX_TOKENS 이내)
+CONDITION_QUERY = "신청 기간 접수 마감 기한 학점 평점 성적 GPA 학년 재학 휴학 자격 대상"
+CONDITION_BOOST = re.compile(r"\d{1,4}\s*[./년-]\s*\d{1,2}|학점|평점|학년|재학|휴학")
+
+CONDITION_FIELDS = ("min_gpa", "start_date", "end_date", "grade", "status")
+
+
+class ScholarshipConditions(BaseModel):
+    """첨부 하나의 장학금 조건 (찾지 못한 값은 None)"""
+    model_config = ConfigDict(extra="ignore")
+
+    id: int
+    min_gpa: Optional[float] = Field(None, ge=0, le=4.5)
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    grade: Optional[int] = Field(None, ge=1, le=4)
+    status: Optional[Literal["재학", "휴학"]] = None
+
+    @field_validator(*CONDITION_FIELDS, mode="before")
+    @classmethod
+    def _empty_to_none(cls, value: Any) -> Any:
+        if isinstance(value, str) and value.strip().lower() in ("", "null", "none", "n/a"):
+            return None
+        return value
+
+    @model_validator(mode="after")
+    def _check_period(self) -> "ScholarshipConditions":
+        if self.start_date and self.end_date and self.start_date > self.end_date:
+            raise ValueError("start_date 가 end_date 보다 늦음")
+        return self
+
+    def to_conditions(self) -> Dict[str, Optional[str]]:
+        """DB 저장·파싱 캐시에서 쓰는 기존 형식 {"gpa", "start_date", "end_date", "grade", "status"} (문자열)"""
+        return {
+            "gpa": None if self.min_gpa is None else str(self.min_gpa),
+            "start_date": self.start_date.isoformat() if self.start_date else None,
+            "end_date": self.end_date.isoformat() if self.end_date else None,
+            "grade": None if self.grade is None else str(self.grade),
+            "status": self.status,
+        }
+
+
+_NULLABLE = lambda t: {"type": [t, "null"]}  # noqa: E731
+RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "scholarship_conditions",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "items": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "id": {"type": "integer"},
+                            "min_gpa": _NULLABLE("number"),
+                            "start_date": _NULLABLE("string"),
+                            "end_date": _NULLABLE("string"),
+                            "grade": _NULLABLE("integer"),
+                            "status": {"type": ["string", "null"], "enum": ["재학", "휴학", None]},
+                        },
+                        "required": ["id", *CONDITION_FIELDS],
+                        "additionalProperties": False,
+                    },
+                },
+            },
+            "required": ["items"],
+            "additionalProperties": False,
+        },
+    },
+}
+
+SYSTEM_PROMPT = """Extract scholarship conditions from each document below.
+Return one item per document, using the document's id.
+Each document header lists the fields still needed; return null for the other fields.
+min_gpa: the minimum GPA required, a number between 0 and 4.5.
+start_date / end_date: the application period, YYYY-MM-DD.
+grade: the attending year of the student, an integer between 1 and 4.
+status: 재학 or 휴학.
+Use null for any value that is not stated in the document."""
+
+_client: Optional[OpenAI] = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> OpenAI:
+    """연결 풀을 재사용하는 공용 클라이언트 (첨부마다 새 TLS 연결을 맺지 않음)"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = OpenAI(
+                api_key=os.getenv("UPSTAGE_API_KEY"),
+                base_url="https://api.upstage.ai/v1",
+                timeout=120.0,
+                http_client=httpx.Client(limits=httpx.Limits(max_connections=8, max_keepalive_connections=8)),
+            )
+        return _client
+
+
+def _pack(items: Sequence[int], costs: Dict[int, int]) -> List[List[int]]:
+    """항목을 순서대로 EXTRACT_BATCH_SIZE 개 / EXTRACT_BATCH_TOKENS 토큰 이하 배치로 나눔"""
+    batches, batch, used = [], [], 0
+    for i in items:
+        if batch and (len(batch) >= EXTRACT_BATCH_SIZE or used + costs[i] > EXTRACT_BATCH_TOKENS):
+            batches.append(batch)
+            batch, used = [], 0
+        batch.append(i)
+        used += costs[i]
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def _request(spans: Dict[int, str], needed: Dict[int, List[str]], batch: List[int]) -> Dict[int, dict]:
+    """배치 하나를 요청해 {id: 원본 항목} 반환 (요청/JSON 실패 시 예외)"""
+    documents = "\n\n".join(f"### id: {i} (fields: {', '.join(needed[i])})\n{spans[i]}" for i in batch)
+    response = get_client().chat.completions.create(
+        model=EXTRACT_MODEL,
+        messages=[
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": documents},
+        ],
+        response_format=RESPONSE_FORMAT,
+        temperature=0,
+    )
+    payload = json.loads(response.choices[0].message.content or "{}")
+    items = payload.get("items") if isinstance(payload, dict) else None
+    if not isinstance(items, list):
+        raise ValueError("응답에 items 배열이 없음")
+    return {item["id"]: item for item in items if isinstance(item, dict) and isinstance(item.get("id"), int)}
+
+
+def _salvage(i: int, raw: dict, error: ValidationError) -> Dict[str, Optional[str]]:
+    """재시도 후에도 검증 실패한 항목: 필드별로 검증해 유효한 값만 남기고 버린 필드는 로그"""
+    kept: Dict[str, Any] = {}
+    for name in CONDITION_FIELDS:
+        try:
+            kept[name] = getattr(ScholarshipConditions.model_validate({"id": i, name: raw.get(name)}), name)
+        except ValidationError:
+            pass
+    try:
+        result = ScholarshipConditions(id=i, **kept)
+    except ValidationError:  # 각 날짜는 유효하지만 기간이 뒤집힌 경우
+        kept.pop("start_date", None)
+        kept.pop("end_date", None)
+        result = ScholarshipConditions(id=i, **kept)
+    dropped = [name for name in CONDITION_FIELDS if raw.get(name) not in (None, "") and getattr(result, name) is None]
+    logger.warning(f"[EXTRACT] 항목 {i} 검증 실패 – 버린 필드 {dropped}: {error.errors(include_url=False)}")
+    return result.to_conditions()
+
+
+def rule_only(full_text: str, title: str = "", known: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Optional[str]]]:
+    """규칙 추출만으로 다섯 필드가 모두 확정되면 그 결과, 아니면 None (known: 이미 구한 confident_fields)"""
+    if known is None:
+        known = confident_fields(rule_conditions(full_text, title))
+    if len(known) < len(CONDITION_FIELDS):
+        return None
+    try:
+        return ScholarshipConditions(id=0, **known).to_conditions()
+    except ValidationError:
+        return None
+
+
+def extract_conditions_batch(
+    texts: Sequence[str], titles: Optional[Sequence[str]] = None, rules: Optional[Sequence[Optional[Dict[str, Any]]]] = None
+) -> List[Optional[Dict[str, Optional[str]]]]:
+    """첨부 본문(과 공지 제목) 여러 개의 조건을 규칙 추출 + 배치 요청으로 추출
+
+    입력 순서대로 반환하며, LLM 응답을 못 받은 항목은 None.
+    rules 에 항목별 confident_fields 를 이미 구해 두었으면 규칙 추출을 다시 하지 않는다.
+    """
+    titles = titles or [""] * len(texts)
+    rules = rules or [None] * len(texts)
+    results: List[Optional[Dict[str, Optional[str]]]] = [None] * len(texts)
+    known: Dict[int, Dict[str, Any]] = {}    # 규칙으로 확정한 필드
+    needed: Dict[int, List[str]] = {}        # LLM 에 물을 필드
+    for i, (text, title, fields) in enumerate(zip(texts, titles, rules)):
+        if fields is None:
+            fields = confident_fields(rule_conditions(text or "", title or ""))
+        if len(fields) == len(CONDITION_FIELDS):
+            try:
+                results[i] = ScholarshipConditions(id=i, **fields).to_conditions()
+                continue
+            except ValidationError:  # 규칙 값끼리 충돌하면 전부 LLM 에 맡김
+                fields = {}
+        known[i] = fields
+        needed[i] = [name for name in CONDITION_FIELDS if name not in fields]
+
+    spans = {i: select_spans(texts[i] or "", CONDITION_QUERY, EXTRACT_MAX_TOKENS, boost=CONDITION_BOOST) for i in needed}
+    spans = {i: f"title: {titles[i]}\n{span}" if titles[i] else span for i, span in spans.items()}
+    costs = {i: count_tokens(span) for i, span in spans.items()}
+    invalid: Dict[int, tuple] = {}  # 마지막으로 검증에 실패한 (원본, 오류)
+
+    pending = list(spans)
+    calls = 0
+    for attempt in range(EXTRACT_MAX_RETRIES + 1):
+        if not pending:
+            break
+        if attempt:
+            logger.info(f"[EXTRACT] 실패 항목 {len(pending)}개 재요청 ({attempt}/{EXTRACT_MAX_RETRIES})")
+        for batch in _pack(pending, costs):
+            calls += 1
+            try:
+                received = _request(spans, needed, batch)
+            except Exception as e:
+                logger.error(f"❌ 조건 추출 요청 실패 ({len(batch)}개): {e}")
+                continue
+            for i in batch:
+                if i not in received:
+                    continue
+                raw = {**received[i], **known[i], "id": i}  # 규칙으로 확정한 값이 우선
+                try:
+                    results[i] = ScholarshipConditions.model_validate(raw).to_conditions()
+                    invalid.pop(i, None)
+                except ValidationError as e:
+                    invalid[i] = (raw, e)
+        pending = [i for i in pending if results[i] is None]
+
+    for i in pending:
+        if i in invalid:
+            results[i] = _salvage(i, *invalid[i])
+    missing = sum(r is None for r in results)
+    logger.info(
+        f"[EXTRACT] 첨부 {len(texts)}개 (규칙만으로 완료 {len(texts) - len(needed)}개) → 요청 {calls}회"
+        + (f", 응답 누락 {missing}개" if missing else "")
+    )
+    return results
+
+
+def extract_conditions(full_text: str, title: str = "") -> Optional[Dict[str, Optional[str]]]:
+    """첨부 하나의 조건 추출 (응답을 못 받으면 None)"""
+    return extract_conditions_batch([full_text], [title])[0]
+
+
+@dataclass(eq=False)
+class _Pending:
+    text: str
+    title: str
+    known: Dict[str, Any]  # 대기열에 넣기 전에 구한 confident_fields
+    future: Future = field(default_factory=Future)
+
+
+class ConditionBatcher:
+    """여러 스레드의 단건 추출 요청을 모아 extract_conditions_batch 한 번으로 처리
+
+    배치가 max_items 개 차면 바로, 아니면 max_wait 초 뒤 먼저 기다리던 스레드가 모인 요청을
+    대신 보낸다(별도 스레드 없음). 각 호출자는 자기 결과가 나올 때까지 대기한다.
+    규칙 추출만으로 끝나는 첨부는 대기열에 넣지 않고 바로 반환한다.
+    """
+
+    def __init__(
+        self,
+        extract: Callable[..., List[Optional[Dict[str, Optional[str]]]]] = extract_conditions_batch,
+        max_items: int = EXTRACT_BATCH_SIZE,
+        max_wait: float = EXTRACT_BATCH_WAIT,
+    ):
+        self._extract = extract
+        self.max_items = max_items
+        self.max_wait = max_wait
+        self._queue: List[_Pending] = []
+        self._lock = threading.Lock()
+
+    def _take(self, item: Optional[_Pending] = None) -> List[_Pending]:
+        """대기열을 비워 반환 (item 이 주어지면 아직 대기열에 있을 때만)"""
+        with self._lock:
+            if item is not None and item not in self._queue:
+                return []
+            batch, self._queue = self._queue, []
+            return batch
+
+    def _run(self, batch: List[_Pending]) -> None:
+        if not batch:
+            return
+        try:
+            results = self._extract([p.text for p in batch], [p.title for p in batch], [p.known for p in batch])
+        except Exception as e:
+            for p in batch:
+                p.future.set_exception(e)
+            return
+        for p, result in zip(batch, results):
+            p.future.set_result(result)
+
+    def extract(self, full_text: str, title: str = "") -> Optional[Dict[str, Optional[str]]]:
+        known = confident_fields(rule_conditions(full_text, title))
+        result = rule_only(full_text, title, known)
+        if result is not None:
+            return result
+        item = _Pending(full_text, title, known)
+        with self._lock:
+            self._queue.append(item)
+            full = len(self._queue) >= self.max_items
+        if full:
+            self._run(self._take())
+        try:
+            return item.future.result(timeout=self.max_wait)
+        except FutureTimeout:
+            pass
+        self._run(self._take(item))  # 아무도 보내지 않았으면 직접 보냄
+        return item.future.result()
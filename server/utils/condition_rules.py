@@ -0,0 +1,207 @@
+"""
+장학금 조건 규칙 기반 추출 (LLM 호출 전 단계)
+--------------------------------
+공지 제목·첨부에는 "(~6.23. 18시)", "2025. 5. 23.(금) 09:00 ~ 2025. 6. 23.(월)", "평점 3.5 이상"
+처럼 정형화된 표현이 많다. 정규식으로 먼저 값을 뽑고 필드마다 신뢰도(0~1)를 붙인다.
+
+* 값을 찾았고 모호하지 않으면 높은 신뢰도
+* 단서 자체가 없으면(예: 학점 언급 없음) 값 None 에 높은 신뢰도 – "조건 없음"도 확정된 답
+* 단서는 있지만 값이 여러 개이거나 해석이 애매하면 낮은 신뢰도 → LLM 에 맡김
+* 날짜는 규칙이 해석하지 못한 m/d 모양 표현("6/1 ~ 6/23", "마감: 6/23(월)")이 하나라도 남아 있으면
+  "날짜 없음"으로 확정하지 않는다 (NULL 기간으로 저장되면 자격 조회에서 영영 빠지므로)
+
+``RULE_MIN_CONFIDENCE`` 이상인 필드만 확정하고 나머지만 utils.condition_extract 가 LLM 으로 채운다.
+"""
+import os
+import re
+from collections import Counter
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+RULE_MIN_CONFIDENCE = float(os.getenv("RULE_MIN_CONFIDENCE", "0.7"))
+
+
+@dataclass
+class FieldGuess:
+    value: Any
+    confidence: float
+
+
+def _date_re(s: str) -> str:
+    """날짜 하나: "2025. 5. 23.(금) 09:00", "2025-05-23", "5월 23일", "6.23. 18시" (그룹 이름에 s 접미사)"""
+    return (
+        rf"(?:(?P<y{s}>20\d{{2}})\s*(?:년|[./-])\s*)?"
+        rf"(?P<m{s}>1[0-2]|0?[1-9])\s*(?P<sep{s}>월|[./-])\s*(?P<d{s}>3[01]|[12]\d|0?[1-9])(?!\d)"
+        rf"(?P<tail{s}>\s*일|\.)?(?:\s*\([월화수목금토일]\))?"
+        rf"(?:\s*(?:\d{{1,2}}:\d{{2}}|\d{{1,2}}\s*시))?"
+    )
+
+
+_RANGE_SEP = r"\s*(?:~|∼|～|〜|부터)\s*"
+RANGE_RE = re.compile(_date_re("1") + _RANGE_SEP + _date_re("2"))
+END_ONLY_RE = re.compile(r"(?:~|∼|～|〜)\s*" + _date_re("2") + r"|" + _date_re("3") + r"\s*까지")
+YEAR_RE = re.compile(r"(?<!\d)(20\d{2})(?!\d)")
+APPLY_CUES = re.compile(r"신청|접수|모집|제출|기간|마감|기한")
+# 규칙이 확정하지 않는 느슨한 날짜 모양 ("6/23", "06.01", "6. 1") – 있으면 LLM 판단
+LOOSE_DATE_RE = re.compile(r"(?<![\d.])(?:1[0-2]|0?[1-9])\s*[./]\s*(?:3[01]|[12]\d|0?[1-9])(?![\d])")
+
+GPA_THRESHOLD_RE = re.compile(
+    r"(?:학점|평점|평균|gpa|성적)[^\n\d]{0,15}([0-4]\.\d{1,2})\s*(?:/\s*4\.[35])?\s*(?:점)?\s*(?:이상|以上)",
+    re.IGNORECASE,
+)
+GPA_MENTION_RE = re.compile(r"(?:학점|평점|gpa|성적)[^\n]{0,15}?(?<![\d.])[0-4]\.\d", re.IGNORECASE)
+
+GRADE_MIN_RE = re.compile(r"(?<!\d)([1-4])\s*학년\s*(?:이상|부터)")
+GRADE_SPAN_RE = re.compile(r"(?<!\d)([1-4])\s*[~∼～-]\s*[1-4]\s*학년(?!도)")
+GRADE_ANY_RE = re.compile(r"(?<!\d)([1-4])\s*학년(?!도)")
+
+STATUS_EXCLUDE_LEAVE_RE = re.compile(r"휴학생\s*(?:은|는)?\s*(?:제외|신청\s*불가|지원\s*불가)")
+STATUS_RE = {"재학": re.compile(r"재학"), "휴학": re.compile(r"휴학")}
+
+
+def _to_date(match: re.Match, s: str, year: int) -> Optional[date]:
+    try:
+        return date(int(match.group(f"y{s}") or year), int(match.group(f"m{s}")), int(match.group(f"d{s}")))
+    except ValueError:
+        return None
+
+
+def _strict(match: re.Match, s: str) -> bool:
+    """연도·"월"·끝 마침표가 있어야 날짜로 인정 ("3.5 이상" 같은 학점과 구분)"""
+    return bool(match.group(f"y{s}") or match.group(f"sep{s}") == "월" or match.group(f"tail{s}"))
+
+
+def _reference_year(text: str, today: date) -> int:
+    years = Counter(int(y) for y in YEAR_RE.findall(text) if abs(int(y) - today.year) <= 1)
+    return years.most_common(1)[0][0] if years else today.year
+
+
+def _cued(text: str, start: int, end: int) -> bool:
+    """날짜 앞 60자 또는 같은 줄에 신청/접수/마감 등 단서가 있는지"""
+    line_start = text.rfind("\n", 0, start) + 1
+    line_end = text.find("\n", end)
+    line = text[line_start:line_end if line_end != -1 else len(text)]
+    return bool(APPLY_CUES.search(text[max(0, start - 60):start]) or APPLY_CUES.search(line))
+
+
+def _date_candidates(text: str, year: int, cued_default: bool) -> Tuple[List[tuple], List[tuple]]:
+    """(시작, 끝, 단서 여부) 범위 후보와 (끝, 단서 여부) 마감 후보"""
+    ranges, ends = [], []
+    for m in RANGE_RE.finditer(text):
+        if not (_strict(m, "1") or _strict(m, "2")):
+            continue
+        start = _to_date(m, "1", year)
+        end = _to_date(m, "2", start.year) if start else None  # 끝 날짜 연도 생략 시 시작 연도
+        if start is None or end is None:
+            continue
+        if end < start and not m.group("y2"):
+            end = end.replace(year=end.year + 1)  # 12.20 ~ 1.10
+        if end >= start:
+            ranges.append((start, end, cued_default or _cued(text, m.start(), m.end())))
+    covered = [m.span() for m in RANGE_RE.finditer(text)]
+    for m in END_ONLY_RE.finditer(text):
+        if any(a <= m.start() < b for a, b in covered):
+            continue
+        s = "2" if m.group("m2") else "3"
+        if not _strict(m, s):
+            continue
+        end = _to_date(m, s, year)
+        if end is not None:
+            ends.append((end, cued_default or _cued(text, m.start(), m.end())))
+    return ranges, ends
+
+
+def _loose_dates(text: str, cued_default: bool) -> List[bool]:
+    """규칙 날짜·학점 표현 밖에 남은 m/d 모양 토큰마다 신청 단서 여부"""
+    covered = [m.span() for m in RANGE_RE.finditer(text) if _strict(m, "1") or _strict(m, "2")]
+    covered += [m.span() for m in END_ONLY_RE.finditer(text) if _strict(m, "2" if m.group("m2") else "3")]
+    covered += [m.span() for pattern in (GPA_THRESHOLD_RE, GPA_MENTION_RE) for m in pattern.finditer(text)]
+    return [
+        cued_default or _cued(text, m.start(), m.end())
+        for m in LOOSE_DATE_RE.finditer(text)
+        if not any(a <= m.start() < b for a, b in covered)
+    ]
+
+
+def _guess_dates(title: str, text: str, today: date) -> Tuple[FieldGuess, FieldGuess]:
+    year = _reference_year(title + "\n" + text, today)
+    # 제목의 날짜는 곧 신청 기간인 경우가 대부분이므로 단서가 있는 것으로 봄
+    title_ranges, title_ends = _date_candidates(title, year, cued_default=True)
+    ranges, ends = _date_candidates(text, year, cued_default=False)
+    ranges, ends = title_ranges + ranges, title_ends + ends
+    loose = _loose_dates(title, cued_default=True) + _loose_dates(text, cued_default=False)
+    # 해석 못 한 날짜가 신청 단서 옆에 있으면 다른 기간(서류 마감 등)일 수 있음
+    other_cued = any(loose)
+
+    cued = list(dict.fromkeys((s, e) for s, e, c in ranges if c))
+    if len(cued) == 1:
+        confidence = 0.4 if other_cued else 0.9
+        return FieldGuess(cued[0][0], confidence), FieldGuess(cued[0][1], confidence)
+    if cued:  # 1차/2차, 서류·면접 등 여러 기간 → LLM 판단
+        return FieldGuess(cued[0][0], 0.4), FieldGuess(cued[0][1], 0.4)
+
+    cued_ends = list(dict.fromkeys(e for e, c in ends if c))
+    if len(cued_ends) == 1:
+        return FieldGuess(None, 0.5), FieldGuess(cued_ends[0], 0.4 if other_cued else 0.85)
+
+    plain = list(dict.fromkeys((s, e) for s, e, _ in ranges))
+    if len(plain) == 1 and not other_cued:
+        return FieldGuess(plain[0][0], 0.6), FieldGuess(plain[0][1], 0.6)
+    if plain or ends or loose:  # "6/1 ~ 6/23", "마감: 6/23(월)" 등 → LLM
+        return FieldGuess(None, 0.3), FieldGuess(None, 0.3)
+    return FieldGuess(None, 0.9), FieldGuess(None, 0.9)  # m/d 모양 표현이 전혀 없음
+
+
+def _guess_gpa(text: str) -> FieldGuess:
+    values = list(dict.fromkeys(float(v) for v in GPA_THRESHOLD_RE.findall(text) if 0 < float(v) <= 4.5))
+    if len(values) == 1:
+        return FieldGuess(values[0], 0.9)
+    if values:  # 구간별 기준 등
+        return FieldGuess(min(values), 0.4)
+    if GPA_MENTION_RE.search(text):
+        return FieldGuess(None, 0.4)
+    return FieldGuess(None, 0.85)
+
+
+def _guess_grade(text: str) -> FieldGuess:
+    for pattern, confidence in ((GRADE_MIN_RE, 0.85), (GRADE_SPAN_RE, 0.8)):
+        values = set(int(v) for v in pattern.findall(text))
+        if len(values) == 1:
+            return FieldGuess(values.pop(), confidence)
+        if values:
+            return FieldGuess(min(values), 0.4)
+    values = set(int(v) for v in GRADE_ANY_RE.findall(text))
+    if values:
+        return FieldGuess(min(values), 0.6 if len(values) == 1 else 0.4)
+    return FieldGuess(None, 0.85)
+
+
+def _guess_status(text: str) -> FieldGuess:
+    if STATUS_EXCLUDE_LEAVE_RE.search(text):
+        return FieldGuess("재학", 0.9)
+    found = [status for status, pattern in STATUS_RE.items() if pattern.search(text)]
+    if len(found) == 1:
+        return FieldGuess(found[0], 0.85)
+    if found:
+        return FieldGuess(None, 0.4)
+    return FieldGuess(None, 0.85)
+
+
+def rule_conditions(text: str, title: str = "", today: Optional[date] = None) -> Dict[str, FieldGuess]:
+    """제목·본문에서 {min_gpa, start_date, end_date, grade, status: FieldGuess} 추출"""
+    today = today or date.today()
+    text = text or ""
+    start, end = _guess_dates(title or "", text, today)
+    return {
+        "min_gpa": _guess_gpa(text),
+        "start_date": start,
+        "end_date": end,
+        "grade": _guess_grade(text),
+        "status": _guess_status(text),
+    }
+
+
+def confident_fields(guesses: Dict[str, FieldGuess], min_confidence: float = RULE_MIN_CONFIDENCE) -> Dict[str, Any]:
+    """신뢰도가 min_confidence 이상인 필드의 값 (None 도 "없음"으로 확정된 값)"""
+    return {name: guess.value for name, guess in guesses.items() if guess.confidence >= min_confidence}
@@ -0,0 +1,168 @@
+"""
+Document-Parse 결과 → 본문 텍스트 + 청크
+--------------------------------
+요소(element)마다 HTML 조각을 BeautifulSoup 으로 다시 파싱하던 것을 한 번의 순회로 바꾼다.
+
+* 요소에 Document-Parse 가 준 ``text`` / ``markdown`` 이 있으면 그대로 사용
+  (표는 markdown 을 "셀 | 셀" 행으로 압축)
+* 없으면(예전 캐시 등) 표준 라이브러리 ``HTMLParser`` 로 HTML 을 한 번 훑어 텍스트·표 행 생성
+
+본문을 이어 붙이면서 요소별 (시작, 끝, 페이지, 요소 id) 오프셋을 ``segments`` 로 남기고,
+``chunk_document`` 는 태그 없는 본문을 나눈 뒤 각 청크의 오프셋·페이지·요소 범위를 메타데이터에 넣는다.
+"""
+import bisect
+import os
+import re
+from html.parser import HTMLParser
+from typing import Dict, List, Tuple
+
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+EMPTY_TEXT = "(빈 문서)"
+CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", "1024"))
+CHUNK_OVERLAP = int(os.getenv("CHUNK_OVERLAP", "128"))
+
+_SPACE_RE = re.compile(r"[ \t\r\f\v\u00a0]+")
+_MD_SEPARATOR_RE = re.compile(r"^\|?\s*:?-{2,}:?\s*(\|\s*:?-{2,}:?\s*)*\|?$")
+_BLOCK_TAGS = {"p", "div", "br", "h1", "h2", "h3", "h4", "h5", "h6", "li", "header", "footer", "caption", "figcaption", "table"}
+
+Segment = List[int]  # [start, end, page, element_id]
+
+
+def _clean(text: str) -> str:
+    lines = (_SPACE_RE.sub(" ", line).strip() for line in text.splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+class _TextExtractor(HTMLParser):
+    """HTML 조각을 한 번 훑어 줄 단위 텍스트로 (표는 행마다 "셀 | 셀")"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.lines: List[str] = []
+        self._buf: List[str] = []
+        self._row: List[str] = []
+        self._cell: List[str] = []
+        self._in_cell = False
+
+    def _flush(self) -> None:
+        if self._buf:
+            self.lines.append("".join(self._buf))
+            self._buf = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "br":
+            self.handle_startendtag(tag, attrs)
+        elif tag in ("td", "th"):
+            self._in_cell, self._cell = True, []
+        elif tag == "tr":
+            self._flush()
+            self._row = []
+        elif tag in _BLOCK_TAGS and not self._in_cell:
+            self._flush()
+
+    def handle_startendtag(self, tag, attrs):
+        if tag == "br":
+            if self._in_cell:
+                self._cell.append(" ")
+            else:
+                self._flush()
+
+    def handle_endtag(self, tag):
+        if tag in ("td", "th"):
+            self._row.append(_SPACE_RE.sub(" ", "".join(self._cell)).strip())
+            self._in_cell = False
+        elif tag == "tr":
+            if any(self._row):
+                self.lines.append(" | ".join(self._row))
+            self._row = []
+        elif tag in _BLOCK_TAGS and not self._in_cell:
+            self._flush()
+
+    def handle_data(self, data):
+        (self._cell if self._in_cell else self._buf).append(data.replace("\n", " "))
+
+    def text(self) -> str:
+        self._flush()
+        return _clean("\n".join(self.lines))
+
+
+def html_to_text(html: str) -> str:
+    parser = _TextExtractor()
+    parser.feed(html)
+    parser.close()
+    return parser.text()
+
+
+def _markdown_table(markdown: str) -> str:
+    """markdown 표 → "셀 | 셀" 행 (구분선 제거)"""
+    rows = []
+    for line in markdown.splitlines():
+        line = line.strip()
+        if not line or _MD_SEPARATOR_RE.match(line):
+            continue
+        if line.startswith("|"):
+            line = " | ".join(cell.strip() for cell in line.strip("|").split("|"))
+        rows.append(line)
+    return _clean("\n".join(rows))
+
+
+def element_text(element: Dict) -> str:
+    content = element.get("content") or {}
+    if element.get("category") == "table":
+        if content.get("markdown"):
+            return _markdown_table(content["markdown"])
+        if content.get("html"):
+            return html_to_text(content["html"])
+    if content.get("text"):
+        return _clean(content["text"])
+    if content.get("html"):
+        return html_to_text(content["html"])
+    return _clean(content.get("markdown") or "")
+
+
+def derive_content(result_json: Dict) -> Tuple[str, str, List[Segment]]:
+    """Document-Parse 결과에서 (full_html, full_text, segments) 생성 (요소 한 번 순회)"""
+    html_parts, text_parts, segments = [], [], []
+    offset = 0
+    for i, element in enumerate(result_json.get("elements", [])):
+        content = element.get("content") or {}
+        if content.get("html"):
+            html_parts.append(content["html"])
+        text = element_text(element)
+        if not text:
+            continue
+        if text_parts:
+            offset += 1  # "\n"
+        segments.append([offset, offset + len(text), int(element.get("page") or 0), int(element.get("id", i))])
+        text_parts.append(text)
+        offset += len(text)
+    full_html = "\n".join(html_parts) or "<p>(빈 문서)</p>"
+    return full_html, "\n".join(text_parts) or EMPTY_TEXT, segments
+
+
+def chunk_document(
+    text: str,
+    segments: List[Segment],
+    chunk_size: int = CHUNK_SIZE,
+    chunk_overlap: int = CHUNK_OVERLAP,
+) -> List[Tuple[str, Dict]]:
+    """본문을 청크로 나누고 (청크, {"start", "end", "pages", "elements"}) 반환
+
+    segments 가 없으면(예전 캐시) 오프셋만 기록한다.
+    """
+    splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap, add_start_index=True)
+    starts = [seg[0] for seg in segments]
+    chunks = []
+    for doc in splitter.create_documents([text]):
+        start = doc.metadata.get("start_index", -1)
+        end = start + len(doc.page_content)
+        meta: Dict = {"start": start, "end": end}
+        if segments and start >= 0:
+            lo = max(0, bisect.bisect_right(starts, start) - 1)
+            hi = bisect.bisect_left(starts, end)
+            covered = segments[lo:max(hi, lo + 1)]
+            meta["pages"] = sorted({seg[2] for seg in covered})
+            meta["elements"] = [covered[0][3], covered[-1][3]]
+        chunks.append((doc.page_content, meta))
+    return chunks
@@ -0,0 +1,145 @@
+"""
+pickle 없는 벡터 저장 형식
+--------------------------------
+버전 디렉터리 하나에 다음 두 파일을 둔다.
+
+    index.faiss       ← faiss.write_index (검색용은 mmap 으로 열어 워커 간 페이지 캐시 공유)
+    docstore.sqlite   ← chunks(pos, id, text, metadata) + info(key, value)
+
+검색용 로드는 인덱스를 mmap 으로 열고 청크 본문/메타데이터는 id 로 필요할 때만 SQLite 에서 읽으므로
+워커 수가 늘어도 RSS 가 거의 늘지 않고, 시작 시 docstore 전체를 역직렬화하지 않는다.
+쓰기용 로드는 기존처럼 InMemoryDocstore 로 모두 읽어 LangChain FAISS 의 add/delete 를 그대로 쓴다.
+예전 형식(index.pkl)은 읽기만 지원하며 다음 저장 때 새 형식으로 바뀐다.
+"""
+import json
+import sqlite3
+import threading
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Dict, Iterator, Union
+
+import faiss
+from langchain_community.docstore.base import Docstore
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+from langchain_community.vectorstores.utils import DistanceStrategy
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+INDEX_FILE = "index.faiss"
+DOCSTORE_FILE = "docstore.sqlite"
+MMAP_FLAGS = faiss.IO_FLAG_READ_ONLY | faiss.IO_FLAG_MMAP | getattr(faiss, "IO_FLAG_MMAP_IFC", 0)
+
+
+class _SQLiteReader:
+    """스레드별 읽기 전용 SQLite 연결"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._local = threading.local()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+            self._local.conn = conn
+        return conn
+
+
+class SQLiteDocstore(Docstore):
+    """id 로 청크를 그때그때 읽는 읽기 전용 docstore"""
+
+    def __init__(self, reader: _SQLiteReader):
+        self._reader = reader
+
+    def search(self, search: str) -> Union[str, Document]:
+        row = self._reader.conn.execute("SELECT text, metadata FROM chunks WHERE id = ?", (search,)).fetchone()
+        if row is None:
+            return f"ID {search} not found."
+        return Document(id=search, page_content=row[0], metadata=json.loads(row[1]))
+
+
+class SQLiteIndexMapping(Mapping):
+    """faiss 위치 → docstore id 를 필요할 때만 조회하는 매핑"""
+
+    def __init__(self, reader: _SQLiteReader):
+        self._reader = reader
+
+    def __getitem__(self, pos: int) -> str:
+        row = self._reader.conn.execute("SELECT id FROM chunks WHERE pos = ?", (int(pos),)).fetchone()
+        if row is None:
+            raise KeyError(pos)
+        return row[0]
+
+    def __iter__(self) -> Iterator[int]:
+        return (pos for (pos,) in self._reader.conn.execute("SELECT pos FROM chunks ORDER BY pos"))
+
+    def __len__(self) -> int:
+        return self._reader.conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+
+
+def save_store(store: FAISS, path: Path) -> None:
+    """FAISS 저장소를 index.faiss + docstore.sqlite 로 저장"""
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    faiss.write_index(store.index, str(path / INDEX_FILE))
+
+    db_path = path / DOCSTORE_FILE
+    if db_path.exists():
+        db_path.unlink()
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute("CREATE TABLE chunks (pos INTEGER PRIMARY KEY, id TEXT NOT NULL UNIQUE, text TEXT NOT NULL, metadata TEXT NOT NULL)")
+        conn.execute("CREATE TABLE info (key TEXT PRIMARY KEY, value TEXT)")
+        rows = []
+        for pos, doc_id in store.index_to_docstore_id.items():
+            doc = store.docstore.search(doc_id)
+            if isinstance(doc, str):
+                continue
+            rows.append((int(pos), doc_id, doc.page_content, json.dumps(doc.metadata, ensure_ascii=False, default=str)))
+        conn.executemany("INSERT INTO chunks VALUES (?, ?, ?, ?)", rows)
+        conn.executemany("INSERT INTO info VALUES (?, ?)", [
+            ("distance_strategy", store.distance_strategy.value),
+            ("normalize_L2", json.dumps(bool(store._normalize_L2))),
+        ])
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _info(conn: sqlite3.Connection) -> Dict[str, str]:
+    return dict(conn.execute("SELECT key, value FROM info"))
+
+
+def load_store(path: Path, embeddings: Embeddings, mmap: bool = True) -> FAISS:
+    """저장소 로드
+
+    mmap=True  : 검색 전용 (인덱스 mmap + SQLite 지연 조회)
+    mmap=False : 수정용 (인덱스·docstore 전체를 메모리로)
+    """
+    path = Path(path)
+    db_path = path / DOCSTORE_FILE
+    if not db_path.exists():
+        # 예전 형식 (index.pkl)
+        return FAISS.load_local(str(path), embeddings, allow_dangerous_deserialization=True,)
+
+    reader = _SQLiteReader(db_path)
+    info = _info(reader.conn)
+    kwargs = dict(
+        embedding_function=embeddings,
+        distance_strategy=DistanceStrategy(info.get("distance_strategy", DistanceStrategy.EUCLIDEAN_DISTANCE.value)),
+        normalize_L2=json.loads(info.get("normalize_L2", "false")),
+    )
+    if mmap:
+        index = faiss.read_index(str(path / INDEX_FILE), MMAP_FLAGS)
+        return FAISS(index=index, docstore=SQLiteDocstore(reader), index_to_docstore_id=SQLiteIndexMapping(reader), **kwargs)
+
+    index = faiss.read_index(str(path / INDEX_FILE))
+    docs: Dict[str, Document] = {}
+    mapping: Dict[int, str] = {}
+    for pos, doc_id, text, meta in reader.conn.execute("SELECT pos, id, text, metadata FROM chunks ORDER BY pos"):
+        docs[doc_id] = Document(id=doc_id, page_content=text, metadata=json.loads(meta))
+        mapping[pos] = doc_id
+    reader.conn.close()
+    return FAISS(index=index, docstore=InMemoryDocstore(docs), index_to_docstore_id=mapping, **kwargs)
@@ -0,0 +1,281 @@
+"""
+공용 임베딩 서비스
+--------------------------------
+``get_embeddings(model)`` 은 모델별로 하나뿐인 ``CachedEmbeddings`` 를 돌려준다.
+
+* 영속 캐시 – (모델, sha256(본문)) → float32 벡터.
+  ``embedding_cache/<모델>/vectors.f32`` 에 행 단위로 이어 쓰고 읽을 때는 memmap,
+  키 → 행 번호는 같은 디렉터리의 ``keys.sqlite``. 여러 워커 프로세스가 같은 캐시를 공유한다.
+* 문서(passage) 임베딩 – 캐시에 없는 본문만 중복 제거 후 ``EMBED_BATCH_SIZE`` 개씩 묶어
+  최대 ``EMBED_MAX_IN_FLIGHT`` 개 요청을 동시에 보낸다.
+* 질의(query) 임베딩 – 프로세스 내 LRU(``QUERY_EMBED_LRU``) → 영속 캐시 → API 순서로 조회.
+  async 라우트는 ``aembed_queries`` 로 AsyncOpenAI 클라이언트를 쓴다 (utils.upstream 한도·타임아웃).
+
+따라서 말뭉치가 그대로면 인덱스를 다시 만들어도 임베딩 API 호출이 없다.
+"""
+import asyncio
+import fcntl
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_upstage import UpstageEmbeddings
+from langchain_upstage.embeddings import MAX_EMBED_BATCH_SIZE
+
+from utils.upstream import call_upstream
+
+logger = logging.getLogger("pnu_parser")
+
+EMBED_CACHE_DIR = Path(os.getenv("EMBED_CACHE_DIR", "./embedding_cache"))
+EMBED_BATCH_SIZE = min(int(os.getenv("EMBED_BATCH_SIZE", "64")), MAX_EMBED_BATCH_SIZE)
+EMBED_MAX_IN_FLIGHT = int(os.getenv("EMBED_MAX_IN_FLIGHT", "4"))
+QUERY_EMBED_LRU = int(os.getenv("QUERY_EMBED_LRU", "1024"))
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class VectorCache:
+    """(본문 해시) → float32 벡터 영속 캐시 (모델 하나당 디렉터리 하나)"""
+
+    DATA_FILE = "vectors.f32"
+    KEY_FILE = "keys.sqlite"
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path / self.KEY_FILE, check_same_thread=False, timeout=30)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS rows (key TEXT PRIMARY KEY, row INTEGER NOT NULL)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS info (key TEXT PRIMARY KEY, value TEXT)")
+        self._conn.commit()
+        self.dim: Optional[int] = None
+        dim = self._conn.execute("SELECT value FROM info WHERE key = 'dim'").fetchone()
+        if dim:
+            self.dim = int(dim[0])
+        self._rows: Dict[str, int] = dict(self._conn.execute("SELECT key, row FROM rows"))
+        self._view: Optional[np.memmap] = None
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def _vectors(self, max_row: int) -> np.memmap:
+        """max_row 행까지 보이는 memmap (다른 프로세스가 이어 쓴 행이 있으면 다시 매핑)"""
+        if self._view is None or max_row >= len(self._view):
+            n = (self.path / self.DATA_FILE).stat().st_size // (self.dim * 4)
+            self._view = np.memmap(self.path / self.DATA_FILE, dtype=np.float32, mode="r", shape=(n, self.dim))
+        return self._view
+
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        with self._lock:
+            missing = [k for k in keys if k not in self._rows]
+            if missing:
+                # 다른 프로세스가 넣은 키 반영
+                for i in range(0, len(missing), 500):
+                    part = missing[i:i + 500]
+                    marks = ",".join("?" * len(part))
+                    self._rows.update(self._conn.execute(f"SELECT key, row FROM rows WHERE key IN ({marks})", part))
+            rows = {k: self._rows[k] for k in keys if k in self._rows}
+            if not rows:
+                return {}
+            view = self._vectors(max(rows.values()))
+            return {k: np.array(view[r]) for k, r in rows.items()}
+
+    def put_many(self, items: Dict[str, np.ndarray]) -> None:
+        if not items:
+            return
+        with self._lock:
+            items = {k: v for k, v in items.items() if k not in self._rows}
+            if not items:
+                return
+            if self.dim is None:
+                self.dim = len(next(iter(items.values())))
+                self._conn.execute("INSERT OR IGNORE INTO info VALUES ('dim', ?)", (str(self.dim),))
+            block = np.stack([np.asarray(v, dtype=np.float32) for v in items.values()])
+            with open(self.path / self.DATA_FILE, "ab") as f:
+                fcntl.flock(f, fcntl.LOCK_EX)  # 프로세스 간 append 직렬화 → 행 번호 = 파일 끝 위치
+                try:
+                    f.seek(0, os.SEEK_END)
+                    start = f.tell() // (self.dim * 4)
+                    f.write(block.tobytes())
+                    f.flush()
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+            rows = [(k, start + i) for i, k in enumerate(items)]
+            self._conn.executemany("INSERT OR IGNORE INTO rows VALUES (?, ?)", rows)
+            self._conn.commit()
+            self._rows.update(rows)
+
+
+class CachedEmbeddings(Embeddings):
+    """캐시·배치·동시 요청을 갖춘 임베딩 (LangChain Embeddings 호환)"""
+
+    def __init__(
+        self,
+        base: Embeddings,
+        cache_dir: Path = EMBED_CACHE_DIR,
+        batch_size: int = EMBED_BATCH_SIZE,
+        max_in_flight: int = EMBED_MAX_IN_FLIGHT,
+        query_lru: int = QUERY_EMBED_LRU,
+        before_request: Optional[Callable[[], None]] = None,
+    ):
+        """
+        args:
+            base: 실제 API 를 호출하는 임베딩 (UpstageEmbeddings 면 -passage / -query 모델을 구분해 캐시)
+            before_request: API 요청 직전마다 호출 (rate limiter 연결용)
+        """
+        self.base = base
+        self.batch_size = batch_size
+        self.before_request = before_request
+        model = getattr(base, "model", type(base).__name__)
+        self.passage_cache = VectorCache(Path(cache_dir) / f"{model}-passage")
+        self.query_cache = VectorCache(Path(cache_dir) / f"{model}-query")
+        self._lru: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lru_size = query_lru
+        self._lru_lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max(1, max_in_flight), thread_name_prefix="embed")
+        self.stats = {"requests": 0, "embedded": 0, "cache_hits": 0, "lru_hits": 0}
+        self._stats_lock = threading.Lock()
+        if isinstance(base, UpstageEmbeddings):
+            base.embed_batch_size = batch_size  # 배치 하나 = 요청 하나
+
+    def _count(self, **delta: int) -> None:
+        with self._stats_lock:
+            for key, n in delta.items():
+                self.stats[key] += n
+
+    # ── API 호출 ──
+    def _embed_passages(self, texts: List[str]) -> List[List[float]]:
+        if self.before_request:
+            self.before_request()
+        self._count(requests=1, embedded=len(texts))
+        return self.base.embed_documents(texts)
+
+    def _embed_queries(self, texts: List[str]) -> List[List[float]]:
+        if self.before_request:
+            self.before_request()
+        self._count(requests=1, embedded=len(texts))
+        if isinstance(self.base, UpstageEmbeddings):
+            params = self.base._invocation_params
+            params["model"] = params["model"] + "-query"
+            return [r.embedding for r in self.base.client.create(input=texts, **params).data]
+        return [self.base.embed_query(t) for t in texts]
+
+    async def _aembed_queries(self, texts: List[str]) -> List[List[float]]:
+        self._count(requests=1, embedded=len(texts))
+        if isinstance(self.base, UpstageEmbeddings):
+            params = self.base._invocation_params
+            params["model"] = params["model"] + "-query"
+            response = await call_upstream("upstage_embed", self.base.async_client.create(input=texts, **params))
+            return [r.embedding for r in response.data]
+        return [await call_upstream("upstage_embed", self.base.aembed_query(t)) for t in texts]
+
+    def _lookup(self, texts: List[str], cache: VectorCache):
+        """(키 목록, 캐시에서 찾은 벡터, 캐시에 없는 {키: 본문})"""
+        keys = [text_hash(t) for t in texts]
+        found = cache.get_many(list(dict.fromkeys(keys)))
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in found:
+                missing.setdefault(key, text)
+        self._count(cache_hits=len(keys) - sum(1 for k in keys if k in missing))
+        return keys, found, missing
+
+    def _embed(self, texts: List[str], cache: VectorCache, call: Callable[[List[str]], List[List[float]]]) -> List[np.ndarray]:
+        """캐시 조회 → 없는 본문만 중복 제거해 배치 병렬 임베딩 → 캐시 저장"""
+        keys, found, missing = self._lookup(texts, cache)
+
+        if missing:
+            pending = list(missing.items())
+            batches = [pending[i:i + self.batch_size] for i in range(0, len(pending), self.batch_size)]
+            for batch, vectors in zip(batches, self._pool.map(lambda b: call([t for _, t in b]), batches)):
+                fresh = {key: np.asarray(vec, dtype=np.float32) for (key, _), vec in zip(batch, vectors)}
+                cache.put_many(fresh)  # 배치마다 저장 → 중간에 실패해도 끝난 배치는 남는다
+                found.update(fresh)
+            logger.info(f"[EMBED] {len(missing)}개 임베딩 ({len(batches)}회 요청), 캐시 {len(keys) - len(missing)}개")
+        return [found[k] for k in keys]
+
+    # ── Embeddings 인터페이스 ──
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [v.tolist() for v in self._embed(list(texts), self.passage_cache, self._embed_passages)]
+
+    def _lru_get(self, texts: List[str]) -> Dict[int, List[float]]:
+        results: Dict[int, List[float]] = {}
+        with self._lru_lock:
+            for i, text in enumerate(texts):
+                if text in self._lru:
+                    self._lru.move_to_end(text)
+                    results[i] = self._lru[text]
+        self._count(lru_hits=len(results))
+        return results
+
+    def _lru_put(self, results: Dict[int, List[float]], texts: List[str], indices: List[int], vectors: List[np.ndarray]) -> List[List[float]]:
+        with self._lru_lock:
+            for i, vec in zip(indices, vectors):
+                results[i] = vec.tolist()
+                self._lru[texts[i]] = results[i]
+                self._lru.move_to_end(texts[i])
+            while len(self._lru) > self._lru_size:
+                self._lru.popitem(last=False)
+        return [results[i] for i in range(len(texts))]
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """질의 여러 개 (LRU → 영속 캐시 → 배치 API)"""
+        results = self._lru_get(texts)
+        rest = [i for i in range(len(texts)) if i not in results]
+        vectors = self._embed([texts[i] for i in rest], self.query_cache, self._embed_queries) if rest else []
+        return self._lru_put(results, texts, rest, vectors)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_queries([text])[0]
+
+    async def aembed_queries(self, texts: List[str]) -> List[List[float]]:
+        """embed_queries 의 async 버전 (캐시에 없는 질의는 한 번의 배치 요청)"""
+        results = self._lru_get(texts)
+        rest = [i for i in range(len(texts)) if i not in results]
+        vectors: List[np.ndarray] = []
+        if rest:
+            keys, found, missing = self._lookup([texts[i] for i in rest], self.query_cache)
+            if missing:
+                pending = list(missing.items())
+                fresh: Dict[str, np.ndarray] = {}
+                for start in range(0, len(pending), self.batch_size):
+                    batch = pending[start:start + self.batch_size]
+                    embedded = await self._aembed_queries([t for _, t in batch])
+                    fresh.update({key: np.asarray(vec, dtype=np.float32) for (key, _), vec in zip(batch, embedded)})
+                await asyncio.to_thread(self.query_cache.put_many, fresh)
+                found.update(fresh)
+            vectors = [found[k] for k in keys]
+        return self._lru_put(results, texts, rest, vectors)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return (await self.aembed_queries([text]))[0]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        # 문서 임베딩은 색인 작업(백그라운드 스레드) 경로라 스레드에서 실행
+        return await asyncio.to_thread(self.embed_documents, texts)
+
+
+_services: Dict[str, CachedEmbeddings] = {}
+_services_lock = threading.Lock()
+
+
+def get_embeddings(model: str = "solar-embedding-1-large", before_request: Optional[Callable[[], None]] = None) -> CachedEmbeddings:
+    """모델별 공용 임베딩 서비스 (before_request 를 주면 공용 인스턴스에 연결)"""
+    with _services_lock:
+        service = _services.get(model)
+        if service is None:
+            service = CachedEmbeddings(UpstageEmbeddings(model=model, upstage_api_key=os.getenv("UPSTAGE_API_KEY")))
+            _services[model] = service
+        if before_request is not None:
+            service.before_request = before_request
+        return service
@@ -0,0 +1,78 @@
+"""
+증분 크롤링 frontier
+--------------------------------
+키워드/카테고리(``CATEGORY_SEQ``)별로 처리한 가장 최신 글 id·URL 과
+backfill 체크포인트(다음에 읽을 목록 페이지)를 JSON 으로 보관한다.
+
+게시판은 최신 글이 먼저 나오므로, 일반 새로고침은 frontier 이하의 글을 만나면 즉시 멈춘다.
+"""
+import json
+import logging
+import os
+import re
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+logger = logging.getLogger("pnu_parser")
+
+ARTICLE_ID_RE = re.compile(r"/(\d+)/artclView\.do")
+
+
+def article_id(href: str) -> Optional[int]:
+    """'/bbs/cse/2605/1728294/artclView.do' → 1728294"""
+    match = ARTICLE_ID_RE.search(href or "")
+    return int(match.group(1)) if match else None
+
+
+class CrawlFrontier:
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict] = {}
+        if self.path.exists():
+            try:
+                self._entries = json.loads(self.path.read_text(encoding="utf-8"))
+            except ValueError as e:
+                logger.warning(f"[FRONTIER] 파일 손상 – 초기화: {e}")
+
+    @staticmethod
+    def key(keyword: str, category: str) -> str:
+        return f"{category}:{keyword}"
+
+    def get(self, keyword: str, category: str) -> Dict:
+        with self._lock:
+            return dict(self._entries.get(self.key(keyword, category), {}))
+
+    def last_seen(self, keyword: str, category: str) -> int:
+        return self.get(keyword, category).get("last_article_id", 0)
+
+    def advance(self, keyword: str, category: str, last_article_id: int, url: str) -> None:
+        """최신 처리 글 갱신 (더 큰 id 일 때만)"""
+        with self._lock:
+            entry = self._entries.setdefault(self.key(keyword, category), {})
+            if last_article_id > entry.get("last_article_id", 0):
+                entry["last_article_id"] = last_article_id
+                entry["last_url"] = url
+                entry["updated_at"] = datetime.now().isoformat(timespec="seconds")
+
+    def backfill_checkpoint(self, keyword: str, category: str) -> Dict:
+        """{"next_page": int, "done": bool}"""
+        return self.get(keyword, category).get("backfill", {"next_page": 1, "done": False})
+
+    def set_backfill_checkpoint(self, keyword: str, category: str, next_page: int, done: bool = False) -> None:
+        with self._lock:
+            entry = self._entries.setdefault(self.key(keyword, category), {})
+            entry["backfill"] = {
+                "next_page": next_page,
+                "done": done,
+                "updated_at": datetime.now().isoformat(timespec="seconds"),
+            }
+
+    def save(self) -> None:
+        with self._lock:
+            data = json.dumps(self._entries, ensure_ascii=False, indent=2)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(data, encoding="utf-8")
+        os.replace(tmp, self.path)
@@ -1,20 +1,29 @@
-from openai import OpenAI  # openai==1.52.2
+from openai import AsyncOpenAI, OpenAI  # openai==1.52.2
+import asyncio
 import json
 from dotenv import load_dotenv
 import os
 load_dotenv()
-from utils.chat import RAG_chat, make_vectorstore
+from utils.chat import RAG_chat
 from langchain_community.vectorstores import FAISS
-from db.db import SessionLocal, Document
+from db.db import AsyncSessionLocal, SessionLocal
+from db.query import aeligible_documents, eligible_documents
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from utils.upstream import call_upstream, limit_for, upstream
+from dataclasses import dataclass
 api_key = os.getenv("UPSTAGE_API_KEY")
-import requests
-from typing import List, Dict, Optional
-API_BASE_URL = "http://localhost:8000"
+from typing import Any, Callable, Dict, Optional
 
 client = OpenAI(
     api_key=api_key,
     base_url="https://api.upstage.ai/v1"
 )
+async_client = AsyncOpenAI(
+    api_key=api_key,
+    base_url="https://api.upstage.ai/v1",
+    timeout=limit_for("upstage_chat").timeout,
+)
 
 def get_db():
     db = SessionLocal()
@@ -26,28 +35,115 @@ def get_db():
 def ask_llm(question: str, vectorstore: FAISS, top_k: int):
     return RAG_chat(question, vectorstore, top_k=top_k)
 
-def filter_documents_api(min_gpa: Optional[float] = None, 
-                         grade: Optional[int] = None, 
-                         status: Optional[str] = None,):
-    params = {}
-    if min_gpa is not None:
-        params["min_gpa"] = min_gpa
-    if grade is not None:
-        params["grade"] = grade
-    if status is not None:
-        params["status"] = status
-    response = requests.get(f"{API_BASE_URL}/documents/filter", params=params)
-    if response.status_code == 200:
-        return response.json()
-    else:
-        raise Exception(f"Failed to filter documents: {response.status_code} {response.text}")
+# ───────── tool 레지스트리 ─────────
+# LLM 에 노출할 함수는 register_tool 로 등록한다. HTTP 라우트 없이 같은 프로세스에서
+# 요청의 DB 세션을 그대로 받아 실행된다 (db 는 LLM 인자가 아니라 호출 측이 넘김).
+# async 경로용 구현은 register_async_impl 로 같은 이름에 붙인다 (없으면 sync 함수를 스레드에서 실행).
+
+@dataclass
+class Tool:
+    name: str
+    description: str
+    parameters: Dict[str, Any]
+    func: Callable[..., Any]
+    afunc: Optional[Callable[..., Any]] = None
+
+    def schema(self) -> Dict[str, Any]:
+        return {
+            "type": "function",
+            "function": {"name": self.name, "description": self.description, "parameters": self.parameters},
+        }
+
+
+TOOL_REGISTRY: Dict[str, Tool] = {}
+
+
+def register_tool(name: str, description: str, parameters: Dict[str, Any]):
+    """함수를 LLM tool 로 등록. 함수는 func(db=세션, **LLM 인자) 로 호출된다."""
+    def decorator(func):
+        TOOL_REGISTRY[name] = Tool(name, description, parameters, func)
+        return func
+    return decorator
+
+
+def register_async_impl(name: str):
+    """등록된 tool 의 async 구현 (func(db=AsyncSession, **LLM 인자))"""
+    def decorator(afunc):
+        TOOL_REGISTRY[name].afunc = afunc
+        return afunc
+    return decorator
+
+
+def _tool_args(name: str, arguments: Dict[str, Any]):
+    tool = TOOL_REGISTRY.get(name)
+    if tool is None:
+        raise Exception(f"Unknown function: {name}")
+    allowed = tool.parameters.get("properties", {})
+    return tool, {k: v for k, v in arguments.items() if k in allowed}
+
+
+def call_tool(name: str, arguments: Dict[str, Any], db: Optional[Session] = None):
+    tool, kwargs = _tool_args(name, arguments)
+    return tool.func(db=db, **kwargs)
+
+
+async def acall_tool(name: str, arguments: Dict[str, Any], db: Optional[AsyncSession] = None):
+    tool, kwargs = _tool_args(name, arguments)
+    if tool.afunc is not None:
+        return await tool.afunc(db=db, **kwargs)
+    return await asyncio.to_thread(tool.func, db=None, **kwargs)
+
+
+@register_tool(
+    "filter_documents_api",
+    "질문에 맞는 데이터베이스 출력을 만드는 함수",
+    {
+        "type": "object",
+        "properties": {
+            "min_gpa": {
+                "type": "number",
+                "description": "GPA 조건",
+            },
+            "grade": {
+                "type": "integer",
+                "description": "학년 조건",
+            },
+            "status": {
+                "type": "string",
+                "description": "재학 상태 조건 (재학 또는 휴학)",
+                "enum": ["재학", "휴학"]
+            },
+        },
+    },
+)
+def filter_documents_api(min_gpa: Optional[float] = None,
+                         grade: Optional[int] = None,
+                         status: Optional[str] = None,
+                         db: Optional[Session] = None):
+    """/documents/filter 와 같은 쿼리를 프로세스 안에서 실행 (db 가 없으면 세션을 직접 연다)"""
+    if db is not None:
+        return eligible_documents(db, min_gpa=min_gpa, grade=grade, status=status)
+    db = SessionLocal()
+    try:
+        return eligible_documents(db, min_gpa=min_gpa, grade=grade, status=status)
+    finally:
+        db.close()
+
+
+@register_async_impl("filter_documents_api")
+async def afilter_documents_api(min_gpa: Optional[float] = None,
+                                grade: Optional[int] = None,
+                                status: Optional[str] = None,
+                                db: Optional[AsyncSession] = None):
+    if db is not None:
+        return await call_upstream("db", aeligible_documents(db, min_gpa=min_gpa, grade=grade, status=status))
+    async with AsyncSessionLocal() as db:
+        return await call_upstream("db", aeligible_documents(db, min_gpa=min_gpa, grade=grade, status=status))
 
 
 # Step 2: Send the query and available functions to the model
 def run_conversation(question: str, *args, **kwargs):
-    vectorstore = kwargs.get("vectorstore")
     db = kwargs.get("db")
-    top_k = kwargs.get("top_k")
     messages = [
         {
             "role": "user",
@@ -55,106 +151,41 @@ def run_conversation(question: str, *args, **kwargs):
         }
     ]
 
-    tools = [
-        {
-            "type": "function",
-            "function": {
-                "name": "filter_documents_api",
-                "description": "질문에 맞는 데이터베이스 출력을 만드는 함수",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "min_gpa": {
-                            "type": "number",
-                            "description": "GPA 조건",
-                        },
-                        "grade": {
-                            "type": "integer",
-                            "description": "학년 조건",
-                        },
-                        "status": {
-                            "type": "string",
-                            "description": "재학 상태 조건 (재학 또는 휴학)",
-                            "enum": ["재학", "휴학"]
-                        },
-                        "db": {
-                            "type": "object",
-                            "description": "데이터베이스",
-                        }
-                    },
-                    "required": ["db"],
-                },
-            },
-        },
-        # {
-        #     "type": "function",
-        #     "function": {
-        #         "name": "ask_llm",
-        #         "description": "벡터 저장소에 저장된 데이터를 참고하여 질문에 대한 답변을 생성하는 쿼리 내장 함수",
-        #         "parameters": {
-        #             "type": "object",
-        #             "properties": {
-        #                 "question": {
-        #                     "type": "string",
-        #                     "description": "질문",
-        #                 },
-        #                 "vectorstore": {
-        #                     "type": "object",
-        #                     "description": "벡터 저장소",
-        #                 },
-        #             },
-        #             "required": ["question", "vectorstore"],
-        #         },
-        #     },
-        # }
-    ]
- 
     # Step 3: Check if the model has requested a function call
     # The model identifies that the query requires external data (e.g., real-time weather) and decides to call a relevant function, such as a weather API.
     response = client.chat.completions.create(
         model="solar-pro",
         messages=messages,
-        tools=tools,
+        tools=[tool.schema() for tool in TOOL_REGISTRY.values()],
         tool_choice="auto"
     )
     response_message = response.choices[0].message
     tool_calls = response_message.tool_calls
- 
+
     # Step 4: Execute the function call
     # The JSON response from the model may not always be valid, so handle errors appropriately
     if tool_calls:
-        available_functions = {
-            "filter_documents_api": filter_documents_api,
-            # "ask_llm": ask_llm,
-        }  # You can define multiple functions here as needed
-        messages.append(response_message)  # Add the assistant's reply to the conversation history
- 
-        # Step 5: Process each function call and provide the results to the model
-        for tool_call in tool_calls:
-            function_name = tool_call.function.name
-            function_to_call = available_functions[function_name]
-            function_args = json.loads(tool_call.function.arguments)
-            # 함수에 따른 인자 전달
-            if function_name == "filter_documents_api":
-                function_response = function_to_call(
-                    min_gpa=function_args.get("min_gpa"),
-                    grade=function_args.get("grade"),
-                    status=function_args.get("status"),
-                )
-                return function_response
-            elif function_name == "ask_llm":
-                function_response = function_to_call(
-                    question=function_args.get("question"),
-                    vectorstore=vectorstore,
-                    top_k=top_k
-                )
-                return function_response
-            else:
-                raise Exception(f"Unknown function: {function_name}")
-            
+        # Step 5: 첫 번째 tool 결과를 그대로 반환 (요청의 DB 세션 공유)
+        tool_call = tool_calls[0]
+        function_args = json.loads(tool_call.function.arguments or "{}")
+        return call_tool(tool_call.function.name, function_args, db=db)
+
+async def arun_conversation(question: str, db: Optional[AsyncSession] = None):
+    """run_conversation 의 async 버전 (AsyncOpenAI + async tool 구현)"""
+    async with upstream("upstage_chat"):
+        response = await async_client.chat.completions.create(
+            model="solar-pro",
+            messages=[{"role": "user", "content": question}],
+            tools=[tool.schema() for tool in TOOL_REGISTRY.values()],
+            tool_choice="auto"
+        )
+    tool_calls = response.choices[0].message.tool_calls
+    if tool_calls:
+        tool_call = tool_calls[0]
+        return await acall_tool(tool_call.function.name, json.loads(tool_call.function.arguments or "{}"), db=db)
+
 if __name__ == "__main__":
-    vectorstore = make_vectorstore()
     question = "GPA 3.9 이상인 학생은 어떤 장학금을 받을 수 있나요?"
     #question = "예술 전공 학생은 장학금을 어떻게 받을 수 있나요?"
-    response = run_conversation(question, vectorstore)
-    print(response.choices[0].message.content)
\ No newline at end of file
+    response = run_conversation(question)
+    print(response)
\ No newline at end of file
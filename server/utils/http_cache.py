@@ -0,0 +1,88 @@
+"""
+조건부 HTTP 요청용 validator 저장소
+--------------------------------
+URL(또는 POST 요청 키)별로 ETag / Last-Modified / Content-Length 와
+크롤러가 붙인 부가 정보(첨부 sha256, 목록 행 시그니처, 처리 완료 여부)를 JSON 으로 보관한다.
+
+    store = ValidatorStore(Path("http_validators.json"))
+    headers = store.conditional_headers(url)      # If-None-Match / If-Modified-Since
+    if store.is_unchanged(url, resp): ...          # 304 또는 동일 validator
+    store.record(url, resp, sha256=...)
+    store.save()
+"""
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import urlencode
+
+import requests
+
+logger = logging.getLogger("pnu_parser")
+
+
+def request_key(url: str, data: Optional[Dict[str, str]] = None) -> str:
+    """POST 본문까지 포함한 캐시 키 (GET 은 url 그대로)"""
+    if not data:
+        return url
+    return f"{url}?{urlencode(sorted(data.items()))}"
+
+
+class ValidatorStore:
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict] = {}
+        if self.path.exists():
+            try:
+                self._entries = json.loads(self.path.read_text(encoding="utf-8"))
+            except ValueError as e:
+                logger.warning(f"[HTTP] validator 파일 손상 – 초기화: {e}")
+
+    def get(self, key: str) -> Dict:
+        with self._lock:
+            return dict(self._entries.get(key, {}))
+
+    def conditional_headers(self, key: str) -> Dict[str, str]:
+        entry = self.get(key)
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def is_unchanged(self, key: str, resp: requests.Response) -> bool:
+        """304 이거나, 서버가 조건부 요청을 무시했어도 validator 가 이전과 같으면 True"""
+        if resp.status_code == 304:
+            return True
+        entry = self.get(key)
+        etag = resp.headers.get("ETag")
+        if etag and etag == entry.get("etag"):
+            return True
+        last_modified = resp.headers.get("Last-Modified")
+        length = resp.headers.get("Content-Length")
+        return bool(
+            last_modified and length
+            and last_modified == entry.get("last_modified")
+            and length == entry.get("content_length")
+        )
+
+    def record(self, key: str, resp: Optional[requests.Response] = None, **extra) -> None:
+        """응답의 validator 와 부가 정보 저장 (resp 가 None 이면 부가 정보만 갱신)"""
+        with self._lock:
+            entry = self._entries.setdefault(key, {})
+            if resp is not None and resp.status_code != 304:
+                entry["etag"] = resp.headers.get("ETag")
+                entry["last_modified"] = resp.headers.get("Last-Modified")
+                entry["content_length"] = resp.headers.get("Content-Length")
+            entry.update(extra)
+
+    def save(self) -> None:
+        with self._lock:
+            data = json.dumps(self._entries, ensure_ascii=False, indent=2)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(data, encoding="utf-8")
+        os.replace(tmp, self.path)
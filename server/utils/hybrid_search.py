@@ -0,0 +1,138 @@
+"""
+하이브리드 검색 (BM25 + FAISS, reciprocal-rank fusion)
+--------------------------------
+* ``keyword_search`` – 짧은 키워드 질의("푸른등대", "국가근로 2학기")이고 BM25 1위 청크가 질의 용어를
+  ``LEXICAL_MIN_COVERAGE`` 이상 포함하면 BM25 결과만 반환 → 임베딩 호출 없음
+* 그 외에는 벡터·BM25 결과를 각각 2k 개 가져와 RRF(1 / (``HYBRID_RRF_K`` + 순위))로 합친다.
+
+반환 형식은 utils.vector_index.search_many 와 같은 [(Document, 점수)] (점수는 RRF 또는 BM25 값).
+selection(utils.chunk_filters.ChunkFilters.select 결과)을 주면 벡터·BM25 모두 그 청크 안에서만 검색한다.
+group_by(메타데이터 키, 예: "notice_title")를 주면 양쪽 모두 그룹 단위로 접어 서로 다른 그룹 k 개를 반환한다
+(벡터 쪽은 utils.vector_index.search_diverse, mmr_lambda 로 MMR).
+"""
+import asyncio
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+
+from utils.chunk_filters import Selection
+from utils.lexical_index import LexicalIndex
+from utils.vector_index import DIVERSE_FETCH_FACTOR, asearch_many, asearch_many_diverse, collapse_hits, search_many, search_many_diverse
+
+HYBRID_RRF_K = int(os.getenv("HYBRID_RRF_K", "60"))
+LEXICAL_MIN_COVERAGE = float(os.getenv("LEXICAL_MIN_COVERAGE", "0.8"))
+KEYWORD_MAX_WORDS = int(os.getenv("KEYWORD_MAX_WORDS", "3"))
+# 문장형 질문은 의미 검색이 필요
+QUESTION_CUES = re.compile(r"\?|어떻게|언제|무엇|뭐|어디|누가|왜|알려|있나|있어|인가|나요|까요|습니까|할\s*수")
+
+Hits = List[Tuple[Document, float]]
+
+
+def _docs(store: FAISS, ranked: List[Tuple[str, float]]) -> Hits:
+    hits = []
+    for doc_id, score in ranked:
+        doc = store.docstore.search(doc_id)
+        if not isinstance(doc, str):
+            hits.append((doc, score))
+    return hits
+
+
+def is_keyword_query(query: str) -> bool:
+    return len(query.split()) <= KEYWORD_MAX_WORDS and not QUESTION_CUES.search(query)
+
+
+def _lexical_ranked(
+    store: FAISS, lexical: LexicalIndex, query: str, k: int, selection: Optional[Selection], group_by: Optional[str]
+) -> Tuple[Hits, float]:
+    """BM25 상위 k 개 (group_by 면 넉넉히 가져와 그룹별 최고 청크 k 개)와 coverage"""
+    allowed = selection.ids if selection is not None else None
+    ranked, coverage = lexical.search(query, k * DIVERSE_FETCH_FACTOR if group_by else k, allowed=allowed)
+    hits = _docs(store, ranked)
+    return (collapse_hits(hits, group_by)[:k] if group_by else hits), coverage
+
+
+def keyword_search(
+    store: FAISS, lexical: Optional[LexicalIndex], query: str, k: int = 4,
+    selection: Optional[Selection] = None, group_by: Optional[str] = None,
+) -> Optional[Hits]:
+    """키워드 질의이고 BM25 가 확실하면 BM25 결과, 아니면 None (벡터 검색 필요)"""
+    if lexical is None or not is_keyword_query(query):
+        return None
+    hits, coverage = _lexical_ranked(store, lexical, query, k, selection, group_by)
+    if not hits or coverage < LEXICAL_MIN_COVERAGE:
+        return None
+    return hits
+
+
+def rrf_fuse(*rankings: Hits, k: int = 4, group_by: Optional[str] = None) -> Hits:
+    """청크(docstore id 대신 본문+url) 또는 metadata[group_by] 기준 reciprocal-rank fusion 상위 k 개
+
+    group_by 면 그룹마다 먼저 나온 랭킹(벡터)의 청크를 대표로 둔다.
+    """
+    scores: Dict[object, float] = {}
+    docs: Dict[object, Document] = {}
+    for ranking in rankings:
+        for rank, (doc, _) in enumerate(ranking):
+            key = doc.metadata.get(group_by) if group_by else (doc.metadata.get("url"), doc.page_content)
+            docs.setdefault(key, doc)
+            scores[key] = scores.get(key, 0.0) + 1.0 / (HYBRID_RRF_K + rank + 1)
+    ranked = sorted(scores.items(), key=lambda item: -item[1])[:k]
+    return [(docs[key], score) for key, score in ranked]
+
+
+def _vector_fetch(lexical: Optional[LexicalIndex], k: int) -> int:
+    return 2 * k if lexical is not None else k
+
+
+def _fuse(
+    store: FAISS, lexical: Optional[LexicalIndex], query: str, k: int, selection: Optional[Selection],
+    group_by: Optional[str], vector_hits: Hits,
+) -> Hits:
+    """벡터 결과에 BM25 상위 2k 개를 RRF 로 합침 (BM25 인덱스가 없으면 벡터 결과 그대로)"""
+    if lexical is None:
+        return vector_hits
+    lexical_hits, _ = _lexical_ranked(store, lexical, query, 2 * k, selection, group_by)
+    return rrf_fuse(vector_hits, lexical_hits, k=k, group_by=group_by)
+
+
+def hybrid_search(
+    store: FAISS, lexical: Optional[LexicalIndex], query: str, k: int = 4, selection: Optional[Selection] = None,
+    group_by: Optional[str] = None, mmr_lambda: Optional[float] = None, shortcut: bool = True,
+) -> Hits:
+    """shortcut=False 면 keyword_search 를 건너뜀 (호출 측이 이미 확인한 경우)"""
+    if selection is not None and not len(selection):
+        return []
+    if shortcut:
+        hits = keyword_search(store, lexical, query, k, selection, group_by)
+        if hits is not None:
+            return hits
+    positions = selection.positions if selection is not None else None
+    fetch = _vector_fetch(lexical, k)
+    if group_by:
+        vector_hits = search_many_diverse(store, [query], fetch, group_by, mmr_lambda, positions=positions)[0]
+    else:
+        vector_hits = search_many(store, [query], k=fetch, positions=positions)[0]
+    return _fuse(store, lexical, query, k, selection, group_by, vector_hits)
+
+
+async def ahybrid_search(
+    store: FAISS, lexical: Optional[LexicalIndex], query: str, k: int = 4, selection: Optional[Selection] = None,
+    group_by: Optional[str] = None, mmr_lambda: Optional[float] = None, shortcut: bool = True,
+) -> Hits:
+    """hybrid_search 의 async 버전 (임베딩은 async 클라이언트, BM25·FAISS 계산은 스레드에서)"""
+    if selection is not None and not len(selection):
+        return []
+    if shortcut:
+        hits = await asyncio.to_thread(keyword_search, store, lexical, query, k, selection, group_by)
+        if hits is not None:
+            return hits
+    positions = selection.positions if selection is not None else None
+    fetch = _vector_fetch(lexical, k)
+    if group_by:
+        vector_hits = (await asearch_many_diverse(store, [query], fetch, group_by, mmr_lambda, positions=positions))[0]
+    else:
+        vector_hits = (await asearch_many(store, [query], k=fetch, positions=positions))[0]
+    return await asyncio.to_thread(_fuse, store, lexical, query, k, selection, group_by, vector_hits)
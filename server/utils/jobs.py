@@ -0,0 +1,132 @@
+"""
+크롤링 작업 큐
+--------------------------------
+* ``CrawlJob``   – 작업 하나가 소유하는 상태(공지/첨부 ID, 수집 결과)와 단계별 진행률
+* ``JobManager`` – 단일 워커 스레드가 큐에서 작업을 꺼내 순서대로 실행
+                   (같은 키워드의 대기/실행 중 작업이 있으면 새 작업을 만들지 않고 합친다)
+"""
+import logging
+import queue
+import threading
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger("pnu_parser")
+
+ACTIVE_STATUSES = ("queued", "running")
+
+
+@dataclass
+class CrawlJob:
+    keyword: str
+    mode: str = "crawl"
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: str = "queued"  # queued / running / success / failed
+    stage: Optional[str] = None  # 현재 단계 (crawl / index)
+    error: Optional[str] = None
+    created_at: datetime = field(default_factory=datetime.now)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    progress: Dict[str, int] = field(default_factory=lambda: {
+        "pages": 0,
+        "notices": 0,
+        "attachments_downloaded": 0,
+        "attachments_parsed": 0,
+        "chunks_embedded": 0,
+    })
+
+    # ── 작업이 소유하는 수집 상태 (예전 모듈 전역 변수, 작업이 끝나면 비움) ──
+    notices: Dict[int, Dict] = field(default_factory=dict)
+    next_notice_id: int = 1
+    next_attach_id: int = 1
+
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def bump(self, key: str, n: int = 1) -> None:
+        """진행률 카운터 증가 (파이프라인 워커 스레드에서 호출)"""
+        with self._lock:
+            self.progress[key] = self.progress.get(key, 0) + n
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            progress = dict(self.progress)
+        return {
+            "job_id": self.id,
+            "keyword": self.keyword,
+            "mode": self.mode,
+            "status": self.status,
+            "stage": self.stage,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "progress": progress,
+        }
+
+
+class JobManager:
+    """큐에 쌓인 CrawlJob 을 하나씩 실행하는 단일 워커"""
+
+    def __init__(self, runner: Callable[[CrawlJob], None], max_history: int = 100):
+        """
+        args:
+            runner: 작업을 실제로 수행하는 함수(CrawlJob 을 받아 상태를 채움)
+            max_history: 보관할 작업 수 (오래된 완료 작업부터 삭제)
+        """
+        self._runner = runner
+        self._max_history = max_history
+        self._jobs: "OrderedDict[str, CrawlJob]" = OrderedDict()
+        self._queue: "queue.Queue[CrawlJob]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+
+    def enqueue(self, keyword: str, mode: str = "crawl") -> Tuple[CrawlJob, bool]:
+        """작업 등록. 반환값: (작업, 새로 만들었는지 여부)"""
+        with self._lock:
+            for job in self._jobs.values():
+                if job.keyword == keyword and job.mode == mode and job.status in ACTIVE_STATUSES:
+                    logger.info(f"[JOB] 기존 작업과 합침: {job.id} ({mode}, {keyword})")
+                    return job, False
+
+            job = CrawlJob(keyword=keyword, mode=mode)
+            self._jobs[job.id] = job
+            self._prune()
+            self._ensure_worker()
+        self._queue.put(job)
+        logger.info(f"[JOB] 등록: {job.id} ({mode}, {keyword})")
+        return job, True
+
+    def get(self, job_id: str) -> Optional[CrawlJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _prune(self) -> None:
+        finished = [jid for jid, j in self._jobs.items() if j.status not in ACTIVE_STATUSES]
+        while len(self._jobs) > self._max_history and finished:
+            self._jobs.pop(finished.pop(0), None)
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._loop, name="crawl-job-worker", daemon=True)
+            self._worker.start()
+
+    def _loop(self) -> None:
+        while True:
+            job = self._queue.get()
+            job.status = "running"
+            job.started_at = datetime.now()
+            try:
+                self._runner(job)
+                job.status = "success"
+            except Exception as e:
+                logger.exception(f"[JOB] 실패: {job.id}")
+                job.status = "failed"
+                job.error = str(e)
+            finally:
+                job.stage = None
+                job.notices = {}  # 끝난 작업은 진행률만 보관 (첨부 본문까지 이력에 남기지 않음)
+                job.finished_at = datetime.now()
+                self._queue.task_done()
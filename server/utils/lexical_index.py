@@ -0,0 +1,189 @@
+"""
+로컬 BM25 어휘 인덱스 (한국어 문자 bigram)
+--------------------------------
+"푸른등대", "국가근로", "2학기" 같은 고유명사·정확한 표현은 임베딩 검색이 약하고, 매 질의마다
+원격 임베딩 호출이 필요하다. FAISS 인덱스와 같은 청크(docstore id)를 대상으로 BM25 인덱스를 둔다.
+
+* 토큰: NFKC + 소문자, 한글 연속 구간은 문자 bigram(한 글자면 그대로), 영문·숫자는 단어 단위
+* 저장: CSR 형태 postings 배열 – ``offsets``(용어별 시작 위치), ``docs``(uint32), ``tfs``(uint16)
+  + 문서 길이·docstore id·용어 목록을 ``lexical.npz`` 하나로 (FAISS 버전 디렉터리에 함께 저장)
+* 갱신: ``sync(store)`` 가 저장소와 id 집합을 비교해 새 청크만 토큰화해 붙이고 삭제된 청크는 제거
+  (전체 재토큰화 없음, 병합은 numpy 정렬 한 번)
+"""
+import logging
+import math
+import re
+import unicodedata
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+logger = logging.getLogger("pnu_parser")
+
+LEXICAL_FILE = "lexical.npz"
+_TOKEN_RE = re.compile(r"[가-힣]+|[a-z0-9]+(?:\.[0-9]+)?")
+
+
+def tokenize(text: str) -> List[str]:
+    tokens = []
+    for run in _TOKEN_RE.findall(unicodedata.normalize("NFKC", text).lower()):
+        if "가" <= run[0] <= "힣" and len(run) > 1:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+        else:
+            tokens.append(run)
+    return tokens
+
+
+class LexicalIndex:
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.terms: Dict[str, int] = {}
+        self.ids: List[str] = []
+        self._positions: Dict[str, int] = {}
+        self._id_array: Optional[np.ndarray] = None  # ids 의 numpy 사본 (allowed 마스크용, ids 가 바뀌면 None)
+        self.doc_len = np.zeros(0, dtype=np.uint32)
+        self.offsets = np.zeros(1, dtype=np.int64)
+        self.docs = np.zeros(0, dtype=np.uint32)
+        self.tfs = np.zeros(0, dtype=np.uint16)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    # ── 저장/로드 ──
+    def save(self, path: Path) -> None:
+        terms = sorted(self.terms, key=self.terms.get)
+        with open(Path(path) / LEXICAL_FILE, "wb") as f:
+            np.savez(
+                f,
+                terms=np.array(terms, dtype=str), ids=np.array(self.ids, dtype=str),
+                doc_len=self.doc_len, offsets=self.offsets, docs=self.docs, tfs=self.tfs,
+            )
+
+    @classmethod
+    def load(cls, path: Path) -> Optional["LexicalIndex"]:
+        """path 에 lexical.npz 가 없으면 None"""
+        file = Path(path) / LEXICAL_FILE
+        if not file.exists():
+            return None
+        index = cls()
+        with np.load(file) as data:
+            index.terms = {term: i for i, term in enumerate(data["terms"].tolist())}
+            index._id_array = data["ids"]
+            index.ids = index._id_array.tolist()
+            index.doc_len, index.offsets = data["doc_len"], data["offsets"]
+            index.docs, index.tfs = data["docs"], data["tfs"]
+        index._positions = {doc_id: i for i, doc_id in enumerate(index.ids)}
+        return index
+
+    # ── 갱신 ──
+    def _rebuild(self, terms: np.ndarray, docs: np.ndarray, tfs: np.ndarray) -> None:
+        """(용어, 문서, tf) 목록을 용어 순 CSR 로 (같은 용어 안에서는 문서 순서 유지)"""
+        order = np.argsort(terms, kind="stable")
+        self.docs = docs[order].astype(np.uint32)
+        self.tfs = tfs[order].astype(np.uint16)
+        counts = np.bincount(terms, minlength=len(self.terms))
+        self.offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+
+    def _term_ids(self) -> np.ndarray:
+        return np.repeat(np.arange(len(self.offsets) - 1), np.diff(self.offsets))
+
+    def add(self, ids: Sequence[str], texts: Sequence[str]) -> int:
+        """새 청크 추가 (이미 있는 id 는 건너뜀). 반환값: 추가한 수"""
+        new_terms, new_docs, new_tfs, lengths = [], [], [], []
+        for doc_id, text in zip(ids, texts):
+            if doc_id in self._positions:
+                continue
+            pos = len(self.ids)
+            self.ids.append(doc_id)
+            self._id_array = None
+            self._positions[doc_id] = pos
+            counts = Counter(tokenize(text))
+            lengths.append(sum(counts.values()))
+            for term, tf in counts.items():
+                new_terms.append(self.terms.setdefault(term, len(self.terms)))
+                new_docs.append(pos)
+                new_tfs.append(min(tf, 65535))
+        if not lengths:
+            return 0
+        self.doc_len = np.concatenate([self.doc_len, np.asarray(lengths, dtype=np.uint32)])
+        self._rebuild(
+            np.concatenate([self._term_ids(), np.asarray(new_terms, dtype=np.int64)]),
+            np.concatenate([self.docs, np.asarray(new_docs, dtype=np.uint32)]),
+            np.concatenate([self.tfs, np.asarray(new_tfs, dtype=np.uint16)]),
+        )
+        return len(lengths)
+
+    def remove(self, ids: Iterable[str]) -> int:
+        """청크 제거 후 문서 번호를 앞으로 당김. 반환값: 제거한 수"""
+        drop = [self._positions[doc_id] for doc_id in ids if doc_id in self._positions]
+        if not drop:
+            return 0
+        keep = np.ones(len(self.ids), dtype=bool)
+        keep[drop] = False
+        remap = np.cumsum(keep) - 1
+        alive = keep[self.docs]
+        terms = self._term_ids()[alive]
+        self._rebuild(terms, remap[self.docs[alive]], self.tfs[alive])
+        self.doc_len = self.doc_len[keep]
+        self.ids = [doc_id for doc_id, k in zip(self.ids, keep) if k]
+        self._id_array = None
+        self._positions = {doc_id: i for i, doc_id in enumerate(self.ids)}
+        return len(drop)
+
+    def sync(self, store) -> Tuple[int, int]:
+        """FAISS 저장소의 청크 집합에 맞춤 (새 청크만 토큰화). 반환값: (추가, 제거)"""
+        current = set(store.index_to_docstore_id.values())
+        removed = self.remove([doc_id for doc_id in self.ids if doc_id not in current])
+        new_ids, new_texts = [], []
+        for doc_id in current:
+            if doc_id in self._positions:
+                continue
+            doc = store.docstore.search(doc_id)
+            if not isinstance(doc, str):
+                new_ids.append(doc_id)
+                new_texts.append(doc.page_content)
+        added = self.add(new_ids, new_texts)
+        if added or removed:
+            logger.info(f"[BM25] 청크 {added}개 추가, {removed}개 제거 – 총 {len(self)}개, 용어 {len(self.terms)}개")
+        return added, removed
+
+    # ── 검색 ──
+    def search(self, query: str, k: int = 10, allowed: Optional[Set[str]] = None) -> Tuple[List[Tuple[str, float]], float]:
+        """BM25 상위 k 개 [(docstore id, 점수)] 와 1위 문서가 포함한 질의 용어 비율(coverage)
+
+        allowed(docstore id 집합, 조건 필터 결과)를 주면 그 청크만 대상으로 한다.
+        """
+        query_terms = set(tokenize(query))
+        if not query_terms or not self.ids:
+            return [], 0.0
+        n = len(self.ids)
+        lengths = self.doc_len.astype(np.float32)
+        norm = self.k1 * (1 - self.b + self.b * lengths / max(float(lengths.mean()), 1.0))
+        scores = np.zeros(n, dtype=np.float32)
+        matched = np.zeros(n, dtype=np.int32)
+        for term in query_terms:
+            t = self.terms.get(term)
+            if t is None:
+                continue
+            start, end = self.offsets[t], self.offsets[t + 1]
+            if start == end:
+                continue
+            docs = self.docs[start:end]
+            tf = self.tfs[start:end].astype(np.float32)
+            df = end - start
+            idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+            scores[docs] += idf * tf * (self.k1 + 1) / (tf + norm[docs])  # 용어 안에서 문서는 중복 없음
+            matched[docs] += 1
+        if allowed is not None:
+            if self._id_array is None:
+                self._id_array = np.array(self.ids, dtype=str)
+            scores[~np.isin(self._id_array, np.array(list(allowed), dtype=str))] = 0
+        k = min(k, n)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        hits = [(self.ids[i], float(scores[i])) for i in top if scores[i] > 0]
+        coverage = float(matched[top[0]]) / len(query_terms) if hits else 0.0
+        return hits, coverage
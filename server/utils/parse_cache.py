@@ -0,0 +1,117 @@
+"""
+Document-Parse 결과 캐시 (content-addressed)
+--------------------------------
+첨부파일 SHA-256 을 키로 Upstage Document-Parse JSON, 변환된 full_html/full_text,
+추출된 장학금 조건을 디스크에 저장한다.
+
+    parse_cache/
+      ab/abcdef....json   ← sha256 앞 2글자로 디렉터리 분산
+
+* 쓰기는 임시 파일 → ``os.replace`` 로 원자적으로 수행 (크래시 시 반쯤 쓴 파일 없음)
+* 전체 크기가 ``max_bytes`` 를 넘으면 가장 오래 사용되지 않은(mtime 기준) 항목부터 삭제
+"""
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+logger = logging.getLogger("pnu_parser")
+
+
+class ParseCache:
+    def __init__(self, root: Path, max_bytes: int = 512 * 1024 * 1024):
+        """
+        args:
+            root: 캐시 디렉터리
+            max_bytes: 캐시 최대 크기 (byte, 0 이하면 제한 없음)
+        """
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._size = sum(p.stat().st_size for p in self._files())
+
+    def _files(self) -> Iterator[Path]:
+        return self.root.glob("??/*.json")
+
+    def path(self, sha: str) -> Path:
+        return self.root / sha[:2] / f"{sha}.json"
+
+    def __contains__(self, sha: str) -> bool:
+        return self.path(sha).exists()
+
+    def get(self, sha: str) -> Optional[Dict]:
+        """캐시 항목 조회 (없거나 손상되었으면 None). 조회 시 mtime 을 갱신해 LRU 순서 유지"""
+        p = self.path(sha)
+        try:
+            entry = json.loads(p.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"[CACHE] 손상된 항목 무시: {p.name} – {e}")
+            return None
+        try:
+            os.utime(p)
+        except OSError:
+            pass
+        return entry
+
+    def put(self, sha: str, entry: Dict) -> None:
+        """항목 저장(덮어쓰기) 후 필요하면 eviction"""
+        entry = {**entry, "sha256": sha, "cached_at": time.time()}
+        p = self.path(sha)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        data = json.dumps(entry, ensure_ascii=False).encode("utf-8")
+        tmp = p.with_suffix(f".{threading.get_ident()}.tmp")
+        with self._lock:
+            old_size = p.stat().st_size if p.exists() else 0
+            tmp.write_bytes(data)
+            os.replace(tmp, p)
+            self._size += len(data) - old_size
+        self.evict()
+
+    def update(self, sha: str, **fields) -> None:
+        """기존 항목에 필드 추가/갱신 (예: 조건 추출 결과)"""
+        entry = self.get(sha)
+        if entry is None:
+            return
+        entry.update(fields)
+        self.put(sha, entry)
+
+    def iter_entries(self) -> Iterator[Dict]:
+        """저장된 모든 항목을 오래된 순서(cached_at)로 순회"""
+        entries = []
+        for p in self._files():
+            try:
+                entries.append(json.loads(p.read_text(encoding="utf-8")))
+            except (OSError, ValueError):
+                continue
+        entries.sort(key=lambda e: e.get("cached_at", 0))
+        return iter(entries)
+
+    def evict(self) -> None:
+        """최대 크기를 넘으면 mtime 이 오래된 항목부터 삭제"""
+        if self.max_bytes <= 0 or self._size <= self.max_bytes:
+            return
+        with self._lock:
+            files = []
+            for p in self._files():
+                try:
+                    st = p.stat()
+                except OSError:
+                    continue
+                files.append((st.st_mtime, st.st_size, p))
+            files.sort()
+            self._size = sum(size for _, size, _ in files)
+            for _, size, p in files:
+                if self._size <= self.max_bytes:
+                    break
+                try:
+                    p.unlink()
+                    self._size -= size
+                    logger.info(f"[CACHE] eviction: {p.name}")
+                except OSError:
+                    continue
@@ -0,0 +1,104 @@
+"""
+크롤링 파이프라인 공용 유틸
+--------------------------------
+* ``HostRateLimiter`` – 호스트별 초당 요청 수 제한 (스레드 안전)
+* ``StagedPipeline``  – 단계(stage)별 ThreadPoolExecutor 를 두고 작업을 다음 단계로 넘기는 실행기
+
+각 단계는 자신의 워커 수만큼만 동시에 실행되고, 작업이 끝나면 다음 단계 풀에 제출한다.
+따라서 공지/첨부파일 간 작업이 서로 겹쳐 실행되며 전체 소요 시간은
+가장 느린 첨부파일 하나의 처리 시간에 수렴한다.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlsplit
+
+logger = logging.getLogger("pnu_parser")
+
+
+class HostRateLimiter:
+    """호스트별 최소 요청 간격을 보장하는 rate limiter"""
+
+    def __init__(self, default_rate: float, overrides: Optional[Dict[str, float]] = None):
+        """
+        args:
+            default_rate: 호스트당 초당 최대 요청 수(float, 0 이하면 제한 없음)
+            overrides: 호스트별 초당 요청 수 (예: {"api.upstage.ai": 2})
+        """
+        self.default_rate = default_rate
+        self.overrides = overrides or {}
+        self._next_slot: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _interval(self, host: str) -> float:
+        rate = self.overrides.get(host, self.default_rate)
+        return 1.0 / rate if rate and rate > 0 else 0.0
+
+    def wait(self, url: str) -> None:
+        """url 의 호스트에 할당된 다음 슬롯까지 대기"""
+        host = urlsplit(url).netloc
+        interval = self._interval(host)
+        if not interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+class StagedPipeline:
+    """단계별 워커 풀을 가진 파이프라인 실행기
+
+    사용 예::
+
+        pipe = StagedPipeline({"download": 4, "parse": 2})
+        pipe.submit("download", download_task, item)   # download_task 안에서 pipe.submit("parse", ...)
+        pipe.join()
+    """
+
+    def __init__(self, workers: Dict[str, int]):
+        self._pools = {
+            name: ThreadPoolExecutor(max_workers=max(1, n), thread_name_prefix=f"crawl-{name}")
+            for name, n in workers.items()
+        }
+        self._pending = 0
+        self._cond = threading.Condition()
+        self.errors: List[BaseException] = []
+
+    def submit(self, stage: str, fn: Callable, *args, **kwargs) -> None:
+        """stage 풀에 작업 제출. 작업 중 발생한 예외는 로깅 후 errors 에 모은다."""
+        with self._cond:
+            self._pending += 1
+
+        def _run():
+            try:
+                fn(*args, **kwargs)
+            except Exception as e:
+                logger.error(f"[ERROR] {stage} 단계 실패: {e}")
+                with self._cond:
+                    self.errors.append(e)
+            finally:
+                with self._cond:
+                    self._pending -= 1
+                    self._cond.notify_all()
+
+        self._pools[stage].submit(_run)
+
+    def join(self) -> None:
+        """모든 단계의 작업이 끝날 때까지 대기한 뒤 풀을 정리"""
+        with self._cond:
+            while self._pending:
+                self._cond.wait()
+        for pool in self._pools.values():
+            pool.shutdown(wait=True)
+
+    def __enter__(self) -> "StagedPipeline":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.join()
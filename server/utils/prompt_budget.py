@@ -0,0 +1,160 @@
+"""
+토큰 예산 기반 프롬프트 조립
+--------------------------------
+첨부 전문·검색 결과·대화 기록을 그대로 붙이면 문서 길이에 따라 프롬프트가 끝없이 커진다.
+여기서는 로컬에서 토큰 수를 세어 예산 안에 들어오도록 줄인다.
+
+* ``count_tokens``  – tiktoken(``PROMPT_TOKENIZER``, 기본 cl100k_base). 인코딩 파일을 받을 수 없는
+  환경에서는 한글 1자 = 1토큰, 그 외 4자 = 1토큰으로 넉넉하게 추정한다.
+* ``select_spans``  – 문장 단위로 나눠 질의와 겹치는(문자 bigram) 문장만 원래 순서대로 남김
+* ``fit_chunks``    – 검색 청크 중복 제거 후 관련 문장만 예산 안에서 채움
+* ``fit_history``   – 최근 대화부터 예산 안에서 유지, 넘치는 이전 대화는 질문만 한 줄로 요약
+"""
+import logging
+import math
+import os
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence
+
+logger = logging.getLogger("pnu_parser")
+
+PROMPT_TOKENIZER = os.getenv("PROMPT_TOKENIZER", "cl100k_base")
+PROMPT_MAX_TOKENS = int(os.getenv("PROMPT_MAX_TOKENS", "3000"))          # 답변 프롬프트 전체
+EXTRACT_MAX_TOKENS = int(os.getenv("EXTRACT_MAX_TOKENS", "2500"))        # 조건 추출 프롬프트의 본문
+
+_SENTENCE_RE = re.compile(r"(?<=[^\d][.!?。])\s+|\n+")  # "2025. 5. 23." 같은 날짜는 자르지 않음
+_SPACE_RE = re.compile(r"\s+")
+_HANGUL_RE = re.compile(r"[가-힣ㄱ-ㆎ]")
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    try:
+        import tiktoken
+        return tiktoken.get_encoding(PROMPT_TOKENIZER)
+    except Exception as e:  # 오프라인 등으로 인코딩 파일을 못 받으면 추정치 사용
+        logger.warning(f"[PROMPT] tiktoken 인코딩 로드 실패 – 추정치 사용: {e.__class__.__name__}")
+        return None
+
+
+def count_tokens(text: str) -> int:
+    enc = _encoding()
+    if enc is not None:
+        return len(enc.encode(text, disallowed_special=()))
+    hangul = len(_HANGUL_RE.findall(text))
+    return hangul + math.ceil((len(text) - hangul) / 4)
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """앞에서부터 max_tokens 토큰까지만"""
+    if max_tokens <= 0:
+        return ""
+    enc = _encoding()
+    if enc is not None:
+        ids = enc.encode(text, disallowed_special=())
+        return text if len(ids) <= max_tokens else enc.decode(ids[:max_tokens])
+    if count_tokens(text) <= max_tokens:
+        return text
+    lo, hi = 0, len(text)
+    while lo < hi:  # 추정치 기준 이분 탐색
+        mid = (lo + hi + 1) // 2
+        if count_tokens(text[:mid]) <= max_tokens:
+            lo = mid
+        else:
+            hi = mid - 1
+    return text[:lo]
+
+
+def _bigrams(text: str) -> set:
+    text = _SPACE_RE.sub("", text.lower())
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+def _normalize(text: str) -> str:
+    return _SPACE_RE.sub(" ", text).strip()
+
+
+def _normalize_lines(text: str) -> str:
+    return "\n".join(_normalize(line) for line in text.splitlines() if line.strip())
+
+
+def select_spans(text: str, query: str, max_tokens: int, boost: Optional[re.Pattern] = None) -> str:
+    """text 에서 query 와 관련 높은 문장만 골라 원래 순서로 이어 붙임 (max_tokens 이하)
+
+    boost 패턴(예: 날짜)에 걸리는 문장은 가산점. 첫 문장(제목 등)은 항상 우선 후보.
+    """
+    text = _normalize_lines(text)
+    if count_tokens(text) <= max_tokens:
+        return text
+    sentences = [s.strip() for s in _SENTENCE_RE.split(text) if s and s.strip()]
+    q = _bigrams(query)
+    scored = []
+    for i, sentence in enumerate(sentences):
+        overlap = len(q & _bigrams(sentence)) / math.sqrt(len(sentence) + 1)
+        if boost is not None and boost.search(sentence):
+            overlap += 1.0
+        if i == 0:
+            overlap += 0.5
+        scored.append((overlap, i))
+
+    picked, used = [], 0
+    for score, i in sorted(scored, key=lambda x: (-x[0], x[1])):
+        if score <= 0 and picked:
+            break
+        cost = count_tokens(sentences[i]) + 1
+        if used + cost > max_tokens:
+            continue
+        picked.append(i)
+        used += cost
+    if not picked:  # 문장 하나가 예산보다 길면 잘라서라도 넣음
+        return truncate_tokens(sentences[0], max_tokens)
+    return " … ".join(sentences[i] for i in sorted(picked))
+
+
+def fit_chunks(question: str, chunks: Iterable[str], max_tokens: int, per_chunk: Optional[int] = None) -> List[str]:
+    """검색 청크(관련도 순)를 중복 제거·관련 문장 추출해 전체 max_tokens 안에 맞춤"""
+    chunks = [c for c in chunks if c and c.strip()]
+    if not chunks:
+        return []
+    per_chunk = per_chunk or max(200, max_tokens // len(chunks))
+    seen: List[set] = []
+    fitted, used = [], 0
+    for chunk in chunks:
+        grams = _bigrams(chunk)
+        # 거의 같은 청크(겹치는 분할·같은 첨부 중복)는 건너뜀
+        if any(len(grams & g) / (len(grams | g) or 1) > 0.8 for g in seen):
+            continue
+        seen.append(grams)
+        span = select_spans(chunk, question, min(per_chunk, max_tokens - used))
+        cost = count_tokens(span)
+        if not span or used + cost > max_tokens:
+            break
+        fitted.append(span)
+        used += cost
+    return fitted
+
+
+def fit_history(messages: Optional[Sequence[Dict[str, str]]], max_tokens: int) -> str:
+    """대화 기록을 "role: content" 줄로, 최근 것부터 예산 안에서 유지"""
+    if not messages:
+        return ""
+    lines, used = [], 0
+    older: List[Dict[str, str]] = []
+    for i in range(len(messages) - 1, -1, -1):
+        message = messages[i]
+        line = f"{message.get('role', 'user')}: {_normalize(str(message.get('content', '')))}"
+        cost = count_tokens(line) + 1
+        if used + cost > max_tokens:
+            older = list(messages[:i + 1])
+            break
+        lines.append(line)
+        used += cost
+    lines.reverse()
+    if older:
+        # 넘친 이전 대화는 사용자 질문만 짧게 남김 (LLM 요약 호출 없음)
+        asked = [truncate_tokens(_normalize(str(m.get("content", ""))), 30) for m in older if m.get("role") == "user"]
+        summary = truncate_tokens("이전 질문 요약: " + " / ".join(asked), max(0, max_tokens - used)) if asked else ""
+        if summary:
+            lines.insert(0, summary)
+    return "\n".join(lines)
@@ -0,0 +1,77 @@
+"""
+질문 라우터
+--------------------------------
+/ask/database 질문을 LLM 호출 없이 정규식·키워드로 분류한다.
+
+    structured – 학점/학년/재학 상태 숫자·값이 질문에 있음 → 추출한 값으로 바로 조건 검색
+    both       – "받을 수 있는", "자격" 처럼 조건 검색 의도는 있지만 값이 불분명
+                 → tool-calling LLM 경로와 벡터 검색을 동시에 실행 후 병합
+    vector     – 조건 단서 없음 → 벡터 검색만 (임베딩 1회 + 로컬 검색)
+"""
+import re
+from dataclasses import asdict, dataclass, field
+from typing import Dict, Optional
+
+GPA_PATTERNS = [
+    # "학점 3.5", "GPA는 3.8", "평점 4.0 이상"
+    # 뒤에 학점/학기/등급이 오면 이수 학점·학기·등급이므로 제외 ("학점 4학점 이상 이수", "성적 2등급")
+    re.compile(r"(?:gpa|학점|평점|성적|평균)\s*(?:이|은|는|가|:)?\s*([0-4](?:\.\d{1,2})?)(?![\d.]|\s*(?:학점|학기|등급))", re.IGNORECASE),
+    # "3.5 이상", "3.8점", "3.7/4.5"
+    re.compile(r"(?<![\d.])([0-4]\.\d{1,2})\s*(?:점|이상|넘|/\s*4\.[35])"),
+]
+KOREAN_NUMBERS = {"일": 1, "이": 2, "삼": 3, "사": 4, "오": 5, "육": 6}
+# 한글 숫자는 단독 토큰일 때만 ("휴학생이 학년", "같이 학년" 의 "이" 는 학년이 아님)
+GRADE_PATTERN = re.compile(r"(?:(?<!\d)([1-6])|(?<![가-힣\d])([일이삼사오육]))\s*학년")
+FRESHMAN_PATTERN = re.compile(r"신입생|새내기")
+STATUS_PATTERNS = {"휴학": re.compile(r"휴학"), "재학": re.compile(r"재학")}
+# 값은 없지만 자격 조건으로 거르려는 질문
+ELIGIBILITY_CUES = re.compile(r"자격|조건|받을\s*수|신청\s*(?:할\s*수|가능)|지원\s*(?:할\s*수|가능)|해당(?:되|하)|대상")
+
+
+@dataclass
+class QueryRoute:
+    mode: str  # "structured" | "both" | "vector"
+    filters: Dict[str, object] = field(default_factory=dict)  # min_gpa / grade / status
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+def extract_gpa(question: str) -> Optional[float]:
+    for pattern in GPA_PATTERNS:
+        match = pattern.search(question)
+        if match:
+            value = float(match.group(1))
+            if 0 < value <= 4.5:
+                return value
+    return None
+
+
+def extract_grade(question: str) -> Optional[int]:
+    match = GRADE_PATTERN.search(question)
+    if match:
+        return int(match.group(1)) if match.group(1) else KOREAN_NUMBERS[match.group(2)]
+    if FRESHMAN_PATTERN.search(question):
+        return 1
+    return None
+
+
+def extract_status(question: str) -> Optional[str]:
+    for status, pattern in STATUS_PATTERNS.items():
+        if pattern.search(question):
+            return status
+    return None
+
+
+def route_question(question: str) -> QueryRoute:
+    filters = {
+        "min_gpa": extract_gpa(question),
+        "grade": extract_grade(question),
+        "status": extract_status(question),
+    }
+    filters = {k: v for k, v in filters.items() if v is not None}
+    if filters:
+        return QueryRoute("structured", filters)
+    if ELIGIBILITY_CUES.search(question):
+        return QueryRoute("both")
+    return QueryRoute("vector")
@@ -0,0 +1,73 @@
+"""
+외부 호출(upstream)별 동시 실행 한도 + 타임아웃 (async 경로용)
+--------------------------------
+async 라우트는 스레드를 잡지 않고 대기하므로 한 워커가 수백 개 질문을 동시에 들고 있을 수 있다.
+대신 Upstage 같은 upstream 으로 나가는 요청 수는 여기서 제한한다.
+
+    async with upstream("upstage_chat"):
+        ...                                   # 한도 초과분은 슬롯이 날 때까지 대기
+    result = await call_upstream("upstage_embed", coro)   # 한도 + 타임아웃
+
+한도/타임아웃은 ``UPSTREAM_<NAME>_CONCURRENCY`` / ``UPSTREAM_<NAME>_TIMEOUT`` 환경변수로 바꿀 수 있다.
+"""
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Awaitable, Dict, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass
+class UpstreamLimit:
+    concurrency: int
+    timeout: float  # 초 (슬롯 대기 시간은 제외)
+
+
+DEFAULT_LIMITS: Dict[str, UpstreamLimit] = {
+    "upstage_chat": UpstreamLimit(concurrency=32, timeout=60.0),
+    "upstage_embed": UpstreamLimit(concurrency=16, timeout=15.0),
+    "db": UpstreamLimit(concurrency=20, timeout=10.0),
+}
+
+
+def _limit(name: str) -> UpstreamLimit:
+    default = DEFAULT_LIMITS.get(name, UpstreamLimit(concurrency=16, timeout=30.0))
+    key = name.upper()
+    return UpstreamLimit(
+        concurrency=int(os.getenv(f"UPSTREAM_{key}_CONCURRENCY", default.concurrency)),
+        timeout=float(os.getenv(f"UPSTREAM_{key}_TIMEOUT", default.timeout)),
+    )
+
+
+LIMITS: Dict[str, UpstreamLimit] = {name: _limit(name) for name in DEFAULT_LIMITS}
+# 세마포어는 이벤트 루프에 묶이므로 (루프, 이름) 별로 만든다
+_semaphores: Dict[tuple, asyncio.Semaphore] = {}
+
+
+def limit_for(name: str) -> UpstreamLimit:
+    if name not in LIMITS:
+        LIMITS[name] = _limit(name)
+    return LIMITS[name]
+
+
+def _semaphore(name: str) -> asyncio.Semaphore:
+    key = (id(asyncio.get_running_loop()), name)
+    sem = _semaphores.get(key)
+    if sem is None:
+        sem = _semaphores[key] = asyncio.Semaphore(limit_for(name).concurrency)
+    return sem
+
+
+@asynccontextmanager
+async def upstream(name: str):
+    """upstream 동시 실행 슬롯 하나 점유"""
+    async with _semaphore(name):
+        yield limit_for(name)
+
+
+async def call_upstream(name: str, awaitable: Awaitable[T]) -> T:
+    """슬롯을 얻은 뒤 타임아웃을 걸어 실행 (초과 시 asyncio.TimeoutError)"""
+    async with upstream(name) as limit:
+        return await asyncio.wait_for(awaitable, timeout=limit.timeout)
@@ -0,0 +1,622 @@
+"""
+FAISS 벡터 인덱스 증분 관리
+--------------------------------
+* 청크 id = sha256(url + 본문) → docstore id 로 사용해 이미 인덱싱된 청크는 다시 넣지 않음
+* 메타데이터 ``chunk_hash`` = sha256(본문) → 같은 본문이 다른 공지에 있으면 임베딩을 재사용
+* ``delete_stale`` / ``delete_by_urls`` – 갱신·삭제된 공지의 벡터 제거
+* ``compact``     – 중복 청크를 합치고 id 를 청크 해시로 맞춘 새 인덱스 생성 (재임베딩 없음)
+* 코사인 유사도 = 삽입 시 한 번 L2 정규화한 벡터의 내적(IndexFlatIP). 예전 L2 인덱스는 compact 로 변환
+* ``search_many`` – 여러 질의를 임베딩 1회 + faiss 검색 1회로 처리, score_threshold 로 조기 절단
+                   positions 를 주면 그 후보(조건 필터 결과) 안에서만 검색
+* ``search_diverse`` – 공지(메타데이터 키) 단위로 접어 서로 다른 공지 k 개와 각 공지의 최고 점수 청크 반환
+                   (후보가 모자랄 때만 검색 폭을 두 배로, mmr_lambda 를 주면 후보 벡터로 MMR 재선정)
+* ``IndexHolder`` – 시작 시 한 번 로드해 공유하는 검색용 인덱스, 버전 디렉터리 + 포인터로 원자적 교체
+                   (검색용은 mmap + SQLite docstore 로 열어 워커 간 메모리 공유)
+                   같은 버전 디렉터리에 BM25 어휘 인덱스(utils.lexical_index)·조건 열(utils.chunk_filters)도 함께 게시
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+import warnings
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import faiss
+import numpy as np
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+from langchain_community.vectorstores.utils import DistanceStrategy
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from utils.ann import ANN_FILE, ANN_MMAP_FLAGS, AnnConfig, apply_search_params, build_ann_index, flat_vectors, make_faiss_index, selector_params
+from utils.chunk_filters import ChunkFilters
+from utils.docstore import load_store, save_store
+from utils.lexical_index import LexicalIndex
+
+logger = logging.getLogger("pnu_parser")
+
+# LangChain 은 EUCLIDEAN 외의 거리에서 normalize_L2 를 경고하지만, 정규화 + 내적이 곧 코사인이다
+warnings.filterwarnings("ignore", message="Normalizing L2 is not applicable")
+
+
+def chunk_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def chunk_id(url: Optional[str], text: str) -> str:
+    """공지 url 과 본문으로 만든 청크 id (같은 공지의 같은 청크는 항상 같은 id)"""
+    return hashlib.sha256(f"{url or ''}\x1f{text}".encode("utf-8")).hexdigest()
+
+
+def new_store(embeddings: Embeddings, dim: int, ann: Optional[AnnConfig] = None) -> FAISS:
+    """빈 코사인 저장소 (내적 인덱스 + 삽입/질의 벡터 L2 정규화)"""
+    return FAISS(
+        embedding_function=embeddings,
+        index=make_faiss_index(dim, ann, faiss.METRIC_INNER_PRODUCT),
+        docstore=InMemoryDocstore(),
+        index_to_docstore_id={},
+        distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT,
+        normalize_L2=True,
+    )
+
+
+def is_cosine(store: FAISS) -> bool:
+    return store.index.metric_type == faiss.METRIC_INNER_PRODUCT and bool(store._normalize_L2)
+
+
+def iter_docs(store: FAISS) -> Iterable[Tuple[int, str, object]]:
+    """(faiss 위치, docstore id, Document) 순회"""
+    for pos, doc_id in store.index_to_docstore_id.items():
+        doc = store.docstore.search(doc_id)
+        if not isinstance(doc, str):  # 없으면 에러 메시지(str) 반환
+            yield pos, doc_id, doc
+
+
+def add_chunks(
+    store: Optional[FAISS],
+    texts: List[str],
+    metadatas: List[Dict],
+    embeddings: Embeddings,
+) -> Tuple[Optional[FAISS], int]:
+    """인덱스에 없는 청크만 추가. 반환값: (저장소, 새로 임베딩한 청크 수)
+
+    store 가 None 이면 새 저장소를 만든다.
+    """
+    existing: Set[str] = set(store.index_to_docstore_id.values()) if store is not None else set()
+    reuse: Dict[str, int] = {}
+    if store is not None:
+        for pos, _, doc in iter_docs(store):
+            h = doc.metadata.get("chunk_hash")
+            if h:
+                reuse.setdefault(h, pos)
+
+    new_texts, new_metas, new_ids = [], [], []
+    for text, meta in zip(texts, metadatas):
+        cid = chunk_id(meta.get("url"), text)
+        if cid in existing:
+            continue
+        existing.add(cid)
+        new_texts.append(text)
+        new_metas.append({**meta, "chunk_hash": chunk_hash(text)})
+        new_ids.append(cid)
+
+    if not new_texts:
+        return store, 0
+
+    # 같은 본문이 이미 있으면 저장된 벡터 재사용, 없으면 한 번만 임베딩
+    vectors: List[Optional[np.ndarray]] = [None] * len(new_texts)
+    to_embed: Dict[str, List[int]] = {}
+    for i, meta in enumerate(new_metas):
+        pos = reuse.get(meta["chunk_hash"])
+        if pos is not None:
+            vectors[i] = store.index.reconstruct(pos)
+        else:
+            to_embed.setdefault(meta["chunk_hash"], []).append(i)
+
+    embedded = 0
+    if to_embed:
+        order = list(to_embed.values())
+        fresh = embeddings.embed_documents([new_texts[idx[0]] for idx in order])
+        for idx, vec in zip(order, fresh):
+            for i in idx:
+                vectors[i] = np.asarray(vec, dtype=np.float32)
+        embedded = len(order)
+
+    if store is None:
+        store = new_store(embeddings, len(vectors[0]))
+    # normalize_L2 저장소면 add_embeddings 가 한 번 정규화해서 넣는다
+    store.add_embeddings(list(zip(new_texts, [v.tolist() for v in vectors])), metadatas=new_metas, ids=new_ids)
+    logger.info(f"[FAISS] 청크 {len(new_ids)}개 추가 (임베딩 {embedded}개, 재사용 {len(new_ids) - embedded}개)")
+    return store, embedded
+
+
+def update_metadata(store: FAISS, texts: List[str], metadatas: List[Dict]) -> int:
+    """이미 인덱스에 있는 청크의 메타데이터가 바뀌었으면 (조건 재추출 등) 벡터는 두고 메타데이터만 갱신"""
+    updated = 0
+    for text, meta in zip(texts, metadatas):
+        doc = store.docstore.search(chunk_id(meta.get("url"), text))
+        if isinstance(doc, str):
+            continue
+        if any(doc.metadata.get(key) != value for key, value in meta.items()):
+            doc.metadata = {**doc.metadata, **meta}
+            updated += 1
+    return updated
+
+
+def delete_ids(store: FAISS, ids: List[str]) -> int:
+    if not ids:
+        return 0
+    store.delete(ids)
+    return len(ids)
+
+
+def delete_stale(store: FAISS, attachments: Set[Tuple[str, str]], keep_ids: Set[str]) -> int:
+    """(url, file_name) 첨부의 기존 청크 중 keep_ids 에 없는 것(=내용이 바뀐 이전 버전) 삭제"""
+    stale = [
+        doc_id for _, doc_id, doc in iter_docs(store)
+        if (doc.metadata.get("url"), doc.metadata.get("file_name")) in attachments and doc_id not in keep_ids
+    ]
+    return delete_ids(store, stale)
+
+
+def delete_by_urls(store: FAISS, urls: Set[str]) -> int:
+    """삭제된 공지(url)의 모든 청크 제거"""
+    return delete_ids(store, [doc_id for _, doc_id, doc in iter_docs(store) if doc.metadata.get("url") in urls])
+
+
+def compact(store: FAISS) -> FAISS:
+    """중복 청크(같은 url+본문)를 하나로 합치고 id 를 청크 id 로 맞춘 새 코사인 저장소 반환
+
+    벡터는 기존 인덱스에서 꺼내 쓰므로 임베딩 호출이 없다. 이전 버전(uuid id, L2 인덱스) 인덱스의
+    마이그레이션에도 사용 – 꺼낸 원본 벡터를 정규화해 내적 인덱스에 넣으므로 코사인 순위가 된다.
+    """
+    seen: Set[str] = set()
+    texts, metas, ids, vectors = [], [], [], []
+    for pos, _, doc in sorted(iter_docs(store), key=lambda x: x[0]):
+        cid = chunk_id(doc.metadata.get("url"), doc.page_content)
+        if cid in seen:
+            continue
+        seen.add(cid)
+        texts.append(doc.page_content)
+        metas.append({**doc.metadata, "chunk_hash": chunk_hash(doc.page_content)})
+        ids.append(cid)
+        vectors.append(store.index.reconstruct(pos))
+
+    compacted = new_store(store.embedding_function, store.index.d)
+    if ids:
+        compacted.add_embeddings(list(zip(texts, [v.tolist() for v in vectors])), metadatas=metas, ids=ids)
+    logger.info(f"[FAISS] compaction: {store.index.ntotal} → {compacted.index.ntotal} 벡터")
+    return compacted
+
+
+FILTER_EXACT_MAX = int(os.getenv("FILTER_EXACT_MAX", "4096"))  # 후보가 이 이하면 후보 벡터만 정확 채점
+
+
+def _search_within(index: faiss.Index, queries: np.ndarray, k: int, candidates: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """후보 위치 안에서만 검색 (적으면 후보 벡터 정확 채점, 많으면 id selector 로 인덱스 검색)"""
+    if len(candidates) <= FILTER_EXACT_MAX:
+        scores = queries @ index.reconstruct_batch(candidates.astype(np.int64)).T
+        top = np.argsort(-scores, axis=1, kind="stable")[:, :k]
+        out_scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        out_positions = np.full((len(queries), k), -1, dtype=np.int64)
+        out_scores[:, :top.shape[1]] = np.take_along_axis(scores, top, axis=1)
+        out_positions[:, :top.shape[1]] = candidates[top]
+        return out_scores, out_positions
+    bitmap = np.zeros(index.ntotal, dtype=bool)
+    bitmap[candidates] = True
+    packed = np.packbits(bitmap, bitorder="little")  # 검색이 끝날 때까지 참조 유지
+    sel = faiss.IDSelectorBitmap(index.ntotal, faiss.swig_ptr(packed))
+    return index.search(queries, k, params=selector_params(index, sel))
+
+
+def _search_positions(index: faiss.Index, queries: np.ndarray, k: int, positions: Optional[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    if positions is None:
+        return index.search(queries, k)
+    return _search_within(index, queries, k, positions)
+
+
+def _normalized_queries(store: FAISS, vectors: np.ndarray) -> np.ndarray:
+    if not is_cosine(store):
+        raise ValueError("코사인(내적) 인덱스가 아닙니다 – /notices/index/compact 로 변환하세요.")
+    queries = np.ascontiguousarray(vectors, dtype=np.float32).reshape(-1, store.index.d).copy()
+    faiss.normalize_L2(queries)
+    return queries
+
+
+def _doc_at(store: FAISS, pos: int, docs: Dict[int, Optional[Document]]) -> Optional[Document]:
+    """faiss 위치의 Document (docs 에 캐시 – 여러 질의·재검색이 같은 청크를 가리키면 조회는 한 번만)"""
+    if pos not in docs:
+        doc = store.docstore.search(store.index_to_docstore_id[pos])
+        docs[pos] = None if isinstance(doc, str) else doc
+    return docs[pos]
+
+
+def search_vectors(
+    store: FAISS,
+    vectors: np.ndarray,
+    k: int = 4,
+    score_threshold: Optional[float] = None,
+    positions: Optional[np.ndarray] = None,
+) -> List[List[Tuple[Document, float]]]:
+    """(Q, dim) 질의 벡터를 faiss 한 번으로 검색. 질의별 [(Document, 코사인 유사도)] (유사도 내림차순)
+
+    score_threshold 미만은 버린다. 결과가 정렬돼 있으므로 질의마다 첫 미달 위치에서 자른다.
+    positions(조건 필터로 고른 faiss 위치)를 주면 그 안에서만 점수를 매긴다.
+    """
+    queries = _normalized_queries(store, vectors)
+    if positions is not None and len(positions) == 0:
+        return [[] for _ in queries]
+    scores, positions = _search_positions(store.index, queries, k, positions)
+
+    valid = positions >= 0
+    if score_threshold is not None:
+        valid &= scores >= score_threshold
+    cutoffs = valid.argmin(axis=1)
+    cutoffs[valid.all(axis=1)] = k
+
+    docs: Dict[int, Optional[Document]] = {}
+    results: List[List[Tuple[Document, float]]] = []
+    for row_scores, row_pos, cut in zip(scores, positions, cutoffs):
+        hits = []
+        for score, pos in zip(row_scores[:cut], row_pos[:cut]):
+            doc = _doc_at(store, int(pos), docs)
+            if doc is not None:
+                hits.append((doc, float(score)))
+        results.append(hits)
+    return results
+
+
+DIVERSE_FETCH_FACTOR = int(os.getenv("DIVERSE_FETCH_FACTOR", "4"))  # 첫 검색 폭 = 필요한 공지 수 × 배수
+MMR_POOL_FACTOR = int(os.getenv("MMR_POOL_FACTOR", "3"))            # MMR 후보 공지 수 = k × 배수
+
+Candidate = Tuple[int, Document, float]  # (faiss 위치, 대표 청크, 점수)
+
+
+def collapse_hits(hits: Iterable[Tuple[Document, float]], group_by: str = "notice_title") -> List[Tuple[Document, float]]:
+    """점수순 결과를 metadata[group_by] 기준으로 접어 그룹별 첫(최고 점수) 청크만 남김"""
+    seen = set()
+    collapsed = []
+    for doc, score in hits:
+        key = doc.metadata.get(group_by)
+        if key not in seen:
+            seen.add(key)
+            collapsed.append((doc, score))
+    return collapsed
+
+
+def mmr_select(query: np.ndarray, vectors: np.ndarray, k: int, mmr_lambda: float) -> List[int]:
+    """λ·질의 유사도 − (1−λ)·이미 고른 것과의 최대 유사도 가 큰 순으로 k 개 (vectors 행 번호)
+
+    유사도 행렬을 한 번 계산하고 고를 때마다 최대 유사도 열만 갱신한다 (k 번의 벡터 연산).
+    """
+    vectors = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    relevance = vectors @ query
+    similarity = vectors @ vectors.T
+    redundancy = np.zeros(len(vectors), dtype=np.float32)
+    available = np.ones(len(vectors), dtype=bool)
+    chosen: List[int] = []
+    for _ in range(min(k, len(vectors))):
+        gain = mmr_lambda * relevance - (1 - mmr_lambda) * redundancy
+        gain[~available] = -np.inf
+        best = int(np.argmax(gain))
+        chosen.append(best)
+        available[best] = False
+        redundancy = np.maximum(redundancy, similarity[:, best]) if len(chosen) > 1 else similarity[:, best].copy()
+    return chosen
+
+
+def _collapse_row(
+    store: FAISS, scores: np.ndarray, positions: np.ndarray, group_by: str,
+    score_threshold: Optional[float], docs: Dict[int, Optional[Document]],
+) -> Tuple[List[Candidate], bool]:
+    """한 질의 결과를 그룹별 최고 점수 청크로 접음. 반환값: (후보, 더 검색해도 새 결과가 없는지)"""
+    seen = set()
+    groups: List[Candidate] = []
+    for score, pos in zip(scores, positions):
+        if pos < 0 or (score_threshold is not None and score < score_threshold):
+            return groups, True
+        doc = _doc_at(store, int(pos), docs)
+        if doc is None:
+            continue
+        key = doc.metadata.get(group_by)
+        if key not in seen:
+            seen.add(key)
+            groups.append((int(pos), doc, float(score)))
+    return groups, False
+
+
+def search_diverse(
+    store: FAISS,
+    vectors: np.ndarray,
+    k: int = 4,
+    group_by: str = "notice_title",
+    mmr_lambda: Optional[float] = None,
+    score_threshold: Optional[float] = None,
+    positions: Optional[np.ndarray] = None,
+) -> List[List[Tuple[Document, float]]]:
+    """질의별 서로 다른 그룹(metadata[group_by]) k 개와 그룹마다 최고 점수 청크 [(Document, 유사도)]
+
+    k × DIVERSE_FETCH_FACTOR 청크로 시작해 그룹이 모자란 질의만 검색 폭을 두 배로 늘려 다시 검색한다
+    (인덱스·후보가 바닥나거나 score_threshold 아래로 내려가면 중단 → 그때만 k 개 미만).
+    mmr_lambda 가 있으면 k × MMR_POOL_FACTOR 개 그룹의 대표 청크 벡터로 MMR 을 적용해 k 개를 고른다.
+    """
+    queries = _normalized_queries(store, vectors)
+    limit = store.index.ntotal if positions is None else len(positions)
+    if limit == 0 or k <= 0:
+        return [[] for _ in queries]
+    want = k if mmr_lambda is None else k * MMR_POOL_FACTOR
+    fetch = min(limit, want * DIVERSE_FETCH_FACTOR)
+    docs: Dict[int, Optional[Document]] = {}
+    candidates: List[List[Candidate]] = [[] for _ in queries]
+    pending = list(range(len(queries)))
+    while pending:
+        scores, found = _search_positions(store.index, queries[pending], fetch, positions)
+        short = []
+        for row, qi in enumerate(pending):
+            candidates[qi], exhausted = _collapse_row(store, scores[row], found[row], group_by, score_threshold, docs)
+            if len(candidates[qi]) < want and not exhausted and fetch < limit:
+                short.append(qi)
+        pending = short
+        fetch = min(limit, fetch * 2)
+
+    results = []
+    for query, groups in zip(queries, candidates):
+        if mmr_lambda is not None and len(groups) > k:
+            try:
+                vecs = store.index.reconstruct_batch(np.array([pos for pos, _, _ in groups], dtype=np.int64))
+                groups = [groups[i] for i in mmr_select(query, vecs, k, mmr_lambda)]
+            except RuntimeError as e:  # 벡터 복원을 지원하지 않는 인덱스 → 점수순
+                logger.warning(f"[FAISS] MMR 생략 – 벡터 복원 불가: {e}")
+        results.append([(doc, score) for _, doc, score in groups[:k]])
+    return results
+
+
+def embed_queries(embeddings: Embeddings, queries: List[str]) -> List[List[float]]:
+    """질의 여러 개 임베딩 (utils.embeddings.CachedEmbeddings 면 캐시 + 배치 호출)"""
+    batch = getattr(embeddings, "embed_queries", None)
+    if batch is not None:
+        return batch(queries)
+    return [embeddings.embed_query(q) for q in queries]
+
+
+def search_many(
+    store: FAISS,
+    queries: List[str],
+    k: int = 4,
+    score_threshold: Optional[float] = None,
+    positions: Optional[np.ndarray] = None,
+) -> List[List[Tuple[Document, float]]]:
+    """여러 질의를 한 번에 임베딩하고 검색 (search_vectors 참고)"""
+    if not queries:
+        return []
+    vectors = np.asarray(embed_queries(store.embedding_function, list(queries)), dtype=np.float32)
+    return search_vectors(store, vectors, k, score_threshold, positions)
+
+
+def search_many_diverse(
+    store: FAISS,
+    queries: List[str],
+    k: int = 4,
+    group_by: str = "notice_title",
+    mmr_lambda: Optional[float] = None,
+    score_threshold: Optional[float] = None,
+    positions: Optional[np.ndarray] = None,
+) -> List[List[Tuple[Document, float]]]:
+    """여러 질의를 한 번에 임베딩하고 그룹 단위로 검색 (search_diverse 참고)"""
+    if not queries:
+        return []
+    vectors = np.asarray(embed_queries(store.embedding_function, list(queries)), dtype=np.float32)
+    return search_diverse(store, vectors, k, group_by, mmr_lambda, score_threshold, positions)
+
+
+async def _aembed_queries(embeddings: Embeddings, queries: List[str]) -> np.ndarray:
+    if hasattr(embeddings, "aembed_queries"):
+        vectors = await embeddings.aembed_queries(queries)
+    else:
+        vectors = await asyncio.to_thread(embed_queries, embeddings, queries)
+    return np.asarray(vectors, dtype=np.float32)
+
+
+async def asearch_many(
+    store: FAISS,
+    queries: List[str],
+    k: int = 4,
+    score_threshold: Optional[float] = None,
+    positions: Optional[np.ndarray] = None,
+) -> List[List[Tuple[Document, float]]]:
+    """search_many 의 async 버전 (임베딩은 async 클라이언트, faiss 검색은 스레드에서)"""
+    if not queries:
+        return []
+    vectors = await _aembed_queries(store.embedding_function, list(queries))
+    return await asyncio.to_thread(search_vectors, store, vectors, k, score_threshold, positions)
+
+
+async def asearch_many_diverse(
+    store: FAISS,
+    queries: List[str],
+    k: int = 4,
+    group_by: str = "notice_title",
+    mmr_lambda: Optional[float] = None,
+    score_threshold: Optional[float] = None,
+    positions: Optional[np.ndarray] = None,
+) -> List[List[Tuple[Document, float]]]:
+    """search_many_diverse 의 async 버전"""
+    if not queries:
+        return []
+    vectors = await _aembed_queries(store.embedding_function, list(queries))
+    return await asyncio.to_thread(search_diverse, store, vectors, k, group_by, mmr_lambda, score_threshold, positions)
+
+
+@dataclass(frozen=True)
+class IndexSnapshot:
+    """한 버전의 검색 자료 묶음 – 저장소·BM25·조건 열의 faiss 위치/docstore id 가 서로 맞는다"""
+    version: Optional[str]
+    store: FAISS
+    lexical: Optional[LexicalIndex]
+    filters: Optional[ChunkFilters]
+
+
+class IndexHolder:
+    """프로세스 전역에서 공유하는 읽기 전용 인덱스 + 버전 디렉터리 기반 원자적 교체
+
+        faiss_index/
+          CURRENT                ← 현재 버전 이름 (임시 파일 → os.replace 로 원자적 갱신)
+          versions/20250601T120000-ab12/index.faiss, docstore.sqlite   (utils.docstore 형식)
+
+    * 검색 경로(``snapshot``)는 락 없이 현재 ``IndexSnapshot`` 참조 하나만 읽는다. 저장소·BM25·조건 열은
+      한 번의 참조 대입으로 함께 바뀌므로, 요청마다 snapshot() 을 한 번 받아 그 안의 것만 쓰면 버전이 섞이지 않는다.
+    * 쓰기 작업은 ``load_for_write`` 로 받은 별도 사본을 수정한 뒤 ``publish`` 로 새 버전을 저장하고 교체한다.
+      공유 중인 객체는 절대 수정하지 않으므로 읽는 쪽은 반쯤 쓰인 인덱스를 볼 수 없다.
+    * 다른 워커 프로세스가 publish 한 버전은 ``check_interval`` 초마다 CURRENT 를 확인해 반영한다.
+    * CURRENT 가 없으면 예전 형식(root 에 바로 index.faiss/index.pkl)을 읽는다.
+    * ann 설정이 flat 이 아니면 게시할 때 index.ann 을 함께 만들고 검색용 로드에서 그것을 쓴다 (utils.ann).
+    * 검색용 인덱스가 다른 버전으로 바뀌면 ``add_listener`` 로 등록한 콜백을 호출한다 (답변 캐시 무효화 등).
+    * 게시할 때 이전 버전의 lexical.npz 를 새 청크 집합에 맞춰 증분 갱신해 함께 저장한다 (``snapshot().lexical``).
+      lexical.npz 가 없는 버전(예전 인덱스)은 다음 게시 때 docstore 전체로 한 번 만든다.
+    * 청크 메타데이터의 조건(gpa/grade/status/기간)은 위치 순 열(filters.npz)로 함께 저장한다 (``snapshot().filters``).
+    """
+
+    POINTER = "CURRENT"
+
+    def __init__(self, root: Path, embeddings: Embeddings, check_interval: float = 5.0, keep_versions: int = 3, ann: Optional[AnnConfig] = None):
+        self.root = Path(root)
+        self.embeddings = embeddings
+        self.ann = ann or AnnConfig()
+        self.check_interval = check_interval
+        self.keep_versions = keep_versions
+        self._snapshot: Optional[IndexSnapshot] = None
+        self._next_check = 0.0
+        self._reload_lock = threading.Lock()
+        self._listeners: List[Callable[[str], None]] = []
+
+    def add_listener(self, callback: Callable[[str], None]) -> None:
+        """검색용 인덱스 교체 시 callback(버전) 호출"""
+        self._listeners.append(callback)
+
+    def _notify(self, version: Optional[str]) -> None:
+        for callback in self._listeners:
+            try:
+                callback(version or "legacy")
+            except Exception as e:
+                logger.warning(f"[FAISS] 인덱스 교체 콜백 실패: {e}")
+
+    # ── 경로 ──
+    @property
+    def versions_dir(self) -> Path:
+        return self.root / "versions"
+
+    def current_version(self) -> Optional[str]:
+        try:
+            return (self.root / self.POINTER).read_text(encoding="utf-8").strip() or None
+        except FileNotFoundError:
+            return None
+
+    def current_dir(self) -> Optional[Path]:
+        version = self.current_version()
+        if version:
+            return self.versions_dir / version
+        if (self.root / "index.faiss").exists():
+            return self.root  # 예전 형식
+        return None
+
+    def _load_dir(self, path: Path) -> FAISS:
+        # 검색용: 인덱스 mmap + 청크는 SQLite 에서 지연 조회
+        store = load_store(path, self.embeddings, mmap=True)
+        ann_path = path / ANN_FILE
+        if self.ann.kind != "flat" and ann_path.exists():
+            store.index = faiss.read_index(str(ann_path), ANN_MMAP_FLAGS)
+            apply_search_params(store.index, self.ann)
+        return store
+
+    # ── 읽기 ──
+    def load(self) -> Optional[FAISS]:
+        """현재 버전을 (다시) 읽어 공유 참조 교체"""
+        snapshot = self._reload()
+        return snapshot.store if snapshot is not None else None
+
+    def _reload(self) -> Optional[IndexSnapshot]:
+        with self._reload_lock:
+            version = self.current_version()
+            path = self.current_dir()
+            self._next_check = time.monotonic() + self.check_interval
+            if path is None:
+                return None
+            current = self._snapshot
+            changed = current is None or version != current.version
+            if changed:
+                current = IndexSnapshot(version, self._load_dir(path), LexicalIndex.load(path), ChunkFilters.load(path))
+                self._snapshot = current
+                logger.info(f"[FAISS] 인덱스 로드: {version or 'legacy'} ({current.store.index.ntotal}개)")
+        if changed:
+            self._notify(version)
+        return current
+
+    def snapshot(self) -> Optional[IndexSnapshot]:
+        """검색용 현재 버전 묶음 (락 없음, 요청마다 한 번). 주기적으로 다른 프로세스의 새 버전을 반영"""
+        snapshot = self._snapshot
+        if time.monotonic() >= self._next_check and self._reload_lock.acquire(blocking=False):
+            # 한 스레드만 확인하고, 나머지는 기존 인덱스로 바로 검색
+            try:
+                self._next_check = time.monotonic() + self.check_interval
+                changed = snapshot is None or self.current_version() != snapshot.version
+            finally:
+                self._reload_lock.release()
+            if changed:
+                snapshot = self._reload()
+        return snapshot
+
+    def get(self) -> Optional[FAISS]:
+        """검색용 현재 저장소 (BM25·조건 열도 함께 쓰려면 snapshot())"""
+        snapshot = self.snapshot()
+        return snapshot.store if snapshot is not None else None
+
+    # ── 쓰기 ──
+    def load_for_write(self) -> Optional[FAISS]:
+        """수정용 사본 (공유 인덱스와 별개 객체)"""
+        path = self.current_dir()
+        return load_store(path, self.embeddings, mmap=False) if path is not None else None
+
+    def publish(self, store: FAISS) -> str:
+        """새 버전 디렉터리에 저장 → CURRENT 교체 → 공유 참조 교체"""
+        version = f"{datetime.now():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:6]}"
+        self.versions_dir.mkdir(parents=True, exist_ok=True)
+        tmp_dir = self.versions_dir / f".{version}.tmp"
+        save_store(store, tmp_dir)
+        current = self.current_dir()
+        lexical = (LexicalIndex.load(current) if current is not None else None) or LexicalIndex()
+        lexical.sync(store)  # 새 청크만 토큰화
+        lexical.save(tmp_dir)
+        filters = ChunkFilters.build(store)
+        filters.save(tmp_dir)
+        if self.ann.kind != "flat":
+            ann_index = build_ann_index(flat_vectors(store.index), self.ann, store.index.metric_type)
+            if ann_index is not None:
+                faiss.write_index(ann_index, str(tmp_dir / ANN_FILE))
+        os.replace(tmp_dir, self.versions_dir / version)
+
+        pointer_tmp = self.root / f".{self.POINTER}.tmp"
+        pointer_tmp.write_text(version, encoding="utf-8")
+        os.replace(pointer_tmp, self.root / self.POINTER)
+
+        # 쓰기용 사본은 공유하지 않고, 게시된 버전을 검색용으로 다시 연다
+        shared = IndexSnapshot(version, self._load_dir(self.versions_dir / version), lexical, filters)
+        with self._reload_lock:
+            self._snapshot = shared  # 한 번의 참조 대입으로 세 자료를 함께 교체
+        logger.info(f"[FAISS] 새 버전 게시: {version} ({store.index.ntotal}개, {self.ann.kind})")
+        self._notify(version)
+        self._prune()
+        return version
+
+    def _prune(self) -> None:
+        """오래된 버전 정리 (현재 버전 포함 keep_versions 개 유지)"""
+        versions = sorted(p for p in self.versions_dir.iterdir() if p.is_dir() and not p.name.startswith("."))
+        for old in versions[:-self.keep_versions]:
+            shutil.rmtree(old, ignore_errors=True)